@@ -0,0 +1,104 @@
+"""
+Content-hashed, pre-compressed copies of the data files the frontend fetches.
+
+A file is stored as <stem>.<hash><ext> (first HASH_LENGTH hex digits of its
+sha256) next to .gz and, if the optional `brotli` package is installed, .br
+siblings for nginx's gzip_static / brotli_static (ARTIFACT_GZIP_LEVEL sets
+the gzip level, default 6). A name never changes meaning, so these can be
+cached forever; a rebuild that produces the same bytes produces the same
+name and writes (or compresses) nothing.
+
+public/assets.json maps each logical name (relative to public/) to its
+current hashed name. It is the only file the browser has to revalidate;
+src/utils/assets.js reads it and falls back to the plain name without it.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+
+from pipeline import OUTPUT_ROOT, write_if_changed
+
+try:
+    import brotli
+except ImportError:  # .br siblings are optional
+    brotli = None
+
+PUBLIC_DIR = os.path.join(OUTPUT_ROOT, 'public')
+ASSETS_PATH = os.path.join(PUBLIC_DIR, 'assets.json')
+
+HASH_LENGTH = 10
+# zlib level of the .gz siblings: 9 is several times slower than 6 for a few
+# percent smaller files, and dominated full builds
+GZIP_LEVEL = int(os.environ.get("ARTIFACT_GZIP_LEVEL", 6))
+COMPRESSED = (".gz", ".br")
+HASHED_RE = re.compile(r"^(?P<stem>.+)\.[0-9a-f]{%d}(?P<ext>\.[^.]+)(\.gz|\.br)?$" % HASH_LENGTH)
+
+
+def hashed_name(name, data):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def _write(path, data):
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def store(directory, name, data):
+    """Writes `data` as its hashed name plus compressed siblings; returns the hashed name.
+
+    Files that already exist are left alone: same name, same bytes, so an
+    unchanged artifact is never compressed again.
+    """
+    hashed = hashed_name(name, data)
+    path = os.path.join(directory, hashed)
+    os.makedirs(directory, exist_ok=True)
+    if not os.path.exists(path):
+        _write(path, data)
+    if not os.path.exists(path + ".gz"):
+        _write(path + ".gz", gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))
+    if brotli is not None and not os.path.exists(path + ".br"):
+        _write(path + ".br", brotli.compress(data))
+    return hashed
+
+
+def with_siblings(names):
+    return {n + suffix for n in names for suffix in ("",) + COMPRESSED}
+
+
+def prune(directory, keep, prefix=""):
+    """Removes hashed files (and siblings) starting with `prefix` that aren't in `keep`."""
+    keep = with_siblings(keep)
+    for entry in os.listdir(directory):
+        if entry.startswith(prefix) and HASHED_RE.match(entry) and entry not in keep:
+            os.remove(os.path.join(directory, entry))
+
+
+def publish(paths, assets_path=ASSETS_PATH):
+    """Stores hashed copies of files under public/ and records them in assets.json."""
+    try:
+        with open(assets_path, "r", encoding="utf-8") as f:
+            assets = json.load(f)
+    except FileNotFoundError:
+        assets = {}
+
+    for path in paths:
+        directory, name = os.path.split(path)
+        with open(path, "rb") as f:
+            hashed = store(directory, name, f.read())
+        stem, ext = os.path.splitext(name)
+        # Older versions of this file only; other files in the directory are untouched
+        for entry in os.listdir(directory):
+            match = HASHED_RE.match(entry)
+            if match and match.group("stem") == stem and match.group("ext") == ext \
+                    and entry not in with_siblings([hashed]):
+                os.remove(os.path.join(directory, entry))
+
+        logical = os.path.relpath(path, PUBLIC_DIR).replace(os.sep, "/")
+        assets[logical] = logical[:len(logical) - len(name)] + hashed
+
+    write_if_changed(assets_path, json.dumps(assets, indent=2, sort_keys=True))
+    return assets
@@ -0,0 +1,308 @@
+"""
+Benchmark: every build stage against the local corpus fixture and synthetic scaled-up copies.
+
+Each measurement is a full (non-incremental) build of one stage in its own
+process, reading through the Sefaria cache with SEFARIA_OFFLINE=1 and writing
+into a scratch BUILD_OUTPUT_ROOT, so the repo's artifacts are never touched.
+The cache is the committed fixture (fixtures/sefaria: the first chapters of
+each book) unless --cache-dir points at another, e.g. the full
+backend_tools/.sefaria_cache; each book is read as far as the cache holds its
+chapters. A scale of N repeats every book's chapters N times (Genesis 4 reads
+Genesis 1 in the fixture), which grows the verse and posting counts while the
+vocabulary stays the same.
+
+Per stage and scale it reports wall time, verses/s (and postings/s for the
+index), the process' max RSS, the tracemalloc peak and the artifacts' size.
+"read" is the corpus read and tokenize alone, the floor under every stage;
+"all" is every stage in one pass, as build.py runs them. parshas needs all
+five books in full, so it is left out when the cache or --books holds less.
+
+Results go to --output as JSON. With --baseline, every metric is compared to
+an earlier run and the exit status is 1 if one grew past its tolerance:
+
+    python backend_tools/bench_build.py --scales 1 2 10 --output bench.json
+    python backend_tools/bench_build.py --baseline bench.json --tolerance seconds=0.5
+    python backend_tools/bench_build.py --stages index --scales 1 --profile profiles/
+"""
+import argparse
+import cProfile
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from build import STAGES, load_stage
+from pipeline import BuildState, read_corpus, run_stages
+from sefaria_cache import SefariaCache, BOOKS_STRUCTURE
+
+RESULT_VERSION = 2  # 2: "corpus", the chapters read per book
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sefaria")
+# Allowed growth over the baseline before a metric counts as a regression
+TOLERANCES = {"seconds": 0.25, "max_rss_bytes": 0.15, "traced_peak_bytes": 0.15, "bytes": 0.02}
+# Growth below this is timer noise, whatever the ratio (the small stages run in milliseconds)
+MIN_SECONDS_GROWTH = 0.25
+
+
+class ScaledCache:
+    """The cached corpus with every book's chapters repeated `scale` times.
+
+    Copies keep the real book names (the index only takes the five books of
+    the Torah), and copy 0 is the real corpus, so parsha ranges still resolve.
+    """
+
+    def __init__(self, cache, books, scale):
+        self.cache = cache
+        self.chapter_counts = dict(books)
+        self.scale = scale
+
+    def books(self):
+        return [(book, n * self.scale) for book, n in self.chapter_counts.items()]
+
+    def _source(self, book, chapter_num):
+        """(copy, chapter of the real book) behind a scaled chapter number."""
+        return divmod(chapter_num - 1, self.chapter_counts[book])[0], (chapter_num - 1) % self.chapter_counts[book] + 1
+
+    def chapter(self, book, chapter_num):
+        return self.cache.chapter(book, self._source(book, chapter_num)[1])
+
+    def chapter_hash(self, book, chapter_num):
+        copy, source = self._source(book, chapter_num)
+        digest = self.cache.chapter_hash(book, source)
+        return digest if copy == 0 or digest is None else f"{digest}.{copy}"
+
+    def prefetch_corpus(self, books=None):
+        return self.cache.prefetch_corpus(list(self.chapter_counts.items()))
+
+    def worker_copy(self):
+        return ScaledCache(self.cache.worker_copy(), self.chapter_counts.items(), self.scale)
+
+    def summary(self):
+        return self.cache.summary()
+
+
+def cached_books(cache, books):
+    """(book, chapters) for each of `books`, cut at its first chapter the cache doesn't hold."""
+    counts = []
+    for book, total in books:
+        n = 0
+        while n < total and cache.chapter_hash(book, n + 1) is not None:
+            n += 1
+        if n:
+            counts.append((book, n))
+    return counts
+
+
+def run_build(stage, books, scale, jobs):
+    """Runs one stage (or "read" / "all") over the scaled corpus; returns its verse count."""
+    cache = ScaledCache(SefariaCache(), books, scale)
+    if stage == "read":
+        return sum(len(chapter.verses) for chapter in read_corpus(cache, cache.books()))
+    names = [name for name in STAGES if name != "parshas" or books == BOOKS_STRUCTURE]
+    stages = [load_stage(name) for name in (names if stage == "all" else [stage])]
+    run_stages(stages, cache=cache, books=cache.books(), incremental=False, jobs=jobs)
+    return sum(BuildState().manifest["chapters"].values())
+
+
+def measure(args):
+    """Child process: one build, timed, optionally traced or profiled; the result goes to --result."""
+    books = cached_books(SefariaCache(), [(b, n) for b, n in BOOKS_STRUCTURE if b in args.books])
+    profiler = cProfile.Profile() if args.profile else None
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    verses = run_build(args.child, books, args.scale, args.jobs)
+    if profiler:
+        profiler.disable()
+    seconds = time.perf_counter() - started
+
+    # ru_maxrss is in KiB on Linux; pool workers count as children
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) * 1024
+    result = {"seconds": seconds, "verses": verses, "max_rss_bytes": rss}
+    if args.trace_memory:
+        result["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    if profiler:
+        profiler.dump_stats(args.profile)
+    with open(args.result, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def artifact_size(root):
+    files = total = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            files += 1
+            total += os.path.getsize(os.path.join(directory, name))
+    return files, total
+
+
+def index_postings(root):
+    """Postings written by the index stage, over every method."""
+    path = os.path.join(root, "public", "torah_index", "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    return sum(method["postings"] for method in manifest["methods"].values())
+
+
+def run_child(args, stage, scale, trace_memory=False, profile=None):
+    """Builds `stage` at `scale` in a fresh process and scratch directory."""
+    with tempfile.TemporaryDirectory(prefix="gematria-bench-") as tmp_dir:
+        output_root = os.path.join(tmp_dir, "out")
+        result_path = os.path.join(tmp_dir, "result.json")
+        env = {**os.environ, "BUILD_OUTPUT_ROOT": output_root, "BUILD_STATE_DIR": os.path.join(tmp_dir, "state"),
+               "SEFARIA_OFFLINE": "1", "SEFARIA_CACHE_DIR": args.cache_dir}
+        command = [sys.executable, os.path.abspath(__file__), "--child", stage, "--scale", str(scale),
+                   "--jobs", str(args.jobs), "--result", result_path, "--books", *args.books]
+        if trace_memory:
+            command.append("--trace-memory")
+        if profile:
+            command += ["--profile", profile]
+        subprocess.run(command, env=env, check=True, stdout=None if args.verbose else subprocess.DEVNULL)
+
+        with open(result_path, "r", encoding="utf-8") as f:
+            result = json.load(f)
+        result["files"], result["bytes"] = artifact_size(output_root)
+        if stage in ("index", "all"):
+            result["postings"] = index_postings(output_root)
+        return result
+
+
+def bench(args, stage, scale):
+    runs = [run_child(args, stage, scale) for _ in range(args.repeat)]
+    result = min(runs, key=lambda r: r["seconds"])
+    if not args.no_tracemalloc:
+        result["traced_peak_bytes"] = run_child(args, stage, scale, trace_memory=True)["traced_peak_bytes"]
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+        run_child(args, stage, scale, profile=os.path.join(args.profile, f"{stage}-x{scale}.prof"))
+
+    result["verses_per_s"] = result["verses"] / result["seconds"]
+    if result.get("postings") is not None:
+        result["postings_per_s"] = result["postings"] / result["seconds"]
+    return {"stage": stage, "scale": scale, **result}
+
+
+def find_regressions(results, baseline, tolerances):
+    previous = {(r["stage"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get((result["stage"], result["scale"]))
+        if old is None:
+            continue
+        for metric, tolerance in tolerances.items():
+            if result.get(metric) is None or not old.get(metric):
+                continue
+            ratio = result[metric] / old[metric]
+            if metric == "seconds" and result[metric] - old[metric] < MIN_SECONDS_GROWTH:
+                continue
+            if ratio > 1 + tolerance:
+                regressions.append({"stage": result["stage"], "scale": result["scale"], "metric": metric,
+                                    "baseline": old[metric], "value": result[metric], "ratio": ratio})
+    return regressions
+
+
+def print_result(r):
+    mb = lambda key: f"{r[key] / 1e6:9.1f}" if r.get(key) is not None else f"{'-':>9}"
+    postings = f"{r['postings_per_s']:12.0f}" if "postings_per_s" in r else f"{'-':>12}"
+    print(f"{r['stage']:>9} {r['scale']:>5}x {r['seconds']:8.2f}s {r['verses_per_s']:10.0f} {postings} "
+          f"{mb('max_rss_bytes')} {mb('traced_peak_bytes')} {mb('bytes')}")
+
+
+def parse_tolerance(text):
+    metric, _, value = text.partition("=")
+    if metric not in TOLERANCES:
+        raise argparse.ArgumentTypeError(f"unknown metric {metric!r} (one of {', '.join(TOLERANCES)})")
+    return metric, float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--stages", nargs="+", default=["read", *STAGES, "all"], choices=["read", *STAGES, "all"])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 10])
+    parser.add_argument("--books", nargs="+", default=[b for b, _ in BOOKS_STRUCTURE])
+    parser.add_argument("--cache-dir", default=FIXTURE_DIR,
+                        help="Sefaria cache to read (default: the committed fixture, fixtures/sefaria)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="processes per build, as in build.py")
+    parser.add_argument("--repeat", type=int, default=1, help="timed builds per stage; the fastest counts")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip the (slower) traced build")
+    parser.add_argument("--profile", metavar="DIR", help="also write a cProfile dump per stage and scale to DIR")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=parse_tolerance, action="append", default=[], metavar="METRIC=FRACTION",
+                        help=f"allowed growth over the baseline (defaults: "
+                             f"{', '.join(f'{m}={t}' for m, t in TOLERANCES.items())})")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show the builds' own output")
+    # A single measurement, run by the parent in a child process
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--scale", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    parser.add_argument("--trace-memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args)
+        return
+    corpus = cached_books(SefariaCache(cache_dir=args.cache_dir, offline=True),
+                          [(b, n) for b, n in BOOKS_STRUCTURE if b in args.books])
+    if not corpus:
+        parser.error(f"{args.cache_dir} holds no chapters of {', '.join(args.books)}")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if (baseline["books"], baseline["jobs"], baseline.get("corpus")) != (args.books, args.jobs,
+                                                                            [list(c) for c in corpus]):
+            parser.error(f"{args.baseline} was run over another corpus or job count")
+    if corpus != BOOKS_STRUCTURE and "parshas" in args.stages:
+        # Parsha ranges span all five books
+        print("Skipping parshas: it needs every chapter of every book")
+        args.stages.remove("parshas")
+    print(f"Corpus: {', '.join(f'{book} 1-{n}' for book, n in corpus)} from {args.cache_dir}")
+
+    print(f"\n{'stage':>9} {'scale':>6} {'time':>9} {'verses/s':>10} {'postings/s':>12} "
+          f"{'RSS MB':>9} {'peak MB':>9} {'size MB':>9}")
+    results = []
+    for scale in args.scales:
+        for stage in args.stages:
+            results.append(bench(args, stage, scale))
+            print_result(results[-1])
+
+    report = {
+        "version": RESULT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "books": args.books,
+        "corpus": corpus,
+        "jobs": args.jobs,
+        "results": results,
+    }
+    if baseline:
+        report["regressions"] = find_regressions(results, baseline, {**TOLERANCES, **dict(args.tolerance)})
+        for r in report["regressions"]:
+            print(f"REGRESSION {r['stage']} {r['scale']}x {r['metric']}: "
+                  f"{r['baseline']:.4g} -> {r['value']:.4g} ({r['ratio']:.2f}x)")
+        if not report["regressions"]:
+            print(f"\nNo regressions against {args.baseline}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
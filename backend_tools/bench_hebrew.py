@@ -0,0 +1,71 @@
+"""
+Benchmark: the legacy four-regex clean_hebrew vs the table-driven normalizer
+in hebrew.py, over every verse of the corpus. All versions must produce the
+same words.
+
+Reads the corpus offline from the committed fixture (fixtures/sefaria), or
+from --cache-dir, as far as the cache holds each book (see bench_build.py).
+
+Usage:
+    python backend_tools/bench_hebrew.py --repeat 5
+    python backend_tools/bench_hebrew.py --cache-dir backend_tools/.sefaria_cache
+"""
+import argparse
+import re
+import time
+
+from bench_build import FIXTURE_DIR, cached_books
+from hebrew import normalize, tokenize
+from pipeline import read_corpus
+from sefaria_cache import SefariaCache, BOOKS_STRUCTURE
+
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+NIQQUD_RE = re.compile(r'[֑-ׇ]')
+NON_HEBREW_RE = re.compile(r'[^א-ת\s]')
+
+
+def legacy_tokenize(text):
+    """The original clean_hebrew: four chained passes, then split."""
+    text = HTML_TAG_RE.sub('', text)
+    text = text.replace('־', ' ').replace('-', ' ')
+    text = NIQQUD_RE.sub('', text)
+    text = NON_HEBREW_RE.sub(' ', text)
+    return text.split()
+
+
+def timed(fn, verses, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for verse in verses:
+            fn(verse)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    parser.add_argument("--cache-dir", default=FIXTURE_DIR,
+                        help="Sefaria cache to read (default: the committed fixture, fixtures/sefaria)")
+    args = parser.parse_args()
+
+    cache = SefariaCache(cache_dir=args.cache_dir, offline=True)
+    verses = [verse.he for chapter in read_corpus(cache, cached_books(cache, BOOKS_STRUCTURE))
+              for verse in chapter.verses]
+
+    for verse in verses:
+        words, spans = normalize(verse)
+        assert legacy_tokenize(verse) == tokenize(verse) == words, f"words changed: {verse!r}"
+        assert all(tokenize(verse[a:b]) == [w] for w, (a, b) in zip(words, spans)), f"bad span: {verse!r}"
+
+    print(f"\n{len(verses)} verses, best of {args.repeat}\n")
+    t_legacy = timed(legacy_tokenize, verses, args.repeat)
+    print(f"{'version':>10} {'total':>9} {'per verse':>10} {'speedup':>8}")
+    for name, fn in [("legacy", legacy_tokenize), ("tokenize", tokenize), ("normalize", normalize)]:
+        t = t_legacy if fn is legacy_tokenize else timed(fn, verses, args.repeat)
+        print(f"{name:>10} {t * 1000:8.1f}ms {t / len(verses) * 1e6:8.2f}us {t_legacy / t:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
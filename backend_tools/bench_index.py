@@ -0,0 +1,109 @@
+"""
+Benchmark: legacy phrase index (dict entries, linear-scan dedup) vs IndexStage.
+
+Reads the corpus through the Sefaria cache (use SEFARIA_OFFLINE=1 with a warm
+cache or a fixture directory), then builds the index both ways for each
+phrase length and checks they hold the same (value, phrase, ref) postings.
+
+Usage:
+    python backend_tools/bench_index.py --lengths 3 5 8 --books Genesis Exodus
+"""
+import argparse
+import time
+
+import numpy as np
+
+from build_index import IndexStage
+from hebrew import DEFAULT_METHOD, get_gematria_value
+from index_format import WHOLE_VERSE
+from pipeline import read_corpus
+from sefaria_cache import SefariaCache, BOOKS_STRUCTURE
+
+
+def legacy_build_db(chapters, max_phrase_length):
+    """The original builder: an entry dict per window, deduped by scanning the value's list."""
+    gematria_db = {}
+    for chapter in chapters:
+        for verse in chapter.verses:
+            ref = chapter.ref(verse)
+            entries = [(get_gematria_value(" ".join(verse.words)), {
+                "phrase": WHOLE_VERSE, "original_he": verse.he, "ref": ref,
+                "context_en": verse.en, "isVerse": True})]
+            n = len(verse.words)
+            for i in range(n):
+                for j in range(i, min(i + max_phrase_length, n)):
+                    phrase_str = " ".join(verse.words[i:j + 1])
+                    entries.append((get_gematria_value(phrase_str), {
+                        "phrase": phrase_str, "ref": ref, "context_en": verse.en, "isVerse": False}))
+
+            for val, entry in entries:
+                if val <= 0:
+                    continue
+                str_val = str(val)
+                if str_val not in gematria_db:
+                    gematria_db[str_val] = []
+                if not entry["isVerse"]:
+                    exists = any(x['phrase'] == entry['phrase'] and x['ref'] == entry['ref'] for x in gematria_db[str_val])
+                    if exists:
+                        continue
+                gematria_db[str_val].append(entry)
+    return gematria_db
+
+
+def current_build(stage, chapters, method=DEFAULT_METHOD):
+    """Global verse table plus one method's postings sorted by value (corpus order within a value)."""
+    verses, chunks = [], []
+    for chapter in chapters:
+        postings = stage.process_chapter(chapter)["postings"][method].copy()
+        postings[:, 1] += len(verses)
+        verses.extend((chapter.ref(verse), verse.words) for verse in chapter.verses)
+        chunks.append(postings)
+    postings = np.concatenate(chunks) if chunks else np.zeros((0, 4), dtype=np.int64)
+    return verses, postings[np.argsort(postings[:, 0], kind="stable")]
+
+
+def as_triples(verses, postings):
+    triples = []
+    for val, verse_id, start, length in postings.tolist():
+        ref, words = verses[verse_id]
+        phrase = WHOLE_VERSE if length == 0 else " ".join(words[start:start + length])
+        triples.append((val, phrase, ref))
+    return triples
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[3, 5])
+    parser.add_argument("--books", nargs="+", default=[b for b, _ in BOOKS_STRUCTURE])
+    parser.add_argument("--skip-legacy-above", type=int, default=5,
+                        help="don't run the quadratic version for longer windows")
+    args = parser.parse_args()
+
+    books = [(b, n) for b, n in BOOKS_STRUCTURE if b in args.books]
+    chapters = list(read_corpus(SefariaCache(), books))
+    print(f"\n{sum(len(c.verses) for c in chapters)} verses from {', '.join(args.books)}\n")
+
+    print(f"{'len':>4} {'postings':>10} {'legacy':>10} {'current':>10} {'speedup':>8}")
+    for length in args.lengths:
+        stage = IndexStage(max_phrase_length=length)
+        (verses, postings), t_current = timed(current_build, stage, chapters)
+
+        if length <= args.skip_legacy_above:
+            legacy_db, t_legacy = timed(legacy_build_db, chapters, length)
+            legacy = [(int(v), e["phrase"], e["ref"]) for v, entries in legacy_db.items() for e in entries]
+            assert sorted(legacy) == sorted(as_triples(verses, postings)), "index contents changed"
+            legacy_col, speedup = f"{t_legacy:9.2f}s", f"{t_legacy / t_current:7.0f}x"
+        else:
+            legacy_col, speedup = f"{'-':>10}", f"{'-':>8}"
+
+        print(f"{length:>4} {len(postings):>10} {legacy_col} {t_current:9.2f}s {speedup}")
+
+
+if __name__ == "__main__":
+    main()
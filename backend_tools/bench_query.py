@@ -0,0 +1,79 @@
+"""
+Load test for query_server.py: N keep-alive clients issuing /api/value queries.
+
+Start the server first (python backend_tools/query_server.py), then:
+
+    python backend_tools/bench_query.py --clients 32 --requests 5000
+    python backend_tools/bench_query.py --values 1-1000 --colel --parsha Noach
+"""
+import argparse
+import asyncio
+import random
+import time
+
+
+async def client(host, port, paths, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            started = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            status = (await reader.readline()).split()[1]
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if status != b"200":
+                errors.append(path)
+    finally:
+        writer.close()
+
+
+def parse_range(text):
+    lo, _, hi = text.partition("-")
+    return range(int(lo), int(hi or lo) + 1)
+
+
+async def run(args):
+    values = list(parse_range(args.values))
+    query = "".join([
+        "&colel=1" if args.colel else "",
+        "&single=1" if args.single else "",
+        f"&parsha={args.parsha}" if args.parsha else ""
+    ])
+    paths = [f"/api/value/{random.choice(values)}?page=1{query}" for _ in range(args.requests)]
+    per_client = [paths[i::args.clients] for i in range(args.clients)]
+
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(args.host, args.port, p, latencies, errors) for p in per_client if p))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"{len(latencies)} requests, {args.clients} clients, {elapsed:.2f}s: "
+          f"{len(latencies) / elapsed:.0f} req/s, p50 {pct(0.5):.1f} ms, p99 {pct(0.99):.1f} ms, "
+          f"{len(errors)} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--values", default="1-2000", help="value range to draw from, e.g. 1-2000")
+    parser.add_argument("--colel", action="store_true")
+    parser.add_argument("--single", action="store_true")
+    parser.add_argument("--parsha")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: legacy race counting (every word against every racer) vs RacerMatcher.
+
+Reads the corpus through the Sefaria cache (use SEFARIA_OFFLINE=1 with a warm
+cache or a fixture directory). Racers are the common_gematria.json words,
+topped up with the corpus' most frequent words to reach each size, so the
+larger runs actually match. Both versions must produce the same counts.
+
+Usage:
+    python backend_tools/bench_race.py --sizes 100 1000 10000
+"""
+import argparse
+import time
+from collections import Counter
+
+from build_race_data import MIN_WORD_LENGTH, VALID_PREFIXES, RaceStage, load_racers
+from pipeline import read_corpus
+from sefaria_cache import SefariaCache
+
+
+def legacy_count(chapters, words_to_track):
+    """The original loop: endswith against every racer for every word."""
+    counts = {}
+    for chapter in chapters:
+        for verse in chapter.verses:
+            for w in verse.words:
+                for target in words_to_track:
+                    if w == target:
+                        c = counts.setdefault(target, [0, 0])
+                        c[0] += 1
+                        c[1] += 1
+                    elif w.endswith(target):
+                        prefix = w[:-len(target)]
+                        if prefix in VALID_PREFIXES:
+                            counts.setdefault(target, [0, 0])[1] += 1
+    return counts
+
+
+def current_count(chapters, words_to_track):
+    stage = RaceStage(words_to_track)
+    counts = {}
+    for chapter in chapters:
+        for word, (exact, prefix) in stage.process_chapter(chapter).items():
+            c = counts.setdefault(word, [0, 0])
+            c[0] += exact
+            c[1] += prefix
+    return counts
+
+
+def racers_of_size(size, racers, chapters):
+    chosen = sorted(racers)[:size]
+    if len(chosen) < size:
+        frequency = Counter(w for c in chapters for v in c.verses for w in v.words if len(w) >= MIN_WORD_LENGTH)
+        taken = set(chosen)
+        chosen += [w for w, _ in frequency.most_common() if w not in taken][:size - len(chosen)]
+    return set(chosen)
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--skip-legacy-above", type=int, default=1000,
+                        help="don't run the O(words x racers) version for more racers")
+    args = parser.parse_args()
+
+    chapters = list(read_corpus(SefariaCache()))
+    racers = load_racers()
+    print(f"\n{sum(len(v.words) for c in chapters for v in c.verses)} words, {len(racers)} common racers\n")
+
+    print(f"{'racers':>7} {'matched':>8} {'legacy':>10} {'current':>10} {'speedup':>8}")
+    for size in args.sizes:
+        tracked = racers_of_size(size, racers, chapters)
+        counts, t_current = timed(current_count, chapters, tracked)
+
+        if size <= args.skip_legacy_above:
+            legacy, t_legacy = timed(legacy_count, chapters, tracked)
+            assert legacy == counts, "race counts changed"
+            legacy_col, speedup = f"{t_legacy:9.2f}s", f"{t_legacy / t_current:7.0f}x"
+        else:
+            legacy_col, speedup = f"{'-':>10}", f"{'-':>8}"
+
+        print(f"{len(tracked):>7} {len(counts):>8} {legacy_col} {t_current:9.2f}s {speedup}")
+
+
+if __name__ == "__main__":
+    main()
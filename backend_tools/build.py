@@ -0,0 +1,47 @@
+"""
+Unified build: reads and tokenizes the Torah once, then runs the selected stages.
+
+Usage:
+    python backend_tools/build.py all
+    python backend_tools/build.py text race
+    python backend_tools/build.py all --full    # ignore the incremental build state
+    python backend_tools/build.py index --full -j 8   # process chapters on 8 processes
+"""
+import argparse
+import importlib
+
+from pipeline import run_stages
+
+# name -> (module, Stage class). Imported on demand, so building e.g. "text"
+# doesn't need the index stage's numpy dependency.
+STAGES = {
+    "index": ("build_index", "IndexStage"),
+    "text": ("build_torah_text", "TorahTextStage"),
+    "timeline": ("build_timeline", "TimelineStage"),
+    "race": ("build_race_data", "RaceStage"),
+    "parshas": ("build_parshas", "ParshaStage"),
+}
+
+
+def load_stage(name):
+    module, cls = STAGES[name]
+    return getattr(importlib.import_module(module), cls)()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build Gematria Explorer data artifacts.")
+    parser.add_argument("stages", nargs="+", choices=["all"] + list(STAGES),
+                        help="stages to build ('all' for every artifact)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="processes for reading and processing chapters (default 1)")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore .build_state/ and rebuild every chapter and artifact")
+    args = parser.parse_args()
+
+    names = list(STAGES) if "all" in args.stages else list(dict.fromkeys(args.stages))
+    print(f"Building: {', '.join(names)}")
+    run_stages([load_stage(name) for name in names], incremental=not args.full, jobs=args.jobs)
+
+
+if __name__ == "__main__":
+    main()
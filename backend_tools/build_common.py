@@ -1,11 +1,32 @@
-import requests
+"""
+Builds src/data/common_gematria.json, the "Did you know?" dictionary, from
+the curated list below plus Sefaria's topic categories.
+
+Categories are fetched concurrently through the Sefaria cache (pooled,
+rate-limited, cached on disk; see sefaria_cache.py), so a rebuild only
+revalidates them. Entries are merged with set semantics on their Hebrew
+letters (hebrew.letters_only): the same word spelled with niqqud, spaces or
+hyphens is one entry, and a curated entry always wins over a topic, so
+manual entries are never lost or duplicated. build_race_data.py tracks every
+word in the dictionary.
+
+Output: {"<value>": ["<hebrew> (<english>)", ...]}, values in numeric order,
+minified.
+
+Usage:
+    python backend_tools/build_common.py
+    python backend_tools/build_common.py --curated-only    # no Sefaria topics
+    SEFARIA_OFFLINE=1 python backend_tools/build_common.py  # only cached topics
+"""
+import argparse
 import json
-import re
 import os
-import time
 
-# 1. SETUP: Categories to fetch from Sefaria
-# These "slugs" represent lists of topics in Sefaria's database
+from hebrew import get_gematria_value, letters_only
+from pipeline import write_if_changed
+from sefaria_cache import CacheMiss, SefariaCache
+
+# Sefaria topic lists (api/topics/subclass/<slug>)
 TOPIC_CATEGORIES = [
     "biblical-figure",  # Abraham, Sarah, Moses...
     "holiday",          # Shabbat, Pesach, Chanukah...
@@ -16,90 +37,128 @@ TOPIC_CATEGORIES = [
     "angel",            # Michael, Gabriel...
     "jewish-concepts"   # Tzedakah, Teshuva...
 ]
+TOPICS_ENDPOINT = "topics/subclass"
+
+# Hand-picked entries: names, holidays and concepts, listed first and never
+# replaced by a topic with the same Hebrew
+CURATED = [
+    # -- PEOPLE --
+    ("אדם", "Adam"), ("חוה", "Eve"), ("קין", "Cain"), ("הבל", "Abel"),
+    ("נח", "Noah"), ("אברהם", "Avraham"), ("שרה", "Sarah"), ("יצחק", "Yitzchak"),
+    ("רבקה", "Rivka"), ("יעקב", "Yaakov"), ("רחל", "Rachel"), ("לאה", "Leah"),
+    ("יוסף", "Yosef"), ("משה", "Moshe/Moses"), ("אהרן", "Aharon"), ("מרים", "Miriam"),
+    ("דוד", "David"), ("שלמה", "Solomon"), ("שאול", "Saul"), ("שמואל", "Samuel"),
+    ("אסתר", "Esther"), ("מרדכי", "Mordechai"), ("אליהו", "Eliyahu"),
+    ("ראובן", "Reuven"), ("שמעון", "Shimon"), ("לוי", "Levi"), ("יהודה", "Yehuda"),
+    ("יששכר", "Issachar"), ("זבולון", "Zevulun"), ("דן", "Dan"), ("נפתלי", "Naftali"),
+    ("גד", "Gad"), ("אשר", "Asher"), ("בנימין", "Benjamin"), ("אפרים", "Ephraim"), ("מנשה", "Menashe"),
+
+    # -- HOLIDAYS --
+    ("שבת", "Shabbat"), ("ראש השנה", "Rosh Hashanah"), ("יום כיפור", "Yom Kippur"),
+    ("סוכות", "Sukkot"), ("שמחת תורה", "Simchat Torah"), ("חנוכה", "Chanukah"),
+    ("פורים", "Purim"), ("פסח", "Pesach"), ("שבועות", "Shavuot"), ("ראש חודש", "Rosh Chodesh"),
+    ("תשעה באב", "Tisha B'Av"), ("ל\"ג בעומר", "Lag BaOmer"),
 
-# Gematria Map
-gematria_map = {
-    'א': 1, 'ב': 2, 'ג': 3, 'ד': 4, 'ה': 5, 'ו': 6, 'ז': 7, 'ח': 8, 'ט': 9,
-    'י': 10, 'כ': 20, 'ל': 30, 'מ': 40, 'נ': 50, 'ס': 60, 'ע': 70, 'פ': 80, 'צ': 90,
-    'ק': 100, 'ר': 200, 'ש': 300, 'ת': 400,
-    'ך': 20, 'ם': 40, 'ן': 50, 'ף': 80, 'ץ': 90
-}
+    # -- CONCEPTS --
+    ("תורה", "Torah"), ("מצוה", "Mitzvah"), ("צדקה", "Tzedakah"), ("תשובה", "Teshuva"),
+    ("תפילה", "Prayer"), ("חסד", "Chesed/Kindness"), ("גבורה", "Gevurah"), ("תפארת", "Tiferet"),
+    ("נצח", "Netzach"), ("הוד", "Hod"), ("יסוד", "Yesod"), ("מלכות", "Malchut"),
+    ("כתר", "Crown"), ("חכמה", "Chochmah"), ("בינה", "Binah"), ("דעת", "Daat"),
+    ("ישראל", "Yisrael"), ("ירושלים", "Jerusalem"), ("ציון", "Zion"),
+    ("בית המקדש", "The Temple"), ("משיח", "Mashiach"), ("גן עדן", "Gan Eden"),
+    ("גיהנום", "Gehinnom"), ("עולם הבא", "World to Come"), ("נשמה", "Soul"),
+    ("רוח", "Spirit"), ("נפש", "Soul/Nefesh"), ("שכינה", "Shechinah"),
+    ("אמן", "Amen"), ("הללויה", "Hallelujah"), ("שמע", "Shema"), ("שלום", "Peace"),
+    ("מזל טוב", "Mazel Tov"), ("חיים", "Chaim/Life"), ("אמת", "Truth"),
+
+    # -- MONTHS --
+    ("תשרי", "Tishrei"), ("חשון", "Cheshvan"), ("כסלו", "Kislev"), ("טבת", "Tevet"),
+    ("שבט", "Shevat"), ("אדר", "Adar"), ("ניסן", "Nisan"), ("אייר", "Iyar"),
+    ("סיון", "Sivan"), ("תמוז", "Tammuz"), ("אב", "Av"), ("אלול", "Elul"),
+
+    # -- NUMBERS/LETTERS --
+    ("אחד", "Echad/One"), ("אהבה", "Ahava/Love"), ("י-ה-ו-ה", "The Name"), ("אלוהים", "Elohim"),
+
+    # -- MORE WORDS --
+    ("יד", "Hand"), ("חי", "Chai/Life"), ("אל", "God"), ("לב", "Heart"), ("כבוד", "Honor"),
+    ("דגל", "Flag"), ("גאולה", "Redemption"), ("לב טוב", "Good Heart"), ("כל", "All"),
+    ("ים", "Sea"), ("בן", "Son"), ("חן", "Grace"), ("אני", "I am"), ("אין", "Nothingness"),
+    ("אדני", "Master"), ("הלל", "Praise"), ("יין", "Wine"), ("סוד", "Secret"), ("לחם", "Bread"),
+    ("מזלא", "Luck"), ("מלאך", "Angel"), ("סוכה", "Succah"), ("ידיד נפש", "Yedid Nefesh"),
+    ("סיני", "Sinai"), ("סולם", "Ladder"), ("קול", "Voice"), ("ממון", "Money"), ("צום", "Fast"),
+    ("אור", "Light"), ("רז", "Secret"), ("אין סוף", "Infinite"), ("רמח", "Limbs"), ("שלג", "Snow"),
+    ("שילה", "Shiloh"), ("נחש", "Snake"), ("עשו", "Esau"), ("ת", "Tav"), ("שקל", "Shekel"),
+    ("בית", "Home"), ("תאוה", "Desire"), ("לויתן", "Leviathan"), ("פרו", "Fruitful"),
+    ("שירה", "Song"), ("תריג", "Commandments"), ("משה רבינו", "Moshe Rabbeinu"),
+    ("בראשית", "Bereshit"), ("אלהים", "God"), ("הטבע", "Nature"), ("כוס", "Cup"), ("המלך", "The King"),
+    ("דניאל", "Daniel"), ("השמים", "The Heavens")
+]
 
-def get_gematria_value(text):
-    clean = re.sub(r'[^\u05D0-\u05EA]', '', text)
-    return sum(gematria_map.get(char, 0) for char in clean)
 
-# 2. LOAD EXISTING DATA (To preserve your manual entries)
 script_dir = os.path.dirname(os.path.abspath(__file__))
-output_path = os.path.join(script_dir, '..', 'src', 'data', 'common_gematria.json')
-
-common_db = {}
-try:
-    with open(output_path, 'r', encoding='utf-8') as f:
-        common_db = json.load(f)
-    print(f"Loaded existing DB with {len(common_db)} keys.")
-except FileNotFoundError:
-    print("No existing DB found. Starting fresh.")
-
-# 3. FETCH FROM API
-print("Fetching Topics from Sefaria (this may take 30s)...")
-
-for category in TOPIC_CATEGORIES:
-    print(f"  fetching '{category}'...")
-    try:
-        # Sefaria API Endpoint for Sub-topics
-        url = f"https://www.sefaria.org/api/topics/subclass/{category}"
-        response = requests.get(url)
-        data = response.json()
-        
-        # Sefaria returns a list of topic objects
-        # We handle cases where it might return a dict or list
-        if isinstance(data, dict) and 'topics' in data:
-            items = data['topics'] # Some endpoints wrap it
-        elif isinstance(data, list):
-            items = data
-        else:
-            items = []
-
-        count = 0
-        for item in items:
-            # We need both Hebrew ('he') and English ('en') titles
-            he = item.get('he', '')
-            en = item.get('en', '')
-            
-            # primary title might be inside 'primaryTitle' sometimes
-            if not he and 'primaryTitle' in item:
-                he = item['primaryTitle'].get('he', '')
-                en = item['primaryTitle'].get('en', '')
-
-            if he and en:
-                val = get_gematria_value(he)
-                if val > 0:
-                    str_val = str(val)
-                    if str_val not in common_db:
-                        common_db[str_val] = []
-                    
-                    # Create a nice label: "Moshe (Moses)"
-                    entry = f"{he} ({en})"
-                    
-                    # Avoid Duplicates
-                    if entry not in common_db[str_val]:
-                         # Check if "he" is already in the list to avoid "Moshe (Moses)" vs "Moshe (Prophet)" clutter
-                         # logic: if the Hebrew word is already represented, maybe skip?
-                         # For now, let's just add it.
-                         common_db[str_val].append(entry)
-                         count += 1
-        
-        print(f"    + Added {count} entries.")
-        time.sleep(0.5) # Be polite to API
-
-    except Exception as e:
-        print(f"    Error fetching {category}: {e}")
-
-# 4. SAVE
-print("Saving expanded dictionary...")
-with open(output_path, 'w', encoding='utf-8') as f:
-    json.dump(common_db, f, ensure_ascii=False) # Minified to save space
-    # For pretty print use: json.dump(common_db, f, ensure_ascii=False, indent=2)
-
-print(f"Done! Database updated at {output_path}")
\ No newline at end of file
+OUTPUT_PATH = os.path.join(script_dir, '..', 'src', 'data', 'common_gematria.json')
+
+
+def topic_titles(data):
+    """(he, en) of every topic in a topics/subclass response."""
+    # Sefaria returns a list of topic objects, sometimes wrapped in {"topics": [...]}
+    if isinstance(data, dict):
+        data = data.get("topics", [])
+    for item in data if isinstance(data, list) else []:
+        he, en = item.get("he", ""), item.get("en", "")
+        if not he and "primaryTitle" in item:
+            he, en = item["primaryTitle"].get("he", ""), item["primaryTitle"].get("en", "")
+        if he and en:
+            yield he, en
+
+
+def fetch_topics(cache, categories=TOPIC_CATEGORIES):
+    """{category: [(he, en)]}, every category requested concurrently."""
+    cache.prefetch([(TOPICS_ENDPOINT, category, None) for category in categories])
+    topics = {}
+    for category in categories:
+        try:
+            topics[category] = list(topic_titles(cache.get_json(TOPICS_ENDPOINT, category)))
+        except (CacheMiss, IOError, ValueError) as e:
+            print(f"  [FAILED] {category}: {e}")
+            topics[category] = []
+    return topics
+
+
+def merge_entries(*sources):
+    """{value: [label]} of (he, en) entries, one per distinct Hebrew word; earlier sources win."""
+    seen = set()
+    by_value = {}
+    for entries in sources:
+        for he, en in entries:
+            key = letters_only(he)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            by_value.setdefault(get_gematria_value(he), []).append(f"{he} ({en})")
+    return {str(value): by_value[value] for value in sorted(by_value)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build src/data/common_gematria.json.")
+    parser.add_argument("--curated-only", action="store_true", help="skip the Sefaria topic categories")
+    args = parser.parse_args()
+
+    sources = [CURATED]
+    if not args.curated_only:
+        cache = SefariaCache()
+        print(f"Fetching {len(TOPIC_CATEGORIES)} topic categories...")
+        for category, titles in fetch_topics(cache).items():
+            print(f"  {category}: {len(titles)} topics")
+            sources.append(titles)
+        print(cache.summary())
+
+    common_db = merge_entries(*sources)
+    total = sum(len(labels) for labels in common_db.values())
+    print(f"Saving {total} entries under {len(common_db)} values to {OUTPUT_PATH}...")
+    write_if_changed(OUTPUT_PATH, json.dumps(common_db, ensure_ascii=False, separators=(',', ':')))
+    print("Done!")
+
+
+if __name__ == "__main__":
+    main()
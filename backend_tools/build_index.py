@@ -1,108 +1,379 @@
-import requests
+import hashlib
 import json
-import re
 import os
+import re
+import tempfile
+
+import numpy as np
+
+from artifacts import prune, publish, store
+from gematria_engine import METHODS, encode
+from hebrew import DEFAULT_METHOD
+from index_format import IndexWriter
+from index_runs import SortedRuns, WordStream
+from pipeline import OUTPUT_ROOT, Stage, run_stages, write_if_changed
+from verse_ids import VerseTable
 
 # CONFIGURATION
 BOOKS_TO_INDEX = ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"]
 MAX_PHRASE_LENGTH = 3
-
-gematria_map = {
-    'א': 1, 'ב': 2, 'ג': 3, 'ד': 4, 'ה': 5, 'ו': 6, 'ז': 7, 'ח': 8, 'ט': 9,
-    'י': 10, 'כ': 20, 'ל': 30, 'מ': 40, 'נ': 50, 'ס': 60, 'ע': 70, 'פ': 80, 'צ': 90,
-    'ק': 100, 'ר': 200, 'ש': 300, 'ת': 400,
-    'ך': 20, 'ם': 40, 'ן': 50, 'ף': 80, 'ץ': 90
-}
-
-def get_gematria_value(text):
-    clean = re.sub(r'[^\u05D0-\u05EA]', '', text)
-    return sum(gematria_map.get(char, 0) for char in clean)
-
-def clean_html(raw_html):
-    cleanr = re.compile('<.*?>')
-    return re.sub(cleanr, '', raw_html)
-
-gematria_db = {}
-
-print("Starting Indexing Process...")
-
-for book in BOOKS_TO_INDEX:
-    url = f"https://www.sefaria.org/api/texts/{book}?pad=0&context=0"
-    print(f"Fetching {book}...")
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        hebrew_text = data['he']
-        english_text = data['text']
-
-        for chap_i, (he_chap, en_chap) in enumerate(zip(hebrew_text, english_text)):
-            for verse_i, (he_verse, en_verse) in enumerate(zip(he_chap, en_chap)):
-                
-                clean_english = clean_html(en_verse)
-                clean_verse = he_verse.replace('\u05BE', ' ') # Replace Maqaf
-                
-                # --- 1. INDEX THE WHOLE VERSE (PASUK) ---
-                verse_val = get_gematria_value(clean_verse)
-                if verse_val > 0:
-                    str_val = str(verse_val)
-                    if str_val not in gematria_db:
-                        gematria_db[str_val] = []
-                    
-                    gematria_db[str_val].append({
-                        "phrase": "(Whole Verse)", # Marker text
-                        "original_he": he_verse,   # Store full Hebrew
-                        "ref": f"{book} {chap_i+1}:{verse_i+1}",
-                        "context_en": clean_english,
-                        "isVerse": True # Flag for the UI
-                    })
-
-                # --- 2. INDEX PHRASES (SLIDING WINDOW) ---
-                raw_words = clean_verse.split()
-                n = len(raw_words)
-                
-                for i in range(n):
-                    current_phrase_words = []
-                    for j in range(i, min(i + MAX_PHRASE_LENGTH, n)):
-                        word = raw_words[j]
-                        clean_word = re.sub(r'[^\u05D0-\u05EA]', '', word)
-                        
-                        if not clean_word: continue
-                        
-                        current_phrase_words.append(clean_word)
-                        has_stop = ':' in word or '.' in word 
-                        
-                        phrase_str = " ".join(current_phrase_words)
-                        val = get_gematria_value(phrase_str)
-                        
-                        if val > 0:
-                            str_val = str(val)
-                            if str_val not in gematria_db:
-                                gematria_db[str_val] = []
-                            
-                            # Deduplicate
-                            entry = {
-                                "phrase": phrase_str,
-                                "ref": f"{book} {chap_i+1}:{verse_i+1}",
-                                "context_en": clean_english,
-                                "isVerse": False
-                            }
-                            
-                            exists = any(x['phrase'] == phrase_str and x['ref'] == entry['ref'] for x in gematria_db[str_val])
-                            if not exists:
-                                gematria_db[str_val].append(entry)
-                        
-                        if has_stop: break
-
-    except Exception as e:
-        print(f"Error processing {book}: {e}")
+# Values per shard file, by gematria method: katan and ordinal values are
+# small, so their postings crowd into far fewer values
+SHARD_SIZES = {"standard": 100, "gadol": 100, "atbash": 100, "ordinal": 20, "katan": 5}
+SHARD_FILE = "shard-{method}-{key}.bin"
+DIRECTORY_FILE = "values-{method}.bin"  # sorted distinct values with posting counts
+CORPUS_FILE = "words.bin"  # every word with its value in every method, for span search
+TEXT_FILE = "text-{book}-{chapter}.bin"  # one chapter's verse text and words, shared by every shard
+# Postings held in memory before a sorted run is spilled to disk (see index_runs.py)
+MEMORY_BUDGET = int(os.environ.get("INDEX_MEMORY_BUDGET_MB", 64)) * 1024 * 1024
 
 # Save to PUBLIC folder (outside src) to avoid Webpack memory crash
-script_dir = os.path.dirname(os.path.abspath(__file__))
-# Pointing to public/torah_index.json
-output_path = os.path.join(script_dir, '..', 'public', 'torah_index.json')
-print(f"Saving to {output_path}...")
-with open(output_path, 'w', encoding='utf-8') as f:
-    json.dump(gematria_db, f, ensure_ascii=False)
-print("Done!")
\ No newline at end of file
+OUTPUT_DIR = os.path.join(OUTPUT_ROOT, 'public', 'torah_index')
+
+LEGACY_FILE_RE = re.compile(r"^(shard-\d+|values)\.bin$")
+
+NUMPY_TYPES = {"u32": "<u4", "u16": "<u2"}
+
+
+def column(values, kind):
+    """Raw little-endian bytes of a numpy column, for IndexWriter.add_array."""
+    return np.asarray(values).astype(NUMPY_TYPES[kind]).tobytes()
+
+
+class IndexStage(Stage):
+    name = "index"
+    sources = ("artifacts.py", "gematria_engine.py", "index_format.py", "index_runs.py", "verse_ids.py")
+
+    def __init__(self, max_phrase_length=MAX_PHRASE_LENGTH, memory_budget=MEMORY_BUDGET):
+        self.max_phrase_length = max_phrase_length
+        self.memory_budget = memory_budget
+
+    @property
+    def outputs(self):
+        """The manifest and every file it names, so a deleted shard or text file forces a rerun."""
+        manifest = self.load_manifest(OUTPUT_DIR)
+        names = [name for files in manifest.get("text", {}).values() for name in files if name]
+        names += [m["directory"]["file"] for m in manifest.get("methods", {}).values()]
+        names += [s["file"] for m in manifest.get("methods", {}).values() for s in m["shards"].values()]
+        if "corpus" in manifest:
+            names.append(manifest["corpus"]["file"])
+        return (os.path.join(OUTPUT_DIR, "manifest.json"),) + tuple(os.path.join(OUTPUT_DIR, n) for n in names)
+
+    def config(self):
+        return {"max_phrase_length": self.max_phrase_length, "books": BOOKS_TO_INDEX, "shard_sizes": SHARD_SIZES}
+
+    def process_chapter(self, chapter):
+        # Postings are rows of (value, verse_in_chapter, word_start, word_len); word_len 0 = whole verse.
+        # Every gematria method gets its own postings over the same windows.
+        fragment = {"verses": [], "verse_count": len(chapter.verses),
+                    "postings": {method: np.zeros((0, 4), dtype=np.int64) for method in METHODS}}
+        if chapter.book not in BOOKS_TO_INDEX:
+            return fragment
+
+        for verse in chapter.verses:
+            fragment["verses"].append((verse.he, verse.en, verse.words))
+        encoded = encode([verse.words for verse in chapter.verses])
+        fragment["word_values"] = encoded.method_word_values()
+        # One row per method: all methods come out of the same letter stream
+        prefix = encoded.method_prefixes()
+        verse_of_word = encoded.verse_of_word()
+        verse_start = encoded.verse_offsets[:-1]
+
+        # --- 1. INDEX THE WHOLE VERSE (PASUK) ---
+        verse_values = encoded.verse_values(prefix)
+        n_verses = verse_values.shape[1]
+        columns = [(verse_values, np.arange(n_verses), np.zeros(n_verses, dtype=np.int64), 0)]
+
+        # --- 2. INDEX PHRASES (SLIDING WINDOW) ---
+        # Every window length is one prefix-sum difference over the chapter.
+        # A phrase repeated within a verse is kept at its first position only.
+        word_ids = {}
+        ids = np.array([word_ids.setdefault(w, len(word_ids)) for v in chapter.verses for w in v.words],
+                       dtype=np.int64)
+        for length in range(1, self.max_phrase_length + 1):
+            starts, values = encoded.windows(length, prefix)
+            if len(starts) == 0:
+                continue
+            verse = verse_of_word[starts]
+            rows = np.column_stack([verse] + [ids[starts + k] for k in range(length)])
+            _, first = np.unique(rows, axis=0, return_index=True)
+            first.sort()
+            columns.append((values[:, first], verse[first], starts[first] - verse_start[verse[first]], length))
+
+        values = np.concatenate([c[0] for c in columns], axis=1)
+        windows = np.column_stack([
+            np.concatenate([c[1] for c in columns]),
+            np.concatenate([c[2] for c in columns]),
+            np.concatenate([np.full(len(c[1]), c[3], dtype=np.int64) for c in columns]),
+        ])
+        # Verse order, then window start, then window length (whole verse first)
+        order = np.lexsort((windows[:, 2], windows[:, 1], windows[:, 0]))
+        for m, method in enumerate(METHODS):
+            postings = np.column_stack([values[m], windows])[order]
+            fragment["postings"][method] = postings[postings[:, 0] > 0]
+        return fragment
+
+    @staticmethod
+    def group_phrases(postings, post_verse, verse_word_offsets, verse_words):
+        """(order, group_offsets) putting each value's postings into phrase groups.
+
+        postings[order] keeps the value order, but within a value the postings
+        of one phrase (the same words, in any verse) are contiguous, the most
+        frequent phrase first and ties by first occurrence; corpus order
+        within a group. Group g is postings[order][group_offsets[g]:group_offsets[g + 1]].
+        A whole verse is a group of its own.
+        """
+        lengths = postings[:, 3]
+        base = verse_word_offsets[post_verse] + postings[:, 2]
+        keys = [postings[:, 0], lengths, np.where(lengths == 0, postings[:, 1], -1)]
+        for k in range(int(lengths.max(initial=0))):
+            has_word = lengths > k
+            keys.append(np.where(has_word, verse_words[np.where(has_word, base + k, 0)], -1))
+        _, first, inverse, counts = np.unique(np.column_stack(keys), axis=0, return_index=True,
+                                              return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        group_first = first[inverse]
+        order = np.lexsort((np.arange(len(postings)), group_first, -counts[inverse], postings[:, 0]))
+        starts = np.flatnonzero(np.diff(group_first[order])) + 1
+        return order, np.concatenate([[0], starts, [len(postings)]])
+
+    def write_shard(self, path, corpus, postings, meta):
+        # The corpus's interned words only group equal phrases: the shard
+        # itself stores global verse ids, and the text lives once in the
+        # chapter text files
+        order, group_offsets = self.group_phrases(postings, postings[:, 1], corpus["verse_offsets"], corpus["words"])
+        postings = postings[order]
+        values, value_offsets = np.unique(postings[:, 0], return_index=True)
+        value_offsets = np.append(value_offsets, len(postings))
+
+        with IndexWriter(path, meta) as w:
+            w.add_array("values", "u32", column(values, "u32"))
+            w.add_array("value_offsets", "u32", column(value_offsets, "u32"))
+            w.add_array("group_offsets", "u32", column(group_offsets, "u32"))
+            w.add_array("post_verse", "u32", column(corpus["verse_id"][postings[:, 1]], "u32"))
+            w.add_array("post_start", "u16", column(postings[:, 2], "u16"))
+            w.add_array("post_len", "u16", column(postings[:, 3], "u16"))
+
+    def write_text(self, path, chapter, verses):
+        """text-<book>-<chapter>.bin: the chapter's (he, en, words) verses (index_format.VerseText)."""
+        word_ids = {}
+        verse_word_offsets, verse_words = [0], []
+        for _, _, words in verses:
+            verse_words.extend(word_ids.setdefault(w, len(word_ids)) for w in words)
+            verse_word_offsets.append(len(verse_words))
+        # No global ids inside: editing one chapter never changes another's file
+        with IndexWriter(path, {"book": chapter.book, "chapter": chapter.number}) as w:
+            w.add_strings("verse_he", (he for he, _, _ in verses))
+            w.add_strings("verse_en", (en for _, en, _ in verses))
+            w.add_strings("word", word_ids)
+            w.add_array("verse_word_offsets", "u32", verse_word_offsets)
+            w.add_array("verse_words", "u32", verse_words)
+
+    def write_directory(self, path, values, counts):
+        """values.bin: every distinct value with its posting count, sorted."""
+        meta = {"books": BOOKS_TO_INDEX, "max_phrase_length": self.max_phrase_length}
+        with IndexWriter(path, meta) as w:
+            w.add_array("values", "u32", column(values, "u32"))
+            w.add_array("counts", "u32", column(counts, "u32"))
+
+    def write_corpus(self, path, corpus):
+        """words.bin: every indexed word in corpus order with its values (index_format.WordCorpus).
+
+        Columns are copied out of the WordStream a chunk at a time."""
+        def chunks(name, kind):
+            return (column(chunk, kind) for chunk in corpus.chunks(name))
+
+        meta = {"books": BOOKS_TO_INDEX}
+        with IndexWriter(path, meta) as w:
+            w.add_strings("word", corpus.vocabulary)
+            w.add_chunks("words", "u32", chunks("words", "u32"))
+            for method in METHODS:
+                w.add_chunks(f"word_value.{method}", "u16", chunks(f"word_value.{method}", "u16"))
+            w.add_chunks("verse_id", "u32", chunks("verse_id", "u32"))
+            w.add_chunks("verse_word_offsets", "u32", chunks("verse_offsets", "u32"))
+        return corpus.n_words
+
+    @staticmethod
+    def verse_hash(words):
+        """64-bit digest of a verse's words, for shard_source."""
+        return int.from_bytes(hashlib.blake2b("\x1f".join(words).encode("utf-8"), digest_size=8).digest(), "little")
+
+    @staticmethod
+    def shard_source(fingerprint, meta, rows, corpus):
+        """Digest of everything a shard is written from: the stage's code and
+        config, its meta, its postings and the words of their verses."""
+        digest = hashlib.sha256(fingerprint.encode("utf-8"))
+        digest.update(json.dumps(meta, sort_keys=True).encode("utf-8"))
+        for values in (rows[:, 0], corpus["verse_id"][rows[:, 1]], rows[:, 2], rows[:, 3]):
+            digest.update(np.ascontiguousarray(values, dtype=np.int64).tobytes())
+        digest.update(np.ascontiguousarray(corpus["verse_hash"][rows[:, 1]]).tobytes())
+        return digest.hexdigest()[:32]
+
+    @staticmethod
+    def store_file(output_dir, name, write):
+        """Runs write(tmp_path), then stores the file content-hashed; returns (file name, bytes, result)."""
+        tmp_path = os.path.join(output_dir, name + ".tmp")
+        result = write(tmp_path)
+        with open(tmp_path, "rb") as f:
+            data = f.read()
+        os.remove(tmp_path)
+        return store(output_dir, name, data), len(data), result
+
+    def write_method(self, output_dir, method, corpus, shard_postings, previous):
+        """Writes one method's shards and value directory; returns its manifest entry.
+
+        shard_postings yields (key, rows) in value order. previous is the
+        method's "shards" in the last manifest: a shard whose source digest is
+        unchanged (and whose file is still there) is reused as is, not rebuilt.
+        """
+        shard_size = SHARD_SIZES[method]
+        fingerprint = self.fingerprint()
+        shards = {}
+        total = written = 0
+        directory_values, directory_counts = [], []
+        for key, rows in shard_postings:
+            lo, hi = key * shard_size, (key + 1) * shard_size - 1
+            meta = {"books": BOOKS_TO_INDEX, "max_phrase_length": self.max_phrase_length,
+                    "method": method, "value_range": [lo, hi]}
+            source = self.shard_source(fingerprint, meta, rows, corpus)
+            values, counts = np.unique(rows[:, 0], return_counts=True)
+            old = previous.get(str(key))
+            if old and old.get("source") == source and os.path.exists(os.path.join(output_dir, old["file"])):
+                shards[str(key)] = old
+            else:
+                file_name, size, _ = self.store_file(
+                    output_dir, SHARD_FILE.format(method=method, key=key),
+                    lambda path: self.write_shard(path, corpus, rows, meta))
+                shards[str(key)] = {
+                    "file": file_name, "min": lo, "max": hi,
+                    "values": len(values), "postings": len(rows), "bytes": size, "source": source
+                }
+                written += 1
+            directory_values.append(values)
+            directory_counts.append(counts)
+            total += len(rows)
+        print(f"  {method}: {written} of {len(shards)} shards changed")
+
+        # Shards arrive in value order, so the concatenation is already sorted
+        values = np.concatenate(directory_values) if directory_values else np.zeros(0, dtype=np.int64)
+        counts = np.concatenate(directory_counts) if directory_counts else np.zeros(0, dtype=np.int64)
+        directory_file, directory_size, _ = self.store_file(
+            output_dir, DIRECTORY_FILE.format(method=method), lambda path: self.write_directory(path, values, counts))
+        return {
+            "shard_size": shard_size,
+            "postings": total,
+            "directory": {"file": directory_file, "values": len(values), "bytes": directory_size},
+            "shards": shards
+        }
+
+    @staticmethod
+    def load_manifest(output_dir):
+        """The manifest of the last build, or {} if there is none."""
+        try:
+            with open(os.path.join(output_dir, "manifest.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def write(self, output_dir, corpus, verse_table, method_postings, texts):
+        """Writes every method's shards and value directory, the word corpus and the manifest.
+
+        method_postings maps each method to its (key, rows) shards, in value order.
+        texts maps each book to its chapters' text file names (None for a
+        chapter that wasn't read), already written by finish().
+
+        corpus (a WordStream) maps a row's verse (its position in the corpus)
+        to the global verse id the shards store, Chapter.first_index-based like
+        parshas.js; verse_table (a VerseTable) goes into the manifest to decode
+        them. Its verse hashes (verse_hash) let a rebuild tell which shards
+        changed: only those are rebuilt and rewritten.
+        Every binary file gets a content-hashed name (artifacts.py),
+        so an unchanged shard keeps its name and its browser cache entry.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        previous = self.load_manifest(output_dir).get("methods", {})
+        methods = {method: self.write_method(output_dir, method, corpus, shard_postings,
+                                             previous.get(method, {}).get("shards", {}))
+                   for method, shard_postings in method_postings.items()}
+        corpus_file, corpus_size, n_words = self.store_file(
+            output_dir, CORPUS_FILE, lambda path: self.write_corpus(path, corpus))
+
+        manifest = {
+            "version": 4,
+            "books": BOOKS_TO_INDEX,
+            "max_phrase_length": self.max_phrase_length,
+            "verses": len(corpus),
+            "verse_table": verse_table.to_json(),
+            "corpus": {"file": corpus_file, "words": n_words, "bytes": corpus_size},
+            "text": texts,
+            "default_method": DEFAULT_METHOD,
+            "methods": methods
+        }
+        # Drop old versions of the shards and ranges that no longer occur
+        prune(output_dir, [s["file"] for m in methods.values() for s in m["shards"].values()], prefix="shard-")
+        prune(output_dir, [m["directory"]["file"] for m in methods.values()], prefix="values")
+        prune(output_dir, [corpus_file], prefix="words.")
+        prune(output_dir, [name for files in texts.values() for name in files if name], prefix="text-")
+        for name in os.listdir(output_dir):
+            if LEGACY_FILE_RE.match(name):  # un-hashed names from older builds
+                os.remove(os.path.join(output_dir, name))
+        manifest_path = os.path.join(output_dir, "manifest.json")
+        write_if_changed(manifest_path, json.dumps(manifest, separators=(',', ':')))
+        publish([manifest_path])
+        return manifest
+
+    def finish(self, results):
+        # Streamed: fragments are consumed one at a time, postings spill to
+        # sorted runs on disk (one set per method) and the words go to a
+        # memmapped WordStream, so memory is bounded by memory_budget, the
+        # largest shard and the vocabulary rather than by the corpus size.
+        with tempfile.TemporaryDirectory(prefix="gematria-index-") as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, "corpus"))
+            corpus = WordStream(os.path.join(tmp_dir, "corpus"), METHODS)
+            runs = {}
+            for method in METHODS:
+                os.makedirs(os.path.join(tmp_dir, method))
+                runs[method] = SortedRuns(os.path.join(tmp_dir, method), self.memory_budget // len(METHODS))
+            chapter_counts = []
+            texts = {}
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+            for chapter, fragment in results:
+                chapter_counts.append((chapter.book, chapter.number, fragment["verse_count"]))
+                if fragment["verses"]:
+                    # Verse text is stored once, in its chapter's file; shards only hold verse ids
+                    files = texts.setdefault(chapter.book, [])
+                    files.extend([None] * (chapter.number - 1 - len(files)))
+                    files.append(self.store_file(
+                        OUTPUT_DIR, TEXT_FILE.format(book=chapter.book, chapter=chapter.number),
+                        lambda path: self.write_text(path, chapter, fragment["verses"]))[0])
+                for method, postings in fragment["postings"].items():
+                    postings = postings.copy()
+                    postings[:, 1] += len(corpus)
+                    runs[method].add(postings)
+                if fragment["verses"]:
+                    word_values = fragment["word_values"]
+                    if word_values.size and word_values.max() > 0xFFFF:
+                        raise ValueError("word value does not fit the u16 word_value columns")
+                    words = [w for _, _, w in fragment["verses"]]
+                    corpus.add_chapter(chapter.first_index, words, [self.verse_hash(w) for w in words],
+                                       dict(zip(METHODS, word_values)))
+            corpus.close_writer()
+            for method_runs in runs.values():
+                method_runs.spill()
+
+            print(f"Saving {runs[DEFAULT_METHOD].total} postings per method over {len(corpus)} verses "
+                  f"({len(METHODS)} methods) to {OUTPUT_DIR}...")
+            manifest = self.write(OUTPUT_DIR, corpus, VerseTable.from_chapters(chapter_counts),
+                                  {method: runs[method].shards(SHARD_SIZES[method]) for method in METHODS}, texts)
+            corpus.close()
+        for method, info in manifest["methods"].items():
+            total = sum(s["bytes"] for s in info["shards"].values())
+            print(f"  {method}: {len(info['shards'])} shards, {total / 1e6:.1f} MB, "
+                  f"{info['directory']['values']} distinct values")
+        print(f"Done! {manifest['corpus']['words']} words in {CORPUS_FILE}, "
+              f"text in {sum(len(files) for files in texts.values())} chapter files")
+
+if __name__ == "__main__":
+    print("Starting Indexing Process...")
+    run_stages([IndexStage()])
@@ -1,99 +1,115 @@
-import requests
 import json
-import time
+import os
+
+from pipeline import OUTPUT_ROOT, Stage, run_stages, write_if_changed
+from sefaria_cache import SefariaCache
 
 # CONFIGURATION
 BOOKS = ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"]
-parsha_list = []
+
+OUTPUT_PATH = os.path.join(OUTPUT_ROOT, 'src', 'utils', 'parshas.js')
+
 
 def parse_ref(ref_str):
     # Splits "Genesis 1:1-6:8" into book, start, end
     parts = ref_str.split(maxsplit=1)
     book = parts[0]
     ranges = parts[1]
-    
+
     if '-' in ranges:
         start_str, end_str = ranges.split('-')
     else:
         start_str, end_str = ranges, ranges
-        
+
     def get_cv(s):
         if ':' in s:
             return [int(x) for x in s.split(':')]
         else:
-            return [int(s), 1] 
+            return [int(s), 1]
 
-    return book, get_cv(start_str), get_cv(end_str)
+    start = get_cv(start_str)
+    if ':' in start_str and ':' not in end_str:
+        # "Deuteronomy 31:1-30" ends inside the same chapter
+        return book, start, [start[0], int(end_str)]
+    return book, start, get_cv(end_str)
 
-def get_verse_count(ref):
-    """
-    Fetches the text from Sefaria to count the total verses in this range.
+
+def load_parsha_definitions(cache):
+    parshas = []
+    for book in BOOKS:
+        data = cache.index(book)
+
+        parasha_nodes = []
+        if 'alts' in data and 'Parasha' in data['alts']:
+            parasha_nodes = data['alts']['Parasha']['nodes']
+
+        for node in parasha_nodes:
+            if 'wholeRef' in node:
+                # Get Title
+                primary_title = next((t['text'] for t in node['titles'] if t.get('primary')), node['titles'][0]['text'])
+
+                # Parse Range
+                book_name, start, end = parse_ref(node['wholeRef'])
+                parshas.append({"name": primary_title, "book": book_name, "start": start, "end": end})
+    return parshas
+
+
+def verse_range(chapters, book, start, end):
+    """Global ids of the parsha's first and last verse.
+
+    chapters maps (book, chapter) to (first_index, verse count); ids are
+    Chapter.first_index-based, the same ids the index shards store. Raises
+    KeyError if a chapter of the range wasn't read.
     """
-    try:
-        url = f"https://www.sefaria.org/api/texts/{ref}?context=0&pad=0"
-        response = requests.get(url)
-        data = response.json()
-        
-        # Sefaria returns text as a Jagged Array (Chapters -> Verses)
-        # We flatten it to count the total verses.
-        count = 0
-        text_data = data.get('he', [])
-        
-        if isinstance(text_data, list):
-            # Check if it's 1D (just verses) or 2D (chapters of verses)
-            if len(text_data) > 0 and isinstance(text_data[0], list):
-                # 2D Array: List of Chapters
-                for chapter in text_data:
-                    count += len(chapter)
-            else:
-                # 1D Array: List of Verses (single chapter parsha)
-                count = len(text_data)
-                
-        return count
-    except Exception as e:
-        print(f"Error counting {ref}: {e}")
-        return 0
-
-print("Fetching Parsha definitions and counting verses (this may take 30 seconds)...")
-
-for book in BOOKS:
-    url = f"https://www.sefaria.org/api/index/{book}"
-    data = requests.get(url).json()
-    
-    parasha_nodes = []
-    if 'alts' in data and 'Parasha' in data['alts']:
-        parasha_nodes = data['alts']['Parasha']['nodes']
-        
-    for node in parasha_nodes:
-        if 'wholeRef' in node:
-            ref = node['wholeRef']
-            
-            # Get Title
-            primary_title = next((t['text'] for t in node['titles'] if t.get('primary')), node['titles'][0]['text'])
-            
-            # Parse Range
-            book_name, start, end = parse_ref(ref)
-            
-            # Get Count
-            print(f"  Counting {primary_title}...")
-            v_count = get_verse_count(ref)
-            
-            parsha_list.append({
-                "name": primary_title,
-                "book": book_name,
-                "start": start,
-                "end": end,
-                "verse_count": v_count  # <--- NEW FIELD
-            })
-            
-            # Sleep briefly to be polite to the API
-            time.sleep(0.2)
-
-# Save to JS file
-output_path = './src/utils/parshas.js'
-js_content = f"export const PARSHAS = {json.dumps(parsha_list, indent=2)};"
-
-with open(output_path, 'w', encoding='utf-8') as f:
-    f.write(js_content)
-
-print(f"Saved parshas.js to {output_path}")
\ No newline at end of file
+    first_index, _ = chapters[(book, start[0])]
+    end_index, length = chapters[(book, end[0])]
+    return first_index + start[1] - 1, end_index + min(end[1], length) - 1
+
+
+class ParshaStage(Stage):
+    name = "parshas"
+    outputs = (OUTPUT_PATH,)
+
+    def __init__(self, cache=None):
+        self.cache = cache or SefariaCache()
+
+    def __getstate__(self):
+        # Pool workers only run process_chapter, which doesn't need the cache
+        return {**self.__dict__, "cache": None}
+
+    def config(self):
+        # The parsha boundaries come from the books' index entries, not the chapters
+        return {book: self.cache.object_hash("index", book) for book in BOOKS}
+
+    def process_chapter(self, chapter):
+        return len(chapter.verses)
+
+    def finish(self, results):
+        chapters = {(chapter.book, chapter.number): (chapter.first_index, n) for chapter, n in results}
+
+        parsha_list = []
+        skipped = []
+        for parsha_id, parsha in enumerate(load_parsha_definitions(self.cache)):
+            # Derived locally from the verse stream (no extra API calls)
+            try:
+                first, last = verse_range(chapters, parsha["book"], parsha["start"], parsha["end"])
+            except KeyError as e:
+                # A chapter failed to load; the other parshas are still right
+                print(f"  [SKIPPED] {parsha['name']}: chapter {e} was not read")
+                skipped.append(parsha["name"])
+                continue
+            parsha_list.append({"id": parsha_id, **parsha, "first_verse": first, "last_verse": last,
+                                "verse_count": last - first + 1})
+
+        # Save to JS file
+        js_content = f"export const PARSHAS = {json.dumps(parsha_list, indent=2)};"
+        write_if_changed(OUTPUT_PATH, js_content)
+
+        print(f"Saved {len(parsha_list)} parshas to {OUTPUT_PATH}")
+        if skipped:
+            print(f"[!] WARNING: {len(skipped)} parshas skipped ({', '.join(skipped)}). Run the build again to fix the gaps.")
+
+
+if __name__ == "__main__":
+    print("Loading Parsha definitions and counting verses...")
+    run_stages([ParshaStage()])
@@ -1,143 +1,150 @@
-import requests
 import json
 import os
-import re
-import sys
-import time
+
+from hebrew import letters_only
+from pipeline import OUTPUT_ROOT, Stage, run_stages, write_if_changed
 
 # CONFIGURATION
-MIN_WORD_LENGTH = 2 
+MIN_WORD_LENGTH = 2
+LEADERBOARD_SIZE = 20
 
 # STRICT GRAMMAR PREFIXES (Same as Frontend)
 VALID_PREFIXES = {
-    "ו", "ה", "ב", "כ", "ל", "מ", "ש", 
-    "וה", "וב", "וכ", "ול", "ומ", "וש", 
-    "שב", "שכ", "של", "שמ",             
-    "כש", "מש", "בש"                    
+    "ו", "ה", "ב", "כ", "ל", "מ", "ש",
+    "וה", "וב", "וכ", "ול", "ומ", "וש",
+    "שב", "שכ", "של", "שמ",
+    "כש", "מש", "בש"
 }
 
-def clean_hebrew(text):
-    # STEP 1: Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-
-    # STEP 2: Replace Maqqef (Hebrew Hyphen) & standard hyphen with SPACE
-    text = text.replace('־', ' ').replace('-', ' ')
-
-    # STEP 3: Remove Vowels & Cantillation (Range 0591-05C7)
-    text = re.sub(r'[\u0591-\u05C7]', '', text)
-
-    # STEP 4: Replace any remaining non-Hebrew characters with SPACE
-    # This prevents merging words like "Lahem[Moshe]" -> "LahemMoshe"
-    text = re.sub(r'[^\u05D0-\u05EA\s]', ' ', text)
-    
-    return text
-
-# 1. LOAD RACERS
 script_dir = os.path.dirname(os.path.abspath(__file__))
-common_path = os.path.join(script_dir, '..', 'src', 'data', 'common_gematria.json')
-
-with open(common_path, 'r', encoding='utf-8') as f:
-    common_data = json.load(f)
-
-words_to_track = set()
-for val, list_of_words in common_data.items():
-    for entry in list_of_words:
-        raw = entry.split('(')[0].strip()
-        clean = clean_hebrew(raw)
-        # Use regex to strip spaces from the racer word itself
-        clean = re.sub(r'\s+', '', clean)
-        if clean and len(clean) >= MIN_WORD_LENGTH:
-            words_to_track.add(clean)
-
-print(f"Tracking {len(words_to_track)} words...")
-
-# 2. SCAN TORAH
-BOOKS_STRUCTURE = [
-    ("Genesis", 50),
-    ("Exodus", 40),
-    ("Leviticus", 27),
-    ("Numbers", 36),
-    ("Deuteronomy", 34)
-]
-
-race_timeline = []
-global_counts = {w: {'exact': 0, 'prefix': 0} for w in words_to_track}
-
-print("Scanning Torah (Chapter by Chapter)...")
-
-for book, total_chapters in BOOKS_STRUCTURE:
-    print(f"\nProcessing {book} ({total_chapters} chapters)...")
-    
-    for chapter_num in range(1, total_chapters + 1):
-        url = f"https://www.sefaria.org/api/texts/{book}.{chapter_num}?context=0"
-        
-        success = False
-        for attempt in range(5):
-            try:
-                response = requests.get(url, timeout=30)
-                if response.status_code == 200:
-                    success = True
-                    break
-            except:
-                time.sleep(2)
-        
-        if not success:
-            print(f"  [FAILED] Could not fetch {book} Ch {chapter_num}")
-            continue
-
-        try:
-            data = response.json()
-            he_text = data['he']
-            
-            sys.stdout.write(".")
-            sys.stdout.flush()
-
-            for verse in he_text:
-                clean_verse = clean_hebrew(verse)
-                # Split by space to get individual words
-                verse_words = clean_verse.split()
-                
-                for w in verse_words:
-                    for target in words_to_track:
-                        
-                        # 1. EXACT MATCH
-                        if w == target:
-                            global_counts[target]['exact'] += 1
-                            global_counts[target]['prefix'] += 1 
-                        
-                        # 2. PREFIX MATCH (Strict Grammar Check)
-                        elif w.endswith(target):
-                            prefix = w[:-len(target)]
-                            if prefix in VALID_PREFIXES:
-                                global_counts[target]['prefix'] += 1
+COMMON_PATH = os.path.join(script_dir, '..', 'src', 'data', 'common_gematria.json')
+OUTPUT_PATH = os.path.join(OUTPUT_ROOT, 'src', 'data', 'race_data.json')
+
+
+def load_racers(common_path=COMMON_PATH):
+    with open(common_path, 'r', encoding='utf-8') as f:
+        common_data = json.load(f)
+
+    words_to_track = set()
+    for val, list_of_words in common_data.items():
+        for entry in list_of_words:
+            # The Hebrew of "<hebrew> (<english>)", letters only, as build_common.py dedupes it
+            clean = letters_only(entry.split('(')[0])
+            if clean and len(clean) >= MIN_WORD_LENGTH:
+                words_to_track.add(clean)
+    return words_to_track
+
+
+class RacerMatcher:
+    """Resolves a Torah word to the racers it counts for, without scanning every racer.
+
+    A word matches a racer exactly, or as the racer plus one of the
+    VALID_PREFIXES. Prefixes are at most MAX_PREFIX_LENGTH letters, so the only
+    candidates are the word itself and its suffixes after dropping 1..N
+    letters: a few set lookups per word, however many racers there are.
+    """
+
+    def __init__(self, targets):
+        self.targets = set(targets)
+        self.max_prefix_length = max(len(p) for p in VALID_PREFIXES)
+        self.memo = {}
+
+    def match(self, word):
+        """[(target, is_exact)] for every racer `word` counts toward."""
+        found = self.memo.get(word)
+        if found is None:
+            found = []
+            # 1. EXACT MATCH
+            if word in self.targets:
+                found.append((word, True))
+            # 2. PREFIX MATCH (Strict Grammar Check)
+            for k in range(1, min(self.max_prefix_length, len(word) - 1) + 1):
+                if word[:k] in VALID_PREFIXES and word[k:] in self.targets:
+                    found.append((word[k:], False))
+            self.memo[word] = found
+        return found
+
+
+class Leaderboard:
+    """Top-`size` racers by prefix count, ties broken by name.
+
+    Counts only ever grow, so a racer that was outside the board and didn't
+    change can't have overtaken anyone on it. Each update therefore ranks
+    just the previous board plus the racers that moved this chapter.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.top = []
+
+    def update(self, global_counts, changed):
+        candidates = set(self.top).union(changed)
+        ranked = sorted((w for w in candidates if global_counts[w][1] > 0),
+                        key=lambda w: (-global_counts[w][1], w))
+        self.top = ranked[:self.size]
+        return self.top
+
+
+class RaceStage(Stage):
+    name = "race"
+    outputs = (OUTPUT_PATH,)
+
+    def __init__(self, words_to_track=None):
+        self.words_to_track = words_to_track if words_to_track is not None else load_racers()
+        self.matcher = RacerMatcher(self.words_to_track)
+        print(f"Tracking {len(self.words_to_track)} words...")
+
+    def config(self):
+        return {"racers": sorted(self.words_to_track), "leaderboard_size": LEADERBOARD_SIZE}
+
+    def process_chapter(self, chapter):
+        # Per-chapter counts {word: [exact, prefix]}, only for words that moved
+        counts = {}
+        for verse in chapter.verses:
+            for w in verse.words:
+                for target, is_exact in self.matcher.match(w):
+                    c = counts.setdefault(target, [0, 0])
+                    if is_exact:
+                        c[0] += 1
+                    c[1] += 1
+        return counts
+
+    def finish(self, results):
+        # Frames are deltas against the previous frame's leaderboard:
+        #   {"names": [...], "frames": [{"v": verse_id, "s": [[name_id, exact, prefix], ...], "d": [name_id, ...]}]}
+        # "v" is the global verse id of the chapter's first verse (the label
+        # comes from verseIds.js), "s" sets entries that entered or changed,
+        # "d" drops entries that left.
+        name_ids = {}
+        frames = []
+        global_counts = {}
+        leaderboard = Leaderboard(LEADERBOARD_SIZE)
+        previous = {}
+
+        for chapter, counts in results:
+            for word, (exact, prefix) in counts.items():
+                c = global_counts.setdefault(word, [0, 0])
+                c[0] += exact
+                c[1] += prefix
 
             # Snapshot for Leaderboard (Top 20)
-            sorted_leaderboard = sorted(
-                global_counts.items(), 
-                key=lambda item: item[1]['prefix'], 
-                reverse=True
-            )[:20]
-            
-            frame_data = []
-            for word, counts in sorted_leaderboard:
-                if counts['prefix'] > 0:
-                    frame_data.append({
-                        "name": word,
-                        "exact": counts['exact'],
-                        "prefix": counts['prefix']
-                    })
-
-            race_timeline.append({
-                "label": f"{book} Ch.{chapter_num}",
-                "data": frame_data
-            })
-            
-        except Exception as e:
-            print(f"  [ERROR] {e}")
-
-# 3. SAVE
-output_path = os.path.join(script_dir, '..', 'src', 'data', 'race_data.json')
-print(f"\n\nSaving to {output_path}...")
-with open(output_path, 'w', encoding='utf-8') as f:
-    json.dump(race_timeline, f, ensure_ascii=False)
-print("[SUCCESS] Race data updated.")
\ No newline at end of file
+            current = {word: tuple(global_counts[word]) for word in leaderboard.update(global_counts, counts)}
+
+            frame = {"v": chapter.first_index}
+            changed = [w for w in current if previous.get(w) != current[w]]
+            if changed:
+                frame["s"] = [[name_ids.setdefault(w, len(name_ids)), *current[w]] for w in changed]
+            dropped = [name_ids[w] for w in previous if w not in current]
+            if dropped:
+                frame["d"] = dropped
+            frames.append(frame)
+            previous = current
+
+        names = list(name_ids)
+        print(f"Saving to {OUTPUT_PATH}...")
+        write_if_changed(OUTPUT_PATH, json.dumps({"names": names, "frames": frames}, ensure_ascii=False, separators=(',', ':')))
+        print("[SUCCESS] Race data updated.")
+
+if __name__ == "__main__":
+    print("Scanning Torah (Chapter by Chapter)...")
+    run_stages([RaceStage()])
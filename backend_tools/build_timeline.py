@@ -1,57 +1,36 @@
-import requests
 import json
 import os
-import time
 
-# CONFIGURATION
-BOOKS = ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"]
+from pipeline import OUTPUT_ROOT, Stage, run_stages, write_if_changed
+from verse_ids import VerseTable
 
-timeline = []
-global_verse_index = 0
+OUTPUT_PATH = os.path.join(OUTPUT_ROOT, 'src', 'data', 'verse_table.json')
+LEGACY_PATH = os.path.join(OUTPUT_ROOT, 'src', 'data', 'verse_timeline.json')
 
-print("Building Verse Timeline...")
 
-for book in BOOKS:
-    print(f"  Fetching {book} structure...")
-    # We fetch the structure from Sefaria
-    url = f"https://www.sefaria.org/api/texts/{book}?pad=0&context=0"
+class TimelineStage(Stage):
+    name = "timeline"
+    outputs = (OUTPUT_PATH,)
+    sources = ("verse_ids.py",)
 
-    try:
-        response = requests.get(url)
-        if response.status_code != 200:
-            print(f"    Error: Failed to fetch {book} (Status {response.status_code})")
-            continue
+    def process_chapter(self, chapter):
+        return len(chapter.verses)
 
-        data = response.json()
-        text = data['text'] # This is the structure (Chapters -> Verses)
+    def finish(self, results):
+        # Verse counts per chapter; src/utils/verseIds.js maps a global
+        # verse id to "Book C:V" (and back) from this alone
+        table = VerseTable.from_chapters((chapter.book, chapter.number, count) for chapter, count in results)
 
-        for chap_i, chapter in enumerate(text):
-            for verse_i, _ in enumerate(chapter):
-                global_verse_index += 1
+        print(f"Saving {len(table.chapters)} chapters ({len(table)} verses) to {OUTPUT_PATH}...")
 
-                # Create the standard ref: "Genesis 1:1"
-                ref = f"{book} {chap_i+1}:{verse_i+1}"
+        # Creates the directory if needed; skips the write if nothing changed
+        write_if_changed(OUTPUT_PATH, json.dumps(table.to_json(), separators=(',', ':')))
+        if os.path.exists(LEGACY_PATH):  # the per-verse {i, r, b} list older builds wrote
+            os.remove(LEGACY_PATH)
 
-                timeline.append({
-                    "i": global_verse_index,
-                    "r": ref,
-                    "b": book 
-                })
-        time.sleep(0.5) # Pause to be polite to the API
+        print("Done! Restart your React app now.")
 
-    except Exception as e:
-        print(f"    Critical Error on {book}: {e}")
 
-# Save
-script_dir = os.path.dirname(os.path.abspath(__file__))
-output_path = os.path.join(script_dir, '..', 'src', 'data', 'verse_timeline.json')
-
-print(f"Saving {len(timeline)} verses to {output_path}...")
-
-# Ensure directory exists
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-with open(output_path, 'w', encoding='utf-8') as f:
-    json.dump(timeline, f, separators=(',', ':'))
-
-print("Done! Restart your React app now.")
\ No newline at end of file
+if __name__ == "__main__":
+    print("Building Verse Table...")
+    run_stages([TimelineStage()])
@@ -1,108 +1,116 @@
-import requests
 import json
 import os
-import re
-import time
-import sys
-
-# Standard Chapter Counts
-BOOKS_STRUCTURE = [
-    ("Genesis", 50),
-    ("Exodus", 40),
-    ("Leviticus", 27),
-    ("Numbers", 36),
-    ("Deuteronomy", 34)
-]
-
-output_data = []
-missing_chapters = []
-
-def clean_hebrew(text):
-    # STEP 1: Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-
-    # STEP 2: Replace Maqqef (Hebrew Hyphen) & standard hyphen with SPACE
-    # CRITICAL: We do this FIRST so "Et-Moshe" becomes "Et Moshe" (Two words)
-    text = text.replace('־', ' ').replace('-', ' ')
-
-    # STEP 3: Remove Vowels & Cantillation (Range 0591-05C7)
-    # We delete these so letters connect (e.g. "L'Moshe" stays one word)
-    text = re.sub(r'[\u0591-\u05C7]', '', text)
-
-    # STEP 4: Replace any remaining non-Hebrew characters with SPACE
-    # This fixes the Numbers 32:33 "glitch" by turning hidden punctuation into a separator.
-    text = re.sub(r'[^\u05D0-\u05EA\s]', ' ', text)
-    
-    return text
-
-print("Fetching Torah text (Chapter by Chapter)...")
-
-global_index = 0
-
-for book, total_chapters in BOOKS_STRUCTURE:
-    print(f"\nProcessing {book} ({total_chapters} chapters)...")
-    
-    for chapter_num in range(1, total_chapters + 1):
-        url = f"https://www.sefaria.org/api/texts/{book}.{chapter_num}?context=0"
-        
-        success = False
-        for attempt in range(5):
-            try:
-                response = requests.get(url, timeout=30)
-                if response.status_code == 200:
-                    success = True
-                    break
-            except:
-                time.sleep(2)
-        
-        if not success:
-            print(f"  [FAILED] Could not fetch {book} Ch {chapter_num}")
-            missing_chapters.append(f"{book} {chapter_num}")
-            continue
-
-        try:
-            data = response.json()
-            he_text = data['he'] 
-            
-            sys.stdout.write(".")
-            sys.stdout.flush()
-
-            for v_i, verse in enumerate(he_text):
-                # Clean the text using the new CORRECT ORDER
-                clean = clean_hebrew(verse)
-                
-                # Collapse multiple spaces into one
-                clean = " ".join(clean.split())
-                
-                output_data.append({
-                    "b": book,
-                    "r": f"{book} {chapter_num}:{v_i+1}",
-                    "t": clean,
-                    "o": verse,
-                    "i": global_index
-                })
-                global_index += 1
-        except Exception as e:
-            print(f"\n  [ERROR] parsing {book} {chapter_num}: {e}")
-            missing_chapters.append(f"{book} {chapter_num}")
-            
-    time.sleep(0.5) 
+
+from artifacts import publish
+from pipeline import OUTPUT_ROOT, Stage, run_stages, write_if_changed
 
 # Save to PUBLIC folder
-script_dir = os.path.dirname(os.path.abspath(__file__))
-output_path = os.path.join(script_dir, '..', 'public', 'torah_text.json')
-
-print(f"\n\nSaving {len(output_data)} verses to {output_path}...")
-
-if len(missing_chapters) > 0:
-    print("\n[!] WARNING: The following chapters failed to download:")
-    for ch in missing_chapters:
-        print(f"   - {ch}")
-    print("[X] Please run the script again to fix the gaps.")
-elif len(output_data) < 5840:
-    print(f"[!] WARNING: Total verse count ({len(output_data)}) is lower than expected (5845).")
-else:
-    print("[SUCCESS] Full Torah downloaded (5845 verses).")
-
-with open(output_path, 'w', encoding='utf-8') as f:
-    json.dump(output_data, f, separators=(',', ':'), ensure_ascii=False)
\ No newline at end of file
+OUTPUT_PATH = os.path.join(OUTPUT_ROOT, 'public', 'torah_text.json')
+WORDS_PATH = os.path.join(OUTPUT_ROOT, 'public', 'torah_words.json')
+
+# Trend chart granularity: one point every SAMPLE_RATE verses (plus the last verse)
+SAMPLE_RATE = 50
+
+# STRICT PREFIXES (Same as TrendsView "Include Prefixes")
+TREND_PREFIXES = {
+    "ו", "ב", "כ", "ל", "מ",
+    "וב", "וכ", "ול", "ומ",
+    "ש"
+}
+
+
+def delta_encode(postings):
+    """Sorted verse indices -> gaps (a repeated verse is a gap of 0)."""
+    return [b - a for a, b in zip([0] + postings, postings)]
+
+
+def bucket_counts(postings, buckets):
+    """Cumulative occurrences (postings <= boundary) at each bucket boundary,
+    sparse: [bucket gap, count] for every bucket where the count changes."""
+    steps, last, k = [], -1, 0
+    for i, boundary in enumerate(buckets):
+        count = k
+        while k < len(postings) and postings[k] <= boundary:
+            k += 1
+        if k != count:
+            steps.append([i - last, k])
+            last = i
+    return steps
+
+
+def build_word_index(output_data):
+    """Inverted index of torah_text.json for TrendsView.
+
+    "exact" maps each word to the verse index of every occurrence, "stem"
+    maps a word to the occurrences where it follows one of TREND_PREFIXES.
+    Both are delta-encoded. "buckets" are the chart's sample points, and
+    "exact_counts" / "stem_counts" each word's cumulative count at every one
+    of them (bucket_counts), so the chart is read off directly. Every verse
+    is referred to by its global verse id.
+    """
+    exact, stem = {}, {}
+    max_prefix = max(len(p) for p in TREND_PREFIXES)
+    texts = output_data["t"]
+    for verse_id, text in enumerate(texts):
+        for w in text.split():
+            exact.setdefault(w, []).append(verse_id)
+            for k in range(1, min(max_prefix, len(w) - 1) + 1):
+                if w[:k] in TREND_PREFIXES:
+                    stem.setdefault(w[k:], []).append(verse_id)
+
+    buckets = list(range(0, len(texts), SAMPLE_RATE))
+    # Final bucket catches the last few verses (Deut 33-34)
+    if buckets and buckets[-1] < len(texts) - 1:
+        buckets.append(len(texts) - 1)
+
+    return {
+        "verses": len(texts),
+        "sample_rate": SAMPLE_RATE,
+        "buckets": buckets,
+        "exact": {w: delta_encode(p) for w, p in exact.items()},
+        "stem": {w: delta_encode(p) for w, p in stem.items()},
+        "exact_counts": {w: bucket_counts(p, buckets) for w, p in exact.items()},
+        "stem_counts": {w: bucket_counts(p, buckets) for w, p in stem.items()}
+    }
+
+
+class TorahTextStage(Stage):
+    name = "text"
+    outputs = (OUTPUT_PATH, WORDS_PATH)
+    sources = ("artifacts.py",)
+
+    def process_chapter(self, chapter):
+        # Words are already cleaned by the pipeline; join with single spaces
+        return [(" ".join(verse.words), verse.he) for verse in chapter.verses]
+
+    def finish(self, results):
+        # Parallel columns; a verse's position is its global verse id, which
+        # src/utils/verseIds.js turns into its ref and book
+        output_data = {"t": [], "o": []}
+
+        for chapter, verses in results:
+            for clean, original in verses:
+                output_data["t"].append(clean)
+                output_data["o"].append(original)
+
+        total = len(output_data["t"])
+        print(f"Saving {total} verses to {OUTPUT_PATH}...")
+
+        if total < 5840:
+            print(f"[!] WARNING: Total verse count ({total}) is lower than expected (5845).")
+        else:
+            print("[SUCCESS] Full Torah downloaded (5845 verses).")
+
+        write_if_changed(OUTPUT_PATH, json.dumps(output_data, separators=(',', ':'), ensure_ascii=False))
+
+        word_index = build_word_index(output_data)
+        print(f"Saving {len(word_index['exact'])} words ({len(word_index['stem'])} stems) to {WORDS_PATH}...")
+        write_if_changed(WORDS_PATH, json.dumps(word_index, separators=(',', ':'), ensure_ascii=False))
+
+        # Hashed, pre-compressed copies for the browser (see artifacts.py)
+        publish([OUTPUT_PATH, WORDS_PATH])
+
+
+if __name__ == "__main__":
+    print("Fetching Torah text (Chapter by Chapter)...")
+    run_stages([TorahTextStage()])
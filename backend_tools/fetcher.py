@@ -0,0 +1,182 @@
+"""
+Concurrent HTTP fetch layer for the Sefaria API.
+
+- One pooled requests.Session shared by N worker threads.
+- Token-bucket rate limit; a 429 halves the rate, successes slowly win it back.
+- Exponential backoff with full jitter (honours Retry-After, up to BACKOFF_MAX).
+- Progress / throughput reporting for batch fetches.
+
+Point `api_base` (or SEFARIA_API_BASE) at a local stub server to test it.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# CONFIGURATION
+CONCURRENCY = int(os.environ.get("SEFARIA_CONCURRENCY", 8))
+RATE_LIMIT = float(os.environ.get("SEFARIA_RATE_LIMIT", 10))   # requests per second
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket. `rate` tokens/s, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttle(self):
+        """Server pushed back: halve the rate (never below 0.5 req/s)."""
+        with self.lock:
+            self.rate = max(0.5, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def recover(self):
+        """Additive increase back toward the configured rate."""
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + 0.1 * self.max_rate)
+
+
+class Progress:
+    def __init__(self, total, stats, label="fetched"):
+        self.total = total
+        self.stats = stats
+        self.label = label
+        self.done = 0
+        self.start_bytes = stats["bytes"]
+        self.started = time.monotonic()
+        self.printed = 0.0
+        self.lock = threading.Lock()
+
+    def update(self):
+        with self.lock:
+            self.done += 1
+            now = time.monotonic()
+            if self.done < self.total and now - self.printed < 0.25:
+                return
+            self.printed = now
+            elapsed = max(now - self.started, 1e-6)
+            mb = (self.stats["bytes"] - self.start_bytes) / 1e6
+            sys.stdout.write(f"\r  {self.label} {self.done}/{self.total} "
+                             f"({self.done / elapsed:.1f}/s, {mb / elapsed:.2f} MB/s)")
+            sys.stdout.flush()
+
+    def close(self):
+        if self.total:
+            elapsed = time.monotonic() - self.started
+            print(f"\n  {self.done} items in {elapsed:.1f}s, {self.stats['retries']} retries")
+
+
+class Fetcher:
+    def __init__(self, concurrency=CONCURRENCY, rate_limit=RATE_LIMIT, max_retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, timeout=30):
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate_limit)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.stats = {"requests": 0, "bytes": 0, "retries": 0}
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            # Never let one response stall the build for longer than backoff_max
+            return min(max(retry_after, 0.0), self.backoff_max)
+        # Full jitter: uniform(0, base * 2^attempt), capped
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url, headers=None):
+        """GET with rate limiting and retries. Returns a 200/304 response or raises IOError."""
+        import requests
+
+        last_error = None
+        for attempt in range(self.max_retries):
+            if attempt:
+                with self._stats_lock:
+                    self.stats["retries"] += 1
+            self.bucket.acquire()
+            retry_after = None
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                with self._stats_lock:
+                    self.stats["requests"] += 1
+                    self.stats["bytes"] += len(response.content)
+                if response.status_code in (200, 304):
+                    self.bucket.recover()
+                    return response
+                last_error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRY_STATUS:
+                    break
+                if response.status_code == 429:
+                    self.bucket.throttle()
+                    try:
+                        retry_after = float(response.headers.get("Retry-After", ""))
+                    except ValueError:
+                        retry_after = None
+            except requests.RequestException as e:
+                last_error = e
+            if attempt < self.max_retries - 1:  # no point waiting after the last attempt
+                time.sleep(self._backoff(attempt, retry_after))
+        raise IOError(f"Could not fetch {url}: {last_error}")
+
+    def map(self, fn, items, label="fetched"):
+        """Runs fn(item) for every item with `concurrency` in flight.
+
+        Returns ({item: result}, {item: exception}).
+        """
+        results, errors = {}, {}
+        progress = Progress(len(items), self.stats, label)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(fn, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    results[item] = future.result()
+                except Exception as e:
+                    errors[item] = e
+                progress.update()
+        progress.close()
+        return results, errors
@@ -0,0 +1,115 @@
+"""
+Vectorized gematria over cleaned text.
+
+A run of verses is encoded once as a flat uint8 array of letter codes with
+word and verse boundary offsets:
+
+    codes          letter code of every letter (code point - ALEF), words concatenated
+    word_offsets   word w is codes[word_offsets[w]:word_offsets[w + 1]]
+    verse_offsets  verse v is words [verse_offsets[v], verse_offsets[v + 1])
+
+Every gematria method is a lookup table over the codes, so the word values of
+all methods are one gather plus one np.add.reduceat over the same stream.
+Every n-word phrase value is a difference of two entries of the prefix sum
+over word values, so phrase windows of any length cost the same vectorized
+pass.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from hebrew import DEFAULT_METHOD, GEMATRIA_METHODS
+
+ALEF = ord('א')
+N_CODES = ord('ת') - ALEF + 1
+METHODS = tuple(GEMATRIA_METHODS)
+# Letter value by method and code; the extra last code (anything outside
+# א-ת) is worth 0 in every method
+METHOD_TABLES = np.zeros((len(METHODS), N_CODES + 1), dtype=np.int64)
+for _m, _method in enumerate(METHODS):
+    for _char, _value in GEMATRIA_METHODS[_method].items():
+        METHOD_TABLES[_m, ord(_char) - ALEF] = _value
+
+
+def letter_codes(text):
+    """uint8 code of every character of `text` (N_CODES for non-letters)."""
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64) - ALEF
+    return np.where((codes >= 0) & (codes < N_CODES), codes, N_CODES).astype(np.uint8)
+
+
+def offsets(lengths):
+    out = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=out[1:])
+    return out
+
+
+@dataclass
+class Encoded:
+    codes: np.ndarray
+    word_offsets: np.ndarray
+    verse_offsets: np.ndarray
+
+    @property
+    def n_words(self):
+        return len(self.word_offsets) - 1
+
+    def method_word_values(self):
+        """int64 (methods, words): the value of every word in every method of METHODS."""
+        if self.n_words == 0:
+            return np.zeros((len(METHODS), 0), dtype=np.int64)
+        # Words are never empty, so reduceat's segments are all non-empty
+        return np.add.reduceat(METHOD_TABLES[:, self.codes], self.word_offsets[:-1], axis=1)
+
+    def word_values(self, method=DEFAULT_METHOD):
+        """int64 value of every word."""
+        if self.n_words == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.add.reduceat(METHOD_TABLES[METHODS.index(method)][self.codes], self.word_offsets[:-1])
+
+    def method_prefixes(self):
+        """(methods, words + 1): word_prefix() of every method, from one pass."""
+        values = self.method_word_values()
+        out = np.zeros((len(METHODS), self.n_words + 1), dtype=np.int64)
+        np.cumsum(values, axis=1, out=out[:, 1:])
+        return out
+
+    def word_prefix(self, method=DEFAULT_METHOD):
+        """prefix[w] = sum of the first w word values."""
+        return offsets(self.word_values(method))
+
+    def verse_of_word(self):
+        return np.repeat(np.arange(len(self.verse_offsets) - 1), np.diff(self.verse_offsets))
+
+    def verse_values(self, prefix=None):
+        """Whole-verse values; `prefix` may also be method_prefixes() for every method at once."""
+        prefix = self.word_prefix() if prefix is None else prefix
+        return prefix[..., self.verse_offsets[1:]] - prefix[..., self.verse_offsets[:-1]]
+
+    def window_starts(self, length):
+        """Global word index of every `length`-word window that stays inside one verse, in corpus order."""
+        n = self.n_words - length + 1
+        if n <= 0:
+            return np.zeros(0, dtype=np.int64)
+        starts = np.arange(n)
+        verse = self.verse_of_word()
+        return starts[verse[starts] == verse[starts + length - 1]]
+
+    def windows(self, length, prefix=None):
+        """(start, value) of every `length`-word window that stays inside one verse.
+
+        `start` is a global word index, in corpus order. With method_prefixes()
+        as `prefix`, values has one row per method.
+        """
+        prefix = self.word_prefix() if prefix is None else prefix
+        starts = self.window_starts(length)
+        return starts, prefix[..., starts + length] - prefix[..., starts]
+
+
+def encode(verses):
+    """Encodes a sequence of verses, each a list of cleaned words."""
+    words = [w for verse in verses for w in verse]
+    return Encoded(
+        codes=letter_codes("".join(words)),
+        word_offsets=offsets([len(w) for w in words]),
+        verse_offsets=offsets([len(verse) for verse in verses])
+    )
@@ -0,0 +1,130 @@
+"""
+Hebrew text helpers shared by every builder.
+"""
+import codecs
+import re
+
+gematria_map = {
+    'א': 1, 'ב': 2, 'ג': 3, 'ד': 4, 'ה': 5, 'ו': 6, 'ז': 7, 'ח': 8, 'ט': 9,
+    'י': 10, 'כ': 20, 'ל': 30, 'מ': 40, 'נ': 50, 'ס': 60, 'ע': 70, 'פ': 80, 'צ': 90,
+    'ק': 100, 'ר': 200, 'ש': 300, 'ת': 400,
+    'ך': 20, 'ם': 40, 'ן': 50, 'ף': 80, 'ץ': 90
+}
+
+ALPHABET = "אבגדהוזחטיכלמנסעפצקרשת"
+FINAL_FORMS = {'ך': 'כ', 'ם': 'מ', 'ן': 'נ', 'ף': 'פ', 'ץ': 'צ'}
+
+# Letter values of every gematria method (src/utils/gematria.js has the same):
+#   standard  mispar hechrechi, gematria_map
+#   gadol     mispar gadol, final letters 500-900
+#   katan     mispar katan, the value without its zeros (י = 1, ת = 4)
+#   ordinal   mispar siduri, position in the alphabet (final forms as their letter)
+#   atbash    the standard value of the mirrored letter (א <-> ת, ב <-> ש, ...)
+GEMATRIA_METHODS = {
+    "standard": dict(gematria_map),
+    "gadol": {**gematria_map, 'ך': 500, 'ם': 600, 'ן': 700, 'ף': 800, 'ץ': 900},
+    "katan": {c: int(str(v)[0]) for c, v in gematria_map.items()},
+    "ordinal": {c: ALPHABET.index(FINAL_FORMS.get(c, c)) + 1 for c in gematria_map},
+    "atbash": {c: gematria_map[ALPHABET[-1 - ALPHABET.index(FINAL_FORMS.get(c, c))]] for c in gematria_map},
+}
+DEFAULT_METHOD = "standard"
+
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+HTML_TAG_BYTES_RE = re.compile(rb'<[^>]+>')
+
+LETTERS = range(0x05D0, 0x05EB)  # א-ת
+MARKS = range(0x0591, 0x05C8)    # niqqud and cantillation, 0591-05C7
+MAQAF = 0x05BE                   # in the marks range, but it separates words
+
+
+# The normalizer works on a one-byte-per-character copy of the text, so both
+# of its passes are single C-level calls (a charmap encode and bytes.translate):
+#
+#   0x00-0x7F  ASCII
+#   0x80-0xB7  U+0590-U+05C7, points, cantillation and Hebrew punctuation
+#   0xC0-0xEF  U+05D0-U+05FF, letters
+#   other      unused; characters outside these ranges are encoded as a space
+def _build_charmap():
+    table = [chr(b) for b in range(0x80)]
+    table += [chr(0x0590 + i) for i in range(0x38)] + [chr(0xE000 + i) for i in range(0x08)]
+    table += [chr(0x05D0 + i) for i in range(0x30)] + [chr(0xE008 + i) for i in range(0x10)]
+    return "".join(table)
+
+
+CHARMAP = _build_charmap()
+CHARMAP_ENCODING = codecs.charmap_build(CHARMAP)
+# One space per unmapped character keeps the copy aligned with the text
+codecs.register_error("hebrew-separator", lambda error: (" " * (error.end - error.start), error.end))
+# A word in that copy: a letter, then letters and marks (not maqaf)
+WORD_BYTES_RE = re.compile(rb'[\xc0-\xda][\x81-\xad\xaf-\xb7\xc0-\xda]*')
+
+
+def _byte_table(keep, delete):
+    """bytes.translate arguments: `keep` code points stay, `delete` ones are
+    dropped and every other byte becomes a space."""
+    table = bytearray(b" " * 256)
+    deleted = bytearray()
+    for byte, char in enumerate(CHARMAP):
+        if ord(char) in keep:
+            table[byte] = byte
+        elif ord(char) in delete:
+            deleted.append(byte)
+    return bytes(table), bytes(deleted)
+
+
+# The normalization rules:
+#   - Hebrew letters are kept
+#   - Marks are deleted, so letters around them stay one word ("L'Moshe")
+#   - Maqaf, '-' and anything else (whitespace, punctuation, hidden characters
+#     like the Numbers 32:33 glitch) become a space, so "Et-Moshe" is two words
+CLEAN_TABLE = _byte_table(LETTERS, [c for c in MARKS if c != MAQAF])
+# Letters only, for gematria values
+LETTERS_TABLE = _byte_table(LETTERS, range(0x110000))
+
+
+def _encode(text):
+    return codecs.charmap_encode(text, "hebrew-separator", CHARMAP_ENCODING)[0]
+
+
+def _translate(text, table):
+    return codecs.charmap_decode(_encode(text).translate(*table), "strict", CHARMAP)[0]
+
+
+def clean_html(raw_html):
+    return HTML_TAG_RE.sub('', raw_html) if '<' in raw_html else raw_html
+
+
+def clean_hebrew(text):
+    """Verse text with tags and marks removed and every separator a space."""
+    return _translate(clean_html(text), CLEAN_TABLE)
+
+
+def letters_only(text):
+    """Just the Hebrew letters of `text`: the same word with or without niqqud,
+    spaces, hyphens or punctuation gives the same string."""
+    return _translate(text, LETTERS_TABLE)
+
+
+def tokenize(text):
+    """Cleaned words of a verse, in order."""
+    return clean_hebrew(text).split()
+
+
+def normalize(text):
+    """(words, spans): the same words as tokenize(), with the (start, end) of
+    each one in `text`, the original niqqud text, for highlighting.
+
+    src/utils/hebrew.js implements the same rules for the browser.
+    """
+    # Byte i of the copy is character i of the text, so word spans can be
+    # found there. Tags become marks: they may sit inside a word
+    # ("<big>ב</big>ראשית") and tokenize() drops them the same way.
+    encoded = _encode(text)
+    if b'<' in encoded:
+        encoded = HTML_TAG_BYTES_RE.sub(lambda tag: b'\x81' * len(tag.group()), encoded)
+    return tokenize(text), [m.span() for m in WORD_BYTES_RE.finditer(encoded)]
+
+
+def get_gematria_value(text, method=DEFAULT_METHOD):
+    values = GEMATRIA_METHODS[method]
+    return sum(values[char] for char in letters_only(text))
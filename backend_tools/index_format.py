@@ -0,0 +1,455 @@
+"""
+Compact binary container for the Torah index shards (public/torah_index/).
+
+Layout (little-endian):
+
+    0   magic  b"GMIX"
+    4   u32    format version
+    8   u32    TOC offset
+    12  u32    TOC length
+    16  ...    sections, each 4-byte aligned
+    TOC        JSON: {"meta": {...}, "sections": {name: {"offset", "length", "type", "count"}}}
+
+Section types are "u32", "u16" (typed arrays) and "bytes". A string table
+`name` is two sections: `name.offsets` (u32, count + 1) and `name.data` (UTF-8).
+
+Sections are written in order and the TOC goes last, so a writer never needs
+to hold more than the section it is writing. src/utils/indexFormat.js reads
+the same layout in the browser.
+
+Every gematria method (standard, gadol, katan, ordinal, atbash) has its own
+index, split by value range: shard k of a method holds values in
+[k * shard_size, (k + 1) * shard_size). Shards hold postings only and refer
+to verses by global verse id; the verse text is stored once, one file per
+chapter (text-<book>-<chapter>.bin), and only fetched for the verses a page
+of results shows. manifest.json lists each method's shards and its value
+directory (values-<method>.bin), and under "text" each book's chapter files.
+Refs are not stored: the manifest's "verse_table" (verse_ids.py) turns a
+global verse id back into "Book C:V".
+
+Torah index sections:
+
+    values                          u32, sorted distinct gematria values
+    value_offsets                   u32, postings of values[i] are [value_offsets[i], value_offsets[i + 1])
+    group_offsets                   u32, phrase group g is postings [group_offsets[g], group_offsets[g + 1]):
+                                    every occurrence of one phrase under one value,
+                                    most frequent phrase first (a whole verse is
+                                    its own group); corpus order inside a group
+    post_verse                      u32 global verse id: its 0-based position in the
+                                    corpus, the id space of the parsha ranges in parshas.js
+    post_start, post_len            u16 word window inside the verse (post_len 0 = whole verse)
+
+Chapter text sections (text-<book>-<chapter>.bin); verse i is verse i + 1 of
+the chapter:
+
+    verse_he, verse_en              string tables, one row per verse
+    word                            interned cleaned words
+    verse_word_offsets, verse_words u32: the words of verse i are
+                                    verse_words[verse_word_offsets[i]:verse_word_offsets[i + 1]]
+
+Value directory sections (values-<method>.bin):
+
+    values                          u32, every distinct value in the index, sorted
+    counts                          u32, number of postings of values[i]
+
+The directory is small enough to keep in memory, so range, tolerance and
+two-sum questions are answered from it before any shard is opened.
+
+Word corpus sections (words.bin), for span search:
+
+    word                            interned cleaned words
+    words                           u32 word id of every indexed word, in corpus order
+    word_value.<method>             u16 value of words[i] in each gematria method
+    verse_id                        u32 global verse id of each verse
+    verse_word_offsets              u32: verse v is words[verse_word_offsets[v]:verse_word_offsets[v + 1]]
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from verse_ids import VerseTable
+
+MAGIC = b"GMIX"
+VERSION = 4
+HEADER = struct.Struct("<4sIII")
+WHOLE_VERSE = "(Whole Verse)"
+DEFAULT_METHOD = "standard"  # as in hebrew.py, which the query service doesn't ship
+
+TYPECODES = {"u32": "I", "u16": "H"}
+ITEMSIZES = {"u32": 4, "u16": 2}
+
+
+class IndexWriter:
+    def __init__(self, path, meta=None):
+        self.f = open(path, "wb")
+        self.meta = meta or {}
+        self.sections = {}
+        self.f.write(b"\0" * HEADER.size)
+
+    def _align(self):
+        pad = -self.f.tell() % 4
+        if pad:
+            self.f.write(b"\0" * pad)
+
+    def add_bytes(self, name, payload, kind="bytes", count=None):
+        self._align()
+        offset = self.f.tell()
+        self.f.write(payload)
+        self.sections[name] = {"offset": offset, "length": len(payload), "type": kind,
+                               "count": len(payload) if count is None else count}
+
+    def add_array(self, name, kind, values):
+        # values: ints, an array.array, or the array's raw native-endian bytes
+        arr = values if isinstance(values, array) else array(TYPECODES[kind], values)
+        self.add_bytes(name, arr.tobytes(), kind, len(arr))
+
+    def add_chunks(self, name, kind, chunks):
+        """Like add_array, from the array's raw little-endian bytes in consecutive
+        chunks, so a large column is never in memory at once."""
+        self._align()
+        offset = self.f.tell()
+        for chunk in chunks:
+            self.f.write(chunk)
+        length = self.f.tell() - offset
+        self.sections[name] = {"offset": offset, "length": length, "type": kind, "count": length // ITEMSIZES[kind]}
+
+    def add_strings(self, name, strings):
+        offsets = array("I", [0])
+        data = bytearray()
+        for s in strings:
+            data += s.encode("utf-8")
+            offsets.append(len(data))
+        self.add_array(f"{name}.offsets", "u32", offsets)
+        self.add_bytes(f"{name}.data", bytes(data))
+
+    def close(self):
+        self._align()
+        toc = json.dumps({"meta": self.meta, "sections": self.sections}, ensure_ascii=False).encode("utf-8")
+        toc_offset = self.f.tell()
+        self.f.write(toc)
+        self.f.seek(0)
+        self.f.write(HEADER.pack(MAGIC, VERSION, toc_offset, len(toc)))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StringTable:
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+
+class IndexFile:
+    """Read-only view over one GMIX file. Arrays are memory-mapped, not copied."""
+
+    def __init__(self, buffer):
+        self.buffer = memoryview(buffer)
+        magic, version, toc_offset, toc_length = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("not a Gematria index file")
+        if version != VERSION:
+            raise ValueError(f"unsupported index version {version} (expected {VERSION})")
+        toc = json.loads(bytes(self.buffer[toc_offset:toc_offset + toc_length]))
+        self.meta = toc["meta"]
+        self.sections = toc["sections"]
+
+    @classmethod
+    def open(cls, path, *args):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), *args)
+
+    def section(self, name):
+        s = self.sections[name]
+        return self.buffer[s["offset"]:s["offset"] + s["length"]]
+
+    def array(self, name):
+        kind = self.sections[name]["type"]
+        return self.section(name).cast(TYPECODES[kind])
+
+    def strings(self, name):
+        return StringTable(self.array(f"{name}.offsets"), self.section(f"{name}.data"))
+
+
+class VerseText(IndexFile):
+    """One chapter's verses: verse i is verse i + 1 of the chapter."""
+
+    def __init__(self, buffer):
+        super().__init__(buffer)
+        self.verse_he = self.strings("verse_he")
+        self.verse_en = self.strings("verse_en")
+        self.word = self.strings("word")
+        self.verse_word_offsets = self.array("verse_word_offsets")
+        self.verse_words = self.array("verse_words")
+
+    def phrase(self, i, start, length):
+        base = self.verse_word_offsets[i] + start
+        return " ".join(self.word[self.verse_words[k]] for k in range(base, base + length))
+
+
+class TorahIndex(IndexFile):
+    """One index shard; `verses` is the VerseTable its global verse ids refer to.
+
+    `text(verse_id)` returns (VerseText of the verse's chapter, the verse's
+    index in it), e.g. ShardedIndex.text.
+    """
+
+    def __init__(self, buffer, verses, text):
+        super().__init__(buffer)
+        self.verses = verses
+        self.text = text
+        self.values = self.array("values")
+        self.value_offsets = self.array("value_offsets")
+        self.group_offsets = self.array("group_offsets")
+        self.post_verse = self.array("post_verse")
+        self.post_start = self.array("post_start")
+        self.post_len = self.array("post_len")
+
+    def postings(self, value):
+        """(start, end) range of the value's postings, empty if absent."""
+        i = bisect_left(self.values, value)
+        if i == len(self.values) or self.values[i] != value:
+            return 0, 0
+        return self.value_offsets[i], self.value_offsets[i + 1]
+
+    def groups(self, value):
+        """[(start, end)] posting ranges of the value's phrase groups, most frequent first."""
+        start, end = self.postings(value)
+        i, j = bisect_left(self.group_offsets, start), bisect_left(self.group_offsets, end)
+        return [(self.group_offsets[g], self.group_offsets[g + 1]) for g in range(i, j)]
+
+    def verse_of(self, p):
+        """Global verse id of posting p."""
+        return self.post_verse[p]
+
+    def entry(self, p):
+        """Posting p in the legacy torah_index.json entry shape, plus its global verseId."""
+        verse_id, length = self.post_verse[p], self.post_len[p]
+        text, i = self.text(verse_id)
+        entry = {
+            "phrase": WHOLE_VERSE if length == 0 else text.phrase(i, self.post_start[p], length),
+            "ref": self.verses.ref(verse_id),
+            "verseId": verse_id,
+            "context_en": text.verse_en[i],
+            "isVerse": length == 0
+        }
+        if length == 0:
+            entry["original_he"] = text.verse_he[i]
+        return entry
+
+    def lookup(self, value):
+        start, end = self.postings(value)
+        return [self.entry(p) for p in range(start, end)]
+
+
+class ValueDirectory(IndexFile):
+    """Sorted distinct values of the whole index with their posting counts."""
+
+    def __init__(self, buffer):
+        super().__init__(buffer)
+        self.values = self.array("values")
+        self.counts = self.array("counts")
+
+    def __len__(self):
+        return len(self.values)
+
+    def in_range(self, lo, hi):
+        """[(value, count)] for every indexed value in [lo, hi]."""
+        i, j = bisect_left(self.values, lo), bisect_right(self.values, hi)
+        return [(self.values[k], self.counts[k]) for k in range(i, j)]
+
+    def within(self, value, k):
+        """[(value, count)] for every indexed value within ±k of `value`."""
+        return self.in_range(value - k, value + k)
+
+    def pairs(self, target):
+        """[(a, count_a, b, count_b)] with a <= b and a + b == target.
+
+        A two-pointer walk from both ends of the directory, linear in the
+        number of distinct values.
+        """
+        found = []
+        i, j = 0, bisect_right(self.values, target) - 1
+        while i <= j:
+            total = self.values[i] + self.values[j]
+            if total == target:
+                found.append((self.values[i], self.counts[i], self.values[j], self.counts[j]))
+                i += 1
+                j -= 1
+            elif total < target:
+                i += 1
+            else:
+                j -= 1
+        return found
+
+
+class WordCorpus(IndexFile):
+    """Every indexed word in corpus order with its value, for span search.
+
+    The value of any contiguous run of words is a difference of two prefix
+    sums, so spans() finds every run worth a target with one hash lookup per
+    word, whatever its length and however many verses it crosses. Words all
+    have positive values, so the prefix sums are distinct.
+    """
+
+    def __init__(self, buffer, verses):
+        super().__init__(buffer)
+        self.verses = verses
+        self.word = self.strings("word")
+        self.words = self.array("words")
+        self.verse_id = self.array("verse_id")
+        self.verse_word_offsets = self.array("verse_word_offsets")
+        self.local_verse = {v: k for k, v in enumerate(self.verse_id)}
+        self.prefix_sums = {}  # method -> (prefix, position), built on first use
+
+    def word_value(self, method=DEFAULT_METHOD):
+        return self.array(f"word_value.{method}")
+
+    def _prefix_sums(self, method):
+        if method not in self.prefix_sums:
+            prefix = [0]
+            for value in self.word_value(method):
+                prefix.append(prefix[-1] + value)
+            self.prefix_sums[method] = prefix, {p: i for i, p in enumerate(prefix)}
+        return self.prefix_sums[method]
+
+    def __len__(self):
+        return len(self.words)
+
+    def word_offset(self, verse_id):
+        """Position of the first word of a global verse id."""
+        return self.verse_word_offsets[self.local_verse[verse_id]]
+
+    def word_range(self, first_verse, last_verse):
+        """[lo, hi) word positions of the global verses first_verse..last_verse."""
+        return self.word_offset(first_verse), self.verse_word_offsets[self.local_verse[last_verse] + 1]
+
+    def verse_cuts(self):
+        """Cuts (see spans) at every verse boundary."""
+        return list(self.verse_word_offsets[1:])
+
+    def cuts_before(self, verse_ids):
+        """Cuts at the first word of each of `verse_ids` (e.g. where parshas start)."""
+        return sorted({self.word_offset(v) for v in verse_ids if v in self.local_verse} | {len(self)})
+
+    def spans(self, target, max_words=None, cuts=None, lo=0, hi=None, method=DEFAULT_METHOD):
+        """[(start, end)] of every run of words [start, end) worth `target`.
+
+        max_words bounds a run's length. cuts is a sorted list of word
+        positions ending with len(self); a run may not contain one except as
+        its start. lo and hi confine runs to words [lo, hi). Values are in
+        the given gematria method. O(hi - lo).
+        """
+        found = []
+        if target <= 0:
+            return found
+        hi = len(self) if hi is None else hi
+        prefix, position = self._prefix_sums(method)
+        for end in range(lo + 1, hi + 1):
+            start = position.get(prefix[end] - target)
+            if start is None or start < lo or (max_words and end - start > max_words):
+                continue
+            if cuts is not None and cuts[bisect_right(cuts, start)] < end:
+                continue
+            found.append((start, end))
+        return found
+
+    def entry(self, start, end):
+        """A span in the shape of an index entry, with the verse range it covers."""
+        first = self.verse_id[bisect_right(self.verse_word_offsets, start) - 1]
+        last = self.verse_id[bisect_right(self.verse_word_offsets, end - 1) - 1]
+        return {
+            "phrase": " ".join(self.word[self.words[k]] for k in range(start, end)),
+            "ref": self.verses.range_ref(first, last),
+            "verseId": first,
+            "lastVerseId": last,
+            "words": end - start,
+            "isVerse": False
+        }
+
+
+class ShardedIndex:
+    """All shards and chapter texts of public/torah_index/, opened on demand and kept in an LRU.
+
+    Every gematria method has its own shards and value directory; the
+    manifest lists them under "methods". Safe to share between threads.
+    """
+
+    def __init__(self, directory, max_open=256):
+        self.directory = directory
+        self.max_open = max_open
+        with open(os.path.join(directory, "manifest.json"), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.methods = self.manifest["methods"]
+        self.verses = VerseTable.from_json(self.manifest["verse_table"])
+        self.open_files = OrderedDict()
+        self.directories = {}
+        self._corpus = None
+        self.lock = threading.Lock()  # guards the lazily opened files and the LRU
+
+    def shard_count(self):
+        return sum(len(m["shards"]) for m in self.methods.values())
+
+    def text_count(self):
+        return sum(1 for files in self.manifest["text"].values() for name in files if name)
+
+    def _open(self, key, name, cls, *args):
+        """The open `cls` view of file `name`, through the LRU."""
+        with self.lock:
+            if key in self.open_files:
+                self.open_files.move_to_end(key)
+            else:
+                self.open_files[key] = cls.open(os.path.join(self.directory, name), *args)
+                if len(self.open_files) > self.max_open:
+                    self.open_files.popitem(last=False)
+            return self.open_files[key]
+
+    def values(self, method=DEFAULT_METHOD):
+        """The method's ValueDirectory, opened on first use."""
+        with self.lock:
+            if method not in self.directories:
+                path = os.path.join(self.directory, self.methods[method]["directory"]["file"])
+                self.directories[method] = ValueDirectory.open(path)
+            return self.directories[method]
+
+    @property
+    def corpus(self):
+        """The WordCorpus (words.bin), opened on first use."""
+        with self.lock:
+            if self._corpus is None:
+                self._corpus = WordCorpus.open(os.path.join(self.directory, self.manifest["corpus"]["file"]),
+                                               self.verses)
+            return self._corpus
+
+    def shard(self, value, method=DEFAULT_METHOD):
+        """The shard holding `value` in `method`, or None if no shard covers it."""
+        info = self.methods[method]
+        key = (method, value // info["shard_size"])
+        shard = info["shards"].get(str(key[1]))
+        if shard is None:
+            return None
+        return self._open(key, shard["file"], TorahIndex, self.verses, self.text)
+
+    def text(self, verse_id):
+        """(VerseText of the verse's chapter, the verse's index in it)."""
+        book, chapter, verse = self.verses.locate(verse_id)
+        return self._open(("text", book, chapter), self.manifest["text"][book][chapter - 1], VerseText), verse - 1
+
+    def lookup(self, value, method=DEFAULT_METHOD):
+        shard = self.shard(value, method)
+        return shard.lookup(value) if shard else []
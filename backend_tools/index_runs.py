@@ -0,0 +1,144 @@
+"""
+Out-of-core building blocks for the index: postings and words spill to disk
+so peak memory stays at a fixed budget instead of growing with the corpus.
+
+    SortedRuns   postings arrive in corpus order and are buffered up to the
+                 budget, then stable-sorted by value and written out as a run.
+                 shards() k-way merges the runs one value range at a time.
+    WordStream   every word of the corpus as an interned id, plus per-verse
+                 columns (first word, global verse id, words hash) and
+                 per-word values, appended a chapter at a time to temp files
+                 and read back through np.memmap. Only the vocabulary stays
+                 in memory.
+
+A run is a flat file of RUN_DTYPE records. Runs hold consecutive slices of the
+corpus, so merging equal values in run order keeps corpus order, and the result
+is identical to sorting everything in memory.
+"""
+import os
+
+import numpy as np
+
+RUN_DTYPE = np.dtype([("value", "<u4"), ("verse", "<u4"), ("start", "<u2"), ("len", "<u2")])
+
+
+def to_records(postings):
+    """int64 (n, 4) postings -> RUN_DTYPE records."""
+    records = np.empty(len(postings), dtype=RUN_DTYPE)
+    for i, name in enumerate(RUN_DTYPE.names):
+        records[name] = postings[:, i]
+    return records
+
+
+def to_rows(records):
+    return np.column_stack([records[name].astype(np.int64) for name in RUN_DTYPE.names])
+
+
+class SortedRuns:
+    def __init__(self, tmp_dir, memory_budget):
+        self.tmp_dir = tmp_dir
+        self.max_buffered = max(1, memory_budget // RUN_DTYPE.itemsize)
+        self.buffer, self.buffered = [], 0
+        self.paths = []
+        self.total = 0
+
+    def add(self, postings):
+        """Appends int64 (n, 4) postings rows, in corpus order."""
+        if len(postings) == 0:
+            return
+        self.buffer.append(to_records(postings))
+        self.buffered += len(postings)
+        self.total += len(postings)
+        if self.buffered >= self.max_buffered:
+            self.spill()
+
+    def spill(self):
+        if not self.buffer:
+            return
+        records = np.concatenate(self.buffer)
+        records = records[np.argsort(records["value"], kind="stable")]
+        path = os.path.join(self.tmp_dir, f"run-{len(self.paths):04d}.bin")
+        records.tofile(path)
+        self.paths.append(path)
+        self.buffer, self.buffered = [], 0
+
+    def shards(self, shard_size):
+        """Yields (shard key, int64 (n, 4) rows) in value order, one value range at a time."""
+        self.spill()
+        runs = [np.memmap(path, dtype=RUN_DTYPE, mode="r") for path in self.paths if os.path.getsize(path)]
+        cursors = [0] * len(runs)
+        while True:
+            heads = [int(run["value"][c]) // shard_size for run, c in zip(runs, cursors) if c < len(run)]
+            if not heads:
+                return
+            key = min(heads)
+            limit = (key + 1) * shard_size
+            # Each run is sorted, so its part of this shard is one slice
+            parts = []
+            for i, run in enumerate(runs):
+                end = cursors[i] + int(np.searchsorted(run["value"][cursors[i]:], limit, side="left"))
+                if end > cursors[i]:
+                    parts.append(np.array(run[cursors[i]:end]))
+                cursors[i] = end
+            merged = np.concatenate(parts)
+            yield key, to_rows(merged[np.argsort(merged["value"], kind="stable")])
+
+
+class WordStream:
+    # column -> dtype; word_value.<method> columns are added per method
+    COLUMNS = {"words": "<u4", "verse_offsets": "<i8", "verse_id": "<u4", "verse_hash": "<u8"}
+    CHUNK = 1 << 20  # items per chunk when a column is copied out
+
+    def __init__(self, tmp_dir, methods=()):
+        self.tmp_dir = tmp_dir
+        self.dtypes = {**self.COLUMNS, **{f"word_value.{m}": "<u2" for m in methods}}
+        self.vocabulary = {}  # word -> id, in first-use order
+        self.files = {name: open(self._path(name), "wb") for name in self.dtypes}
+        self.n_words = 0
+        self.n_verses = 0
+        self.columns = {}
+
+    def _path(self, name):
+        return os.path.join(self.tmp_dir, name + ".bin")
+
+    def _write(self, name, values):
+        self.files[name].write(np.asarray(values, dtype=self.dtypes[name]).tobytes())
+
+    def add_chapter(self, first_verse, verses, verse_hashes, word_values=None):
+        """Appends a chapter: each verse's words, its hash and, per method, each word's value.
+
+        word_values maps a method to the chapter's word values, in order.
+        """
+        lengths = [len(words) for words in verses]
+        self._write("verse_offsets", self.n_words + np.cumsum([0] + lengths)[:-1])
+        self._write("verse_id", np.arange(first_verse, first_verse + len(verses)))
+        self._write("verse_hash", np.asarray(verse_hashes, dtype=np.uint64))
+        self._write("words", [self.vocabulary.setdefault(w, len(self.vocabulary)) for words in verses for w in words])
+        for method, values in (word_values or {}).items():
+            self._write(f"word_value.{method}", values)
+        self.n_words += sum(lengths)
+        self.n_verses += len(verses)
+
+    def close_writer(self):
+        self._write("verse_offsets", [self.n_words])  # end of the last verse
+        for f in self.files.values():
+            f.close()
+        for name, dtype in self.dtypes.items():
+            size = os.path.getsize(self._path(name))
+            self.columns[name] = np.memmap(self._path(name), dtype=dtype, mode="r") if size else np.zeros(0, dtype)
+
+    def close(self):
+        self.columns = {}
+
+    def __len__(self):
+        """Number of verses."""
+        return self.n_verses
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def chunks(self, name):
+        """A column in slices of CHUNK items, so it never has to be in memory at once."""
+        column = self.columns[name]
+        for start in range(0, len(column), self.CHUNK):
+            yield np.asarray(column[start:start + self.CHUNK])
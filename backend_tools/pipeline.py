@@ -0,0 +1,322 @@
+"""
+Single-pass build pipeline.
+
+The corpus is read once (through the Sefaria cache) and every verse is
+tokenized once. Each chapter is then handed to every selected stage:
+
+    fragment = stage.process_chapter(chapter)   # per chapter, no shared state
+    stage.finish(results)                        # (chapter, fragment) pairs in corpus order
+
+Stages only ever see the token stream, so adding an artifact means adding a
+Stage, not another walk over the text.
+
+Builds are incremental. .build_state/ records, per stage, the source hash
+(the Sefaria cache object) each chapter's fragment was computed from, and
+keeps the fragments. A rerun only parses and processes chapters whose source
+changed, reuses the stored fragments for the rest, and skips a stage's
+finish() entirely when none of its inputs changed and its outputs exist.
+
+finish() gets a one-pass iterator that loads each fragment from the state as
+it goes, so no stage ever needs every fragment in memory at once. Its
+chapters have no verses, so it must only rely on
+chapter.book / chapter.number / chapter.first_index. With jobs > 1, dirty
+chapters are read, tokenized and processed in a process pool (each worker
+gets a pickled copy of the stages), and results are collected in corpus
+order, so the artifacts are identical to a serial build. process_chapter
+must therefore not use first_index or mutate shared state.
+"""
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from hebrew import clean_html, tokenize
+from sefaria_cache import SefariaCache, BOOKS_STRUCTURE
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.environ.get("BUILD_STATE_DIR", os.path.join(script_dir, ".build_state"))
+# Where stages write their artifacts (public/, src/...): the repo, unless a
+# benchmark points it at a scratch directory
+OUTPUT_ROOT = os.environ.get("BUILD_OUTPUT_ROOT", os.path.join(script_dir, '..'))
+STATE_VERSION = 1
+
+
+@dataclass
+class Verse:
+    number: int          # 1-based verse number within the chapter
+    he: str              # original Sefaria Hebrew (niqqud, HTML)
+    en: str              # English with HTML stripped
+    words: list          # cleaned Hebrew tokens
+
+
+@dataclass
+class Chapter:
+    book: str
+    number: int
+    first_index: int     # 0-based global index of the chapter's first verse
+    verses: list = field(default_factory=list)
+
+    def ref(self, verse):
+        return f"{self.book} {self.number}:{verse.number}"
+
+
+class Stage:
+    """Base class for an artifact built from the token stream."""
+    name = None
+    outputs = ()      # files finish() writes; missing ones force a rerun
+    sources = ()      # extra modules (file names next to this one) the output depends on
+
+    def process_chapter(self, chapter):
+        raise NotImplementedError
+
+    def finish(self, results):
+        raise NotImplementedError
+
+    def config(self):
+        """Parameters that change the output (JSON-serializable)."""
+        return {}
+
+    def fingerprint(self):
+        """Changes whenever the stage's code, tokenizer or config does."""
+        digest = hashlib.sha256()
+        files = [inspect.getsourcefile(type(self)), __file__, os.path.join(script_dir, "hebrew.py")]
+        files += [os.path.join(script_dir, name) for name in self.sources]
+        for path in files:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        digest.update(json.dumps(self.config(), sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()
+
+
+def write_if_changed(path, content):
+    """Writes text to `path` unless it already holds exactly that. Returns True if written."""
+    data = content.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+class BuildState:
+    """Per-stage chapter source hashes and stored fragments (see module docstring).
+
+    manifest.json:
+        {"version", "chapters": {"Genesis.1": verse_count},
+         "stages": {name: {"fingerprint", "chapters": {"Genesis.1": source_hash}, "built": input_key}}}
+    """
+
+    def __init__(self, state_dir=STATE_DIR, fresh=False):
+        self.state_dir = state_dir
+        self.manifest = {"version": STATE_VERSION, "chapters": {}, "stages": {}}
+        self.fingerprints = {}
+        path = os.path.join(state_dir, "manifest.json")
+        if not fresh and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == STATE_VERSION:
+                self.manifest = manifest
+
+    def stage(self, stage):
+        """The stage's record, reset if its fingerprint changed."""
+        if stage.name not in self.fingerprints:
+            self.fingerprints[stage.name] = stage.fingerprint()
+        fingerprint = self.fingerprints[stage.name]
+        record = self.manifest["stages"].get(stage.name)
+        if record is None or record["fingerprint"] != fingerprint:
+            record = {"fingerprint": fingerprint, "chapters": {}, "built": None}
+            self.manifest["stages"][stage.name] = record
+        return record
+
+    def _fragment_path(self, stage, key):
+        return os.path.join(self.state_dir, "fragments", stage.name, key + ".pickle")
+
+    def is_clean(self, stage, key, source):
+        return (key in self.manifest["chapters"]
+                and self.stage(stage)["chapters"].get(key) == source
+                and os.path.exists(self._fragment_path(stage, key)))
+
+    def load_fragment(self, stage, key):
+        with open(self._fragment_path(stage, key), "rb") as f:
+            return pickle.load(f)
+
+    def store_fragment(self, stage, key, source, fragment):
+        path = self._fragment_path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(fragment, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.stage(stage)["chapters"][key] = source
+
+    def save(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = os.path.join(self.state_dir, "manifest.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, os.path.join(self.state_dir, "manifest.json"))
+
+
+def input_key(fingerprint, sources):
+    digest = hashlib.sha256(fingerprint.encode("utf-8"))
+    for key, source in sources:
+        digest.update(f"{key}={source};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def parse_chapter(book, chapter_num, first_index, data):
+    chapter = Chapter(book=book, number=chapter_num, first_index=first_index)
+    english = data.get('text', [])
+    for v_i, he_verse in enumerate(data['he']):
+        en_verse = english[v_i] if v_i < len(english) else ""
+        chapter.verses.append(Verse(
+            number=v_i + 1,
+            he=he_verse,
+            en=clean_html(en_verse),
+            words=tokenize(he_verse)
+        ))
+    return chapter
+
+
+def read_corpus(cache, books=BOOKS_STRUCTURE, missing=None):
+    """Yields every chapter of the corpus, tokenized, in order."""
+    # Download anything missing concurrently, then read sequentially from disk
+    cache.prefetch_corpus(books)
+
+    global_index = 0
+    for book, total_chapters in books:
+        print(f"\nReading {book} ({total_chapters} chapters)...")
+        for chapter_num in range(1, total_chapters + 1):
+            try:
+                data = cache.chapter(book, chapter_num)
+                chapter = parse_chapter(book, chapter_num, global_index, data)
+            except Exception as e:
+                print(f"\n  [FAILED] {book} Ch {chapter_num}: {e}")
+                if missing is not None:
+                    missing.append(f"{book} {chapter_num}")
+                continue
+
+            global_index += len(chapter.verses)
+            sys.stdout.write(".")
+            sys.stdout.flush()
+            yield chapter
+
+
+# Per-process state for process_chapter_task (set directly for serial builds)
+_worker = {}
+
+
+def init_worker(stages, cache):
+    _worker["stages"] = stages
+    _worker["cache"] = cache
+
+
+def process_chapter_task(task):
+    """(book, chapter_num, stage indices) -> (verse count, {stage index: fragment})."""
+    book, chapter_num, stage_ids = task
+    data = _worker["cache"].chapter(book, chapter_num)
+    chapter = parse_chapter(book, chapter_num, 0, data)
+    return len(chapter.verses), {i: _worker["stages"][i].process_chapter(chapter) for i in stage_ids}
+
+
+def safe_task(task):
+    try:
+        return process_chapter_task(task), None
+    except Exception as e:
+        return None, e
+
+
+def run_stages(stages, cache=None, books=BOOKS_STRUCTURE, incremental=True, jobs=1):
+    cache = cache or SefariaCache()
+    # A full build ignores the saved state but still records a new one
+    state = BuildState(fresh=not incremental)
+    missing = []
+    chapters = []  # verse-less Chapter of everything read, in corpus order
+    sources = []   # (chapter key, source hash), parallel to chapters
+
+    cache.prefetch_corpus(books)
+
+    # Plan: which stages need which chapters reprocessed
+    plan = []
+    for book, total_chapters in books:
+        for chapter_num in range(1, total_chapters + 1):
+            key = f"{book}.{chapter_num}"
+            source = cache.chapter_hash(book, chapter_num)
+            dirty = [i for i, stage in enumerate(stages) if source is None or not state.is_clean(stage, key, source)]
+            plan.append((book, chapter_num, key, source, dirty))
+    tasks = [(book, chapter_num, dirty) for book, chapter_num, _, _, dirty in plan if dirty]
+    print(f"Processing {len(tasks)} of {len(plan)} chapters" + (f" on {jobs} processes" if jobs > 1 and tasks else ""))
+
+    if jobs > 1 and tasks:
+        # Workers read through their own cache instance; everything is already prefetched
+        worker_cache = cache.worker_copy()
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(stages, worker_cache))
+        processed = executor.map(safe_task, tasks, chunksize=max(1, len(tasks) // (jobs * 4)))
+    else:
+        executor = None
+        init_worker(stages, cache)
+        processed = map(safe_task, tasks)
+
+    try:
+        global_index = 0
+        current_book = None
+        for book, chapter_num, key, source, dirty in plan:
+            if book != current_book:
+                current_book = book
+                print(f"\nReading {book} ({dict(books)[book]} chapters)...")
+
+            if dirty:
+                outcome, error = next(processed)
+                if error is not None:
+                    print(f"\n  [FAILED] {book} Ch {chapter_num}: {error}")
+                    missing.append(f"{book} {chapter_num}")
+                    continue
+                verse_count, fragments = outcome
+                source = source or cache.chapter_hash(book, chapter_num)
+                state.manifest["chapters"][key] = verse_count
+                sys.stdout.write(".")
+            else:
+                # Every stage has this chapter's fragment: don't even parse it
+                fragments = {}
+                sys.stdout.write("-")
+            sys.stdout.flush()
+
+            chapter = Chapter(book=book, number=chapter_num, first_index=global_index)
+            # Fragments live on disk until finish() streams through them
+            for i, stage in enumerate(stages):
+                if i in fragments:
+                    state.store_fragment(stage, key, source, fragments[i])
+            chapters.append(chapter)
+            sources.append((key, source))
+            global_index += state.manifest["chapters"][key]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    parsed = len(tasks) - len(missing)
+    print(f"\n\n{cache.summary()}; {parsed} chapters processed, {len(sources) - parsed} reused")
+    if missing:
+        print("\n[!] WARNING: The following chapters failed to load:")
+        for ch in missing:
+            print(f"   - {ch}")
+        print("[X] Please run the build again to fix the gaps.")
+
+    for stage in stages:
+        print(f"\n[{stage.name}]")
+        record = state.stage(stage)
+        built = input_key(record["fingerprint"], sources)
+        if incremental and record["built"] == built and all(os.path.exists(p) for p in stage.outputs):
+            print("Up to date.")
+            continue
+
+        stage.finish((chapter, state.load_fragment(stage, key)) for chapter, (key, _) in zip(chapters, sources))
+        record["built"] = built
+        state.save()
+    state.save()
@@ -0,0 +1,381 @@
+"""
+Optional query service: answers gematria lookups from the memory-mapped
+index shards, so a client can fetch one page of results instead of shards.
+
+Every endpoint takes ?method=standard|gadol|katan|ordinal|atbash, the gematria
+method n is computed in (default standard).
+
+    GET /api/value/{n}       results for n, in the same shape GematriaApp builds
+        ?colel=1             also n - 1 and n + 1
+        ?single=1            single words only (no verses, no phrases)
+        ?parsha=Noach        only results inside that parsha
+        ?tab=N               which value to page through (default n)
+        ?grouped=1           one result per distinct phrase, most frequent first, with its
+                             occurrence "count" and "verseIds" (counts stay per occurrence)
+        ?page=1&per_page=10
+    GET /api/range?min=a&max=b   indexed values in [a, b] with their posting counts
+    GET /api/near/{n}?k=1        indexed values within ±k of n
+    GET /api/pairs/{n}?limit=100 value pairs a <= b with a + b == n (two-phrase bridges)
+    GET /api/spans/{n}       every run of consecutive words worth n, of any length
+        ?max_words=K         at most K words
+        ?within=verse        inside one verse (or within=parsha: inside one parsha)
+        ?parsha=Noach        only runs inside that parsha
+        ?page=1&per_page=10
+    GET /api/health
+
+Results of a (values, single, parsha, method) query are kept in an LRU, so hot
+values are served without touching the index. Standard library only (asyncio
+plus index_format.py); nginx proxies /api/ to it. Queries run on the event
+loop's thread pool, so a slow span search never stalls other connections, and
+an unexpected error is a 500 with a JSON body. The range, near and pairs
+queries only read the value directory (values-<method>.bin), never a shard;
+spans are computed on demand from the word corpus (words.bin), not looked up in
+the phrase index. Parsha ranges are located in the index's own verse table;
+a parsha the index doesn't hold in full (e.g. one built from the fixture
+corpus) is a 400, like an unknown parsha.
+
+Usage:
+    python backend_tools/query_server.py --port 8000
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import re
+import traceback
+from urllib.parse import parse_qs, urlsplit
+
+from index_format import DEFAULT_METHOD, ShardedIndex
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+INDEX_DIR = os.environ.get("QUERY_INDEX_DIR", os.path.join(script_dir, '..', 'public', 'torah_index'))
+PARSHAS_PATH = os.environ.get("QUERY_PARSHAS_PATH", os.path.join(script_dir, '..', 'src', 'utils', 'parshas.js'))
+CACHE_SIZE = 4096
+MAX_PER_PAGE = 100
+MAX_TOLERANCE = 1000
+MAX_PAIRS = 1000
+
+SPAN_BOUNDARIES = ("verse", "parsha")
+
+VALUE_PATH_RE = re.compile(r"^/api/(value|near|pairs|spans)/(\d+)$")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def load_parshas(path=PARSHAS_PATH):
+    """The PARSHAS array from src/utils/parshas.js."""
+    with open(path, "r", encoding="utf-8") as f:
+        js = f.read()
+    return json.loads(js[js.index("=") + 1:].strip().rstrip(";"))
+
+
+def locate_parsha(parsha, verses):
+    """The parsha with first_verse/last_verse as ids of `verses`, the index's
+    VerseTable: they only equal parshas.js's when the index holds the whole
+    Torah. "indexed" is False unless every verse of the parsha is there; a
+    first_verse or last_verse the index lacks is None."""
+    book, (first_chapter, first), (last_chapter, last) = parsha["book"], parsha["start"], parsha["end"]
+    ends = [verses.verse_id(book, c, v) if verses.holds(book, c, v) else None
+            for c, v in ((first_chapter, first), (last_chapter, last))]
+    indexed = None not in ends and all(verses.holds(book, c, 1) for c in range(first_chapter, last_chapter + 1))
+    return {**parsha, "first_verse": ends[0], "last_verse": ends[1], "indexed": indexed}
+
+
+def is_verse_in_parsha(verse_id, parsha):
+    """Same check as isVerseInParsha in src/utils/filter.js."""
+    return parsha["first_verse"] <= verse_id <= parsha["last_verse"]
+
+
+def integer_param(params, name, default):
+    """Integer query parameter; a missing one with no default is an error."""
+    raw = params.get(name, [default])[0]
+    if raw is None:
+        raise BadRequest(f"{name} is required")
+    try:
+        return int(raw)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+
+
+class QueryService:
+    def __init__(self, index_dir=INDEX_DIR, parshas_path=PARSHAS_PATH, cache_size=CACHE_SIZE):
+        self.index = ShardedIndex(index_dir)
+        # Shards and texts are mmapped, so keeping them all open costs address space, not RAM
+        self.index.max_open = self.index.shard_count() + self.index.text_count()
+        self.parshas = {p["name"]: locate_parsha(p, self.index.verses) for p in load_parshas(parshas_path)}
+        self.matches = functools.lru_cache(maxsize=cache_size)(self._matches)
+        self.groups = functools.lru_cache(maxsize=cache_size)(self._groups)
+        self.spans = functools.lru_cache(maxsize=cache_size)(self._spans)
+        self.cuts = {}
+
+    def method_param(self, params):
+        method = params.get("method", [DEFAULT_METHOD])[0]
+        if method not in self.index.methods:
+            raise BadRequest(f"method must be one of {', '.join(self.index.methods)}")
+        return method
+
+    def parsha_param(self, params):
+        """The ?parsha= name, or None. Only a parsha the index holds in full can filter."""
+        name = params.get("parsha", [""])[0]
+        if not name:
+            return None
+        if name not in self.parshas:
+            raise BadRequest(f"unknown parsha {name!r}")
+        if not self.parshas[name]["indexed"]:
+            raise BadRequest(f"parsha {name!r} is not in the index")
+        return name
+
+    def stat_entries(self, value):
+        """Parshas with exactly `value` verses, listed before the index matches."""
+        return [{
+            "phrase": f"Parshat {p['name']}",
+            "ref": "Torah Stats",
+            "context_en": f"This Parsha contains exactly {p['verse_count']} verses.",
+            "actualValue": value,
+            "isExact": True,
+            "type": "stat",
+            "isVerse": False
+        } for p in self.parshas.values() if p["verse_count"] == value]
+
+    def _matches(self, values, single, parsha_name, method):
+        """{value: results}, filtered, each list in GematriaApp's order."""
+        parsha = self.parshas.get(parsha_name) if parsha_name else None
+        by_value = {}
+        for value in values:
+            results = by_value.setdefault(value, [])
+            if value <= 0:
+                continue
+            results.extend(self.stat_entries(value))
+            for entry in self.index.lookup(value, method):
+                if single and (entry["isVerse"] or " " in entry["phrase"]):
+                    continue
+                if parsha and not is_verse_in_parsha(entry["verseId"], parsha):
+                    continue
+                results.append({**entry, "actualValue": value, "isExact": value == values[0], "type": "standard"})
+        return by_value
+
+    def _groups(self, values, single, parsha_name, method):
+        """{value: results} like _matches, one result per phrase group with its filtered occurrences."""
+        parsha = self.parshas.get(parsha_name) if parsha_name else None
+        by_value = {}
+        for value in values:
+            results = by_value.setdefault(value, [])
+            if value <= 0:
+                continue
+            results.extend({**stat, "count": 1, "verseIds": []} for stat in self.stat_entries(value))
+            shard = self.index.shard(value, method)
+            groups = []
+            for start, end in shard.groups(value) if shard else ():
+                if single and shard.post_len[start] != 1:
+                    continue
+                hits = [p for p in range(start, end) if not parsha or is_verse_in_parsha(shard.verse_of(p), parsha)]
+                if hits:
+                    groups.append({**shard.entry(hits[0]), "count": len(hits),
+                                   "verseIds": [shard.verse_of(p) for p in hits],
+                                   "actualValue": value, "isExact": value == values[0], "type": "standard"})
+            # A parsha filter can change which phrase is most frequent
+            results.extend(sorted(groups, key=lambda g: -g["count"]))
+        return by_value
+
+    def boundary_cuts(self, within):
+        """Sorted word positions a span may not cross (WordCorpus.spans), built once."""
+        if within not in self.cuts:
+            corpus = self.index.corpus
+            if within == "verse":
+                self.cuts[within] = corpus.verse_cuts()
+            else:
+                self.cuts[within] = corpus.cuts_before(p["first_verse"] for p in self.parshas.values()
+                                                          if p["first_verse"] is not None)
+        return self.cuts[within]
+
+    def _spans(self, value, max_words, within, parsha_name, method):
+        """[(start, end)] word spans worth `value`, in corpus order."""
+        corpus = self.index.corpus
+        lo, hi = 0, len(corpus)
+        if parsha_name:
+            parsha = self.parshas[parsha_name]
+            lo, hi = corpus.word_range(parsha["first_verse"], parsha["last_verse"])
+        cuts = self.boundary_cuts(within) if within else None
+        return corpus.spans(value, max_words, cuts, lo, hi, method)
+
+    def value_query(self, value, params):
+        def flag(name):
+            return params.get(name, ["0"])[0] not in ("", "0", "false")
+
+        number = functools.partial(integer_param, params)
+        values = (value, value - 1, value + 1) if flag("colel") else (value,)
+        parsha = self.parsha_param(params)
+        method = self.method_param(params)
+        grouped = flag("grouped")
+        by_value = (self.groups if grouped else self.matches)(values, flag("single"), parsha, method)
+
+        tab = number("tab", value)
+        page = max(1, number("page", 1))
+        per_page = min(MAX_PER_PAGE, max(1, number("per_page", 10)))
+        in_tab = by_value.get(tab, [])
+        start = (page - 1) * per_page
+        return {
+            "value": value,
+            "method": method,
+            "values": list(values),
+            "counts": {str(v): sum(r.get("count", 1) for r in by_value[v]) for v in values},
+            "grouped": grouped,
+            "tab": tab,
+            "page": page,
+            "per_page": per_page,
+            "total": len(in_tab),
+            "pages": -(-len(in_tab) // per_page),
+            "results": in_tab[start:start + per_page]
+        }
+
+    @staticmethod
+    def directory_payload(entries):
+        return {
+            "values": [{"value": v, "count": c} for v, c in entries],
+            "postings": sum(c for _, c in entries)
+        }
+
+    def range_query(self, params):
+        lo, hi = integer_param(params, "min", None), integer_param(params, "max", None)
+        if hi < lo:
+            raise BadRequest("max must not be less than min")
+        return {"min": lo, "max": hi, **self.directory_payload(self.index.values(self.method_param(params)).in_range(lo, hi))}
+
+    def near_query(self, value, params):
+        k = integer_param(params, "k", 1)
+        if not 0 <= k <= MAX_TOLERANCE:
+            raise BadRequest(f"k must be between 0 and {MAX_TOLERANCE}")
+        return {"value": value, "k": k, **self.directory_payload(self.index.values(self.method_param(params)).within(value, k))}
+
+    def pairs_query(self, value, params):
+        limit = min(MAX_PAIRS, max(1, integer_param(params, "limit", 100)))
+        pairs = self.index.values(self.method_param(params)).pairs(value)
+        return {
+            "target": value,
+            "total": len(pairs),
+            "pairs": [{"a": a, "count_a": ca, "b": b, "count_b": cb} for a, ca, b, cb in pairs[:limit]]
+        }
+
+    def spans_query(self, value, params):
+        number = functools.partial(integer_param, params)
+        max_words = number("max_words", 0) or None
+        if max_words is not None and max_words < 0:
+            raise BadRequest("max_words must be positive")
+        within = params.get("within", [""])[0]
+        if within and within not in SPAN_BOUNDARIES:
+            raise BadRequest(f"within must be one of {', '.join(SPAN_BOUNDARIES)}")
+        parsha = self.parsha_param(params)
+        method = self.method_param(params)
+        spans = self.spans(value, max_words, within or None, parsha, method)
+
+        page = max(1, number("page", 1))
+        per_page = min(MAX_PER_PAGE, max(1, number("per_page", 10)))
+        start = (page - 1) * per_page
+        return {
+            "value": value,
+            "method": method,
+            "total": len(spans),
+            "page": page,
+            "per_page": per_page,
+            "pages": -(-len(spans) // per_page),
+            "results": [self.index.corpus.entry(*span) for span in spans[start:start + per_page]]
+        }
+
+    def route(self, method, target):
+        """(status, payload) for one request. Runs on a worker thread."""
+        if method != "GET":
+            return 405, {"error": "only GET is supported"}
+        url = urlsplit(target)
+        if url.path == "/api/health":
+            info = self.matches.cache_info()
+            return 200, {"status": "ok", "shards": self.index.shard_count(),
+                         "methods": list(self.index.methods),
+                         "cache": {"hits": info.hits, "misses": info.misses, "size": info.currsize}}
+        params = parse_qs(url.query)
+        match = VALUE_PATH_RE.match(url.path)
+        try:
+            if url.path == "/api/range":
+                return 200, self.range_query(params)
+            if not match:
+                return 404, {"error": f"no route for {url.path}"}
+            kind, value = match.group(1), int(match.group(2))
+            if kind == "near":
+                return 200, self.near_query(value, params)
+            if kind == "pairs":
+                return 200, self.pairs_query(value, params)
+            if kind == "spans":
+                return 200, self.spans_query(value, params)
+            return 200, self.value_query(value, params)
+        except BadRequest as e:
+            return 400, {"error": str(e)}
+        except Exception:
+            # e.g. a truncated or unreadable shard: answer, and keep serving
+            traceback.print_exc()
+            return 500, {"error": "internal error"}
+
+
+async def handle_connection(service, reader, writer):
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, version = request_line.decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            # Lookups are CPU-bound: keep them off the event loop
+            status, payload = await loop.run_in_executor(None, service.route, method, target)
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Cache-Control: public, max-age=300\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service, host, port):
+    server = await asyncio.start_server(functools.partial(handle_connection, service), host, port)
+    print(f"Serving {service.index.shard_count()} index shards on http://{host}:{port}/api/")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gematria index query service.")
+    parser.add_argument("--host", default=os.environ.get("QUERY_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("QUERY_PORT", 8000)))
+    parser.add_argument("--index", default=INDEX_DIR, help="directory with manifest.json and the shards")
+    parser.add_argument("--parshas", default=PARSHAS_PATH, help="parshas.js written by build_parshas.py")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="cached queries (LRU)")
+    args = parser.parse_args()
+
+    service = QueryService(args.index, args.parshas, args.cache_size)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Shared on-disk cache for Sefaria API responses.
+
+Every builder reads the Torah through this module instead of calling
+`requests.get` itself, so the Pentateuch is downloaded once and every later
+rebuild is served from disk.
+
+Layout of the cache directory:
+
+    objects/ab/ab12...ef.json   response bodies, named by their sha256
+    keys/<sha of key>.json      {"key", "object", "etag", "fetched_at"}
+
+A key is the API endpoint plus ref and query string, e.g.
+"texts/Genesis.1?context=0". Identical bodies share one object file.
+
+Environment:
+    SEFARIA_CACHE_DIR      cache location (point it at a fixture directory for tests)
+    SEFARIA_CACHE_MAX_AGE  seconds before an entry is revalidated (ETag), default 7 days
+    SEFARIA_OFFLINE=1      never touch the network; a missing entry is an error
+    SEFARIA_API_BASE       API root, default https://www.sefaria.org/api
+    SEFARIA_CONCURRENCY    requests in flight when prefetching (see fetcher.py)
+    SEFARIA_RATE_LIMIT     requests per second ceiling
+
+Run directly to warm the cache for the whole Torah:
+    python backend_tools/sefaria_cache.py
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+from fetcher import Fetcher
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# CONFIGURATION
+API_BASE = os.environ.get("SEFARIA_API_BASE", "https://www.sefaria.org/api").rstrip("/")
+CACHE_DIR = os.environ.get("SEFARIA_CACHE_DIR", os.path.join(script_dir, ".sefaria_cache"))
+MAX_AGE = int(os.environ.get("SEFARIA_CACHE_MAX_AGE", 7 * 24 * 3600))
+OFFLINE = os.environ.get("SEFARIA_OFFLINE", "") not in ("", "0")
+
+# Standard Chapter Counts
+BOOKS_STRUCTURE = [
+    ("Genesis", 50),
+    ("Exodus", 40),
+    ("Leviticus", 27),
+    ("Numbers", 36),
+    ("Deuteronomy", 34)
+]
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a key has never been fetched."""
+
+
+class SefariaCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_age=MAX_AGE, offline=OFFLINE, api_base=API_BASE, fetcher=None):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.offline = offline
+        self.api_base = api_base
+        self.fetcher = fetcher or Fetcher()
+        self.stats = {"hits": 0, "revalidated": 0, "downloaded": 0, "stale": 0}
+        self._stats_lock = threading.Lock()
+
+    # --- KEYS & OBJECTS ---
+
+    @staticmethod
+    def make_key(endpoint, ref, params=None):
+        key = f"{endpoint}/{ref}"
+        if params:
+            # dict or tuple of pairs (hashable, for prefetch batches)
+            items = params.items() if isinstance(params, dict) else params
+            key += "?" + urlencode(sorted(items))
+        return key
+
+    def _key_path(self, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "keys", digest + ".json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest + ".json")
+
+    def _read_entry(self, key):
+        try:
+            with open(self._key_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_atomic(self, path, payload):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def _store(self, key, body, etag):
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            self._write_atomic(object_path, body)
+        entry = {"key": key, "object": digest, "etag": etag, "fetched_at": time.time()}
+        self._write_atomic(self._key_path(key), json.dumps(entry).encode("utf-8"))
+        return entry
+
+    def _load_object(self, entry):
+        with open(self._object_path(entry["object"]), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def is_fresh(self, key):
+        entry = self._read_entry(key)
+        return entry is not None and (self.offline or time.time() - entry["fetched_at"] < self.max_age)
+
+    def object_hash(self, endpoint, ref, params=None):
+        """sha256 of the cached body for a key, or None if it was never fetched."""
+        entry = self._read_entry(self.make_key(endpoint, ref, params))
+        return entry["object"] if entry else None
+
+    # --- PUBLIC API ---
+
+    def get_json(self, endpoint, ref, params=None):
+        key = self.make_key(endpoint, ref, params)
+        entry = self._read_entry(key)
+
+        if entry is not None:
+            age = time.time() - entry["fetched_at"]
+            if self.offline or age < self.max_age:
+                self._count("hits")
+                return self._load_object(entry)
+
+        if self.offline:
+            raise CacheMiss(f"{key} is not in the cache at {self.cache_dir} (offline mode)")
+
+        url = f"{self.api_base}/{key}"
+        headers = {}
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+
+        try:
+            response = self.fetcher.get(url, headers)
+            data = self._parse(url, response)
+        except IOError as e:
+            if entry is None:
+                raise
+            # Serve the old copy rather than failing the whole build
+            print(f"  [STALE] {e}; using cached copy of {key}")
+            self._count("stale")
+            return self._load_object(entry)
+
+        if response.status_code == 304:
+            entry["fetched_at"] = time.time()
+            self._write_atomic(self._key_path(key), json.dumps(entry).encode("utf-8"))
+            self._count("revalidated")
+            return self._load_object(entry)
+
+        # Only a body that parsed is stored: a truncated or HTML error page
+        # would otherwise be served from the cache until it expires
+        self._store(key, response.content, response.headers.get("ETag"))
+        self._count("downloaded")
+        return data
+
+    @staticmethod
+    def _parse(url, response):
+        """The JSON body of a 200 response (None for a 304); IOError if it isn't JSON."""
+        if response.status_code == 304:
+            return None
+        try:
+            return json.loads(response.content)
+        except ValueError as e:
+            raise IOError(f"{url} returned a body that is not JSON: {e}") from e
+
+    def worker_copy(self):
+        """A fresh instance on the same directory and settings, for a pool worker."""
+        return SefariaCache(cache_dir=self.cache_dir, max_age=self.max_age,
+                            offline=self.offline, api_base=self.api_base)
+
+    def chapter(self, book, chapter_num):
+        """One chapter: {'he': [verse, ...], 'text': [verse, ...], ...}"""
+        return self.get_json("texts", f"{book}.{chapter_num}", {"context": 0})
+
+    def chapter_hash(self, book, chapter_num):
+        return self.object_hash("texts", f"{book}.{chapter_num}", {"context": 0})
+
+    def book(self, book, total_chapters=None):
+        """All chapters of a book, in order."""
+        if total_chapters is None:
+            total_chapters = dict(BOOKS_STRUCTURE)[book]
+        return [self.chapter(book, c) for c in range(1, total_chapters + 1)]
+
+    def index(self, book):
+        """Book metadata, including the 'alts' Parasha structure."""
+        return self.get_json("index", book)
+
+    def text_range(self, ref):
+        """Arbitrary ref such as 'Genesis 1:1-6:8' (jagged he/text arrays)."""
+        return self.get_json("texts", ref, {"context": 0, "pad": 0})
+
+    def prefetch(self, requests_to_make):
+        """Fetches every (endpoint, ref, params) that is missing or stale, concurrently.
+
+        Later get_json() calls for the same keys are then served from disk.
+        """
+        todo = [r for r in requests_to_make if not self.is_fresh(self.make_key(*r))]
+        if not todo or self.offline:
+            return {}
+        print(f"Fetching {len(todo)} resources from {self.api_base}...")
+        _, errors = self.fetcher.map(lambda r: self.get_json(*r), todo)
+        for (endpoint, ref, _params), e in errors.items():
+            print(f"  [FAILED] {endpoint}/{ref}: {e}")
+        return errors
+
+    def prefetch_corpus(self, books=BOOKS_STRUCTURE):
+        requests_to_make = []
+        for book, total_chapters in books:
+            requests_to_make.append(("index", book, None))
+            for chapter_num in range(1, total_chapters + 1):
+                requests_to_make.append(("texts", f"{book}.{chapter_num}", (("context", 0),)))
+        return self.prefetch(requests_to_make)
+
+    def summary(self):
+        s = self.stats
+        return (f"cache: {s['hits']} hits, {s['revalidated']} revalidated, "
+                f"{s['downloaded']} downloaded, {s['stale']} stale")
+
+
+if __name__ == "__main__":
+    cache = SefariaCache()
+    print(f"Warming Sefaria cache in {cache.cache_dir}...")
+    cache.prefetch_corpus()
+    print(cache.summary())
@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+FIXTURE_DIR = os.path.join(BACKEND_DIR, "fixtures", "sefaria")
+
+
+def run_build(output_root, *args):
+    """Runs build.py offline over the fixture corpus, writing (and keeping its state) under output_root."""
+    env = {**os.environ, "BUILD_OUTPUT_ROOT": str(output_root),
+           "BUILD_STATE_DIR": os.path.join(output_root, "state"),
+           "SEFARIA_CACHE_DIR": FIXTURE_DIR, "SEFARIA_OFFLINE": "1"}
+    subprocess.run([sys.executable, os.path.join(BACKEND_DIR, "build.py"), *args], env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+class StubServer:
+    """Local stand-in for the Sefaria API.
+
+    Answers each GET with the next scripted (status, headers, body) from
+    `responses`, repeating the last one once the script runs out, and records
+    every request as (path, headers).
+    """
+
+    def __init__(self):
+        self.responses = [(200, {}, b"{}")]
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append((self.path, dict(self.headers)))
+                status, headers, body = stub.responses.pop(0) if len(stub.responses) > 1 else stub.responses[0]
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api"
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05},
+                                       daemon=True)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    server.thread.start()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Every time.sleep() of the fetcher, still slept; a list of the seconds."""
+    import fetcher
+
+    recorded = []
+    real_sleep = fetcher.time.sleep
+
+    def sleep(seconds):
+        recorded.append(seconds)
+        real_sleep(seconds)
+
+    monkeypatch.setattr(fetcher.time, "sleep", sleep)
+    return recorded
+
+
+@pytest.fixture(scope="session")
+def fixture_index(tmp_path_factory):
+    """public/torah_index built from the fixture corpus (Genesis-Deuteronomy 1-3)."""
+    root = tmp_path_factory.mktemp("build")
+    run_build(root, "index", "--full")
+    return os.path.join(root, "public", "torah_index")
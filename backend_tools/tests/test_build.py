@@ -0,0 +1,54 @@
+import os
+
+from conftest import run_build
+
+STAGES = ["index", "text", "timeline", "race"]
+
+
+def read_tree(root):
+    """{relative path: bytes} of every artifact under root, leaving out the build state."""
+    tree = {}
+    for top in ("public", "src"):
+        for dirpath, _, filenames in os.walk(os.path.join(root, top)):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                with open(path, "rb") as f:
+                    tree[os.path.relpath(path, root)] = f.read()
+    return tree
+
+
+def test_parallel_build_is_byte_identical(tmp_path):
+    run_build(tmp_path / "serial", *STAGES, "--full")
+    run_build(tmp_path / "parallel", "-j", "3", *STAGES, "--full")
+
+    serial = read_tree(tmp_path / "serial")
+    parallel = read_tree(tmp_path / "parallel")
+    assert any(path.startswith(os.path.join("public", "torah_index")) for path in serial)
+    assert sorted(parallel) == sorted(serial)
+    assert [path for path in serial if parallel[path] != serial[path]] == []
+
+
+def modified_times(root):
+    return {path: os.stat(os.path.join(root, path)).st_mtime_ns for path in read_tree(root)}
+
+
+def test_rebuild_without_changes_rewrites_nothing(tmp_path):
+    run_build(tmp_path / "full", *STAGES, "--full")
+    run_build(tmp_path, *STAGES)
+    before = modified_times(tmp_path)
+    run_build(tmp_path, *STAGES)
+
+    assert modified_times(tmp_path) == before
+    assert read_tree(tmp_path) == read_tree(tmp_path / "full")
+
+
+def test_rebuild_restores_deleted_index_files(tmp_path):
+    run_build(tmp_path, *STAGES)
+    expected = read_tree(tmp_path)
+    index_dir = os.path.join(tmp_path, "public", "torah_index")
+    deleted = sorted(name for name in os.listdir(index_dir) if name.endswith(".bin"))[::7]
+    for name in deleted:
+        os.remove(os.path.join(index_dir, name))
+    run_build(tmp_path, *STAGES)
+
+    assert read_tree(tmp_path) == expected
@@ -0,0 +1,39 @@
+from bisect import bisect_right
+
+from build_torah_text import bucket_counts, build_word_index
+
+
+def cumulative(steps, n):
+    """bucket_counts steps back to one count per bucket, as TrendsView decodes them."""
+    counts, bucket, count = [], -1, 0
+    steps = iter(steps)
+    step = next(steps, None)
+    for b in range(n):
+        if step and b == bucket + step[0]:
+            bucket, count = b, step[1]
+            step = next(steps, None)
+        counts.append(count)
+    return counts
+
+
+def test_bucket_counts():
+    buckets = [0, 50, 100, 120]
+    # Repeats in one verse, on a boundary, and none in the third bucket
+    postings = [0, 0, 50, 101, 101, 120]
+
+    assert bucket_counts(postings, buckets) == [[1, 2], [1, 3], [2, 6]]
+    assert cumulative(bucket_counts(postings, buckets), 4) == [2, 3, 3, 6]
+    assert bucket_counts([], buckets) == []
+
+
+def test_word_index_counts_match_postings():
+    verses = ["ויאמר אלהים יהי אור", "וירא אלהים את האור", "ויקרא אלהים לאור יום"] * 40
+    index = build_word_index({"t": verses, "o": verses})
+    buckets = index["buckets"]
+    assert buckets == [0, 50, 100, 119]
+
+    for kind in ("exact", "stem"):
+        for word, gaps in index[kind].items():
+            postings = [sum(gaps[:k + 1]) for k in range(len(gaps))]
+            expected = [bisect_right(postings, boundary) for boundary in buckets]
+            assert cumulative(index[f"{kind}_counts"][word], len(buckets)) == expected, (kind, word)
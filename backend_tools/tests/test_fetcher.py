@@ -0,0 +1,71 @@
+import pytest
+
+from fetcher import Fetcher
+
+
+def test_returns_first_success(stub_server):
+    stub_server.responses = [(200, {"ETag": '"v1"'}, b'{"he": []}')]
+    fetcher = Fetcher(rate_limit=100)
+
+    response = fetcher.get(f"{stub_server.url}/texts/Genesis.1")
+
+    assert response.status_code == 200
+    assert response.json() == {"he": []}
+    assert fetcher.stats == {"requests": 1, "bytes": len(b'{"he": []}'), "retries": 0}
+
+
+def test_429_throttles_and_honours_retry_after(stub_server, sleeps):
+    stub_server.responses = [(429, {"Retry-After": "0.2"}, b"slow down"), (200, {}, b"{}")]
+    fetcher = Fetcher(rate_limit=100)
+
+    response = fetcher.get(f"{stub_server.url}/texts/Genesis.1")
+
+    assert response.status_code == 200
+    assert len(stub_server.requests) == 2
+    assert fetcher.stats["retries"] == 1
+    # Waited what the server asked for, not a jittered backoff
+    assert sleeps[0] == pytest.approx(0.2)
+    # ...and halved the request rate; the success wins a little of it back
+    assert fetcher.bucket.rate == pytest.approx(100 / 2 + 0.1 * 100)
+
+
+def test_retry_after_is_capped_at_backoff_max(stub_server, sleeps):
+    stub_server.responses = [(429, {"Retry-After": "86400"}, b""), (200, {}, b"{}")]
+    fetcher = Fetcher(rate_limit=100, backoff_max=0.1)
+
+    assert fetcher.get(f"{stub_server.url}/texts/Genesis.1").status_code == 200
+    # A day's Retry-After waits backoff_max; a negative one doesn't wait
+    assert sleeps[0] == 0.1
+    assert fetcher._backoff(0, retry_after=-5) == 0.0
+
+
+def test_429_without_retry_after_backs_off(stub_server, sleeps):
+    stub_server.responses = [(429, {}, b""), (200, {}, b"{}")]
+    fetcher = Fetcher(rate_limit=100, backoff_base=0.05)
+
+    assert fetcher.get(f"{stub_server.url}/texts/Genesis.1").status_code == 200
+    assert 0 <= sleeps[0] <= 0.05
+
+
+def test_retries_exhausted(stub_server, sleeps):
+    stub_server.responses = [(503, {}, b"unavailable")]
+    fetcher = Fetcher(rate_limit=100, max_retries=3, backoff_base=0.01)
+
+    with pytest.raises(IOError, match="HTTP 503"):
+        fetcher.get(f"{stub_server.url}/texts/Genesis.1")
+
+    assert len(stub_server.requests) == 3
+    assert fetcher.stats["retries"] == 2
+    # Backoff between attempts only: none after the last one
+    assert len(sleeps) == 2
+
+
+def test_client_error_is_not_retried(stub_server, sleeps):
+    stub_server.responses = [(404, {}, b"not found")]
+    fetcher = Fetcher(rate_limit=100)
+
+    with pytest.raises(IOError, match="HTTP 404"):
+        fetcher.get(f"{stub_server.url}/texts/Genesis.99")
+
+    assert len(stub_server.requests) == 1
+    assert sleeps == []
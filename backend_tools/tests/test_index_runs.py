@@ -0,0 +1,70 @@
+import numpy as np
+
+from index_runs import RUN_DTYPE, SortedRuns, WordStream
+
+
+def chapter_postings(rng, first_verse, n):
+    """n random (value, verse, start, len) rows in corpus order, values with many ties."""
+    verses = np.sort(rng.integers(first_verse, first_verse + 10, n))
+    return np.column_stack([rng.integers(1, 60, n), verses, rng.integers(0, 20, n), rng.integers(0, 4, n)])
+
+
+def in_memory_shards(postings, shard_size):
+    """The reference: one stable sort by value, cut at shard boundaries."""
+    rows = postings[np.argsort(postings[:, 0], kind="stable")]
+    keys = rows[:, 0] // shard_size
+    return [(int(k), rows[keys == k]) for k in np.unique(keys)]
+
+
+def test_merge_of_many_runs_equals_one_sort(tmp_path):
+    rng = np.random.default_rng(7)
+    chapters = [chapter_postings(rng, 10 * c, int(rng.integers(0, 40))) for c in range(30)]
+    # Room for 16 postings: every few chapters spill a run of their own
+    runs = SortedRuns(str(tmp_path), 16 * RUN_DTYPE.itemsize)
+    for postings in chapters:
+        runs.add(postings)
+
+    shards = list(runs.shards(shard_size=10))
+
+    assert len(runs.paths) > 5
+    expected = in_memory_shards(np.concatenate(chapters), 10)
+    assert [k for k, _ in shards] == [k for k, _ in expected]
+    for (_, rows), (_, want) in zip(shards, expected):
+        # Equal values stay in corpus order across runs
+        np.testing.assert_array_equal(rows, want)
+
+
+def test_shard_boundaries_and_gaps(tmp_path):
+    runs = SortedRuns(str(tmp_path), RUN_DTYPE.itemsize)  # a run per add
+    runs.add(np.array([[19, 0, 0, 1], [20, 0, 1, 1]]))
+    runs.add(np.array([[20, 1, 0, 1], [95, 1, 1, 1], [9, 1, 2, 1]]))
+
+    shards = [(k, rows.tolist()) for k, rows in runs.shards(shard_size=10)]
+
+    assert shards == [(0, [[9, 1, 2, 1]]), (1, [[19, 0, 0, 1]]), (2, [[20, 0, 1, 1], [20, 1, 0, 1]]),
+                      (9, [[95, 1, 1, 1]])]
+    assert runs.total == 5
+
+
+def test_no_postings(tmp_path):
+    runs = SortedRuns(str(tmp_path), 1024)
+    runs.add(np.zeros((0, 4), dtype=np.int64))
+    assert list(runs.shards(10)) == []
+
+
+def test_word_stream(tmp_path):
+    corpus = WordStream(str(tmp_path), ["standard"])
+    corpus.add_chapter(0, [["a", "b"], ["b"]], [11, 12], {"standard": [1, 2, 2]})
+    corpus.add_chapter(5, [], [], {"standard": []})
+    corpus.add_chapter(7, [["c", "a", "a"]], [13], {"standard": [3, 1, 1]})
+    corpus.close_writer()
+
+    assert len(corpus) == 3
+    assert corpus.vocabulary == {"a": 0, "b": 1, "c": 2}
+    assert corpus["words"].tolist() == [0, 1, 1, 2, 0, 0]
+    assert corpus["verse_offsets"].tolist() == [0, 2, 3, 6]
+    assert corpus["verse_id"].tolist() == [0, 1, 7]
+    assert corpus["verse_hash"].tolist() == [11, 12, 13]
+    corpus.CHUNK = 4
+    assert [c.tolist() for c in corpus.chunks("word_value.standard")] == [[1, 2, 2, 3], [1, 1]]
+    corpus.close()
@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+
+from conftest import BACKEND_DIR
+from query_server import QueryService, load_parshas, locate_parsha
+from verse_ids import VerseTable
+
+PARSHAS_PATH = os.path.join(BACKEND_DIR, "..", "src", "utils", "parshas.js")
+VERSE_TABLE_PATH = os.path.join(BACKEND_DIR, "..", "src", "data", "verse_table.json")
+
+
+@pytest.fixture(scope="module")
+def service(fixture_index):
+    return QueryService(fixture_index, PARSHAS_PATH)
+
+
+def test_spans(service):
+    status, payload = service.route("GET", "/api/spans/26?max_words=2")
+
+    assert status == 200
+    assert payload["total"] > 0
+
+
+def test_spans_in_parsha_outside_the_index(service):
+    # The fixture holds Genesis 1-3, so Bereshit (Genesis 1:1-6:8) is cut short
+    status, payload = service.route("GET", "/api/spans/26?parsha=Bereshit")
+
+    assert status == 400
+    assert "not in the index" in payload["error"]
+    assert service.route("GET", "/api/spans/26?parsha=Vayechi")[0] == 400
+
+
+def test_spans_in_unknown_parsha(service):
+    status, payload = service.route("GET", "/api/spans/26?parsha=Nowhere")
+
+    assert status == 400
+    assert "unknown parsha" in payload["error"]
+
+
+def test_value_query_in_parsha_outside_the_index(service):
+    status, payload = service.route("GET", "/api/value/26?parsha=Vayechi&grouped=1")
+
+    assert status == 400
+    assert "not in the index" in payload["error"]
+
+
+def test_parshas_located_in_the_full_table():
+    with open(VERSE_TABLE_PATH, "r", encoding="utf-8") as f:
+        verses = VerseTable.from_json(json.load(f))
+
+    for parsha in load_parshas(PARSHAS_PATH):
+        assert locate_parsha(parsha, verses) == {**parsha, "indexed": True}
+
+
+def test_parshas_located_in_a_partial_table():
+    # Genesis 1-3 and Exodus 1 only: Exodus 1:1 is id 80, not parshas.js's 1533
+    verses = VerseTable([("Genesis", [31, 25, 24]), ("Exodus", [22])])
+    parshas = {p["name"]: p for p in load_parshas(PARSHAS_PATH)}
+
+    bereshit = locate_parsha(parshas["Bereshit"], verses)
+    assert (bereshit["first_verse"], bereshit["last_verse"], bereshit["indexed"]) == (0, None, False)
+    shemot = locate_parsha(parshas["Shemot"], verses)
+    assert (shemot["first_verse"], shemot["indexed"]) == (80, False)
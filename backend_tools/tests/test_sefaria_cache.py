@@ -0,0 +1,136 @@
+import json
+import shutil
+
+import pytest
+
+from conftest import FIXTURE_DIR
+from fetcher import Fetcher
+from hebrew import tokenize
+from sefaria_cache import CacheMiss, SefariaCache
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    """A writable copy of the fixture cache."""
+    path = tmp_path / "cache"
+    shutil.copytree(FIXTURE_DIR, path)
+    return str(path)
+
+
+def online_cache(cache_dir, stub_server, **kwargs):
+    return SefariaCache(cache_dir=cache_dir, offline=False, api_base=stub_server.url,
+                        fetcher=Fetcher(rate_limit=100, max_retries=2, backoff_base=0.01), **kwargs)
+
+
+def test_offline_hit():
+    cache = SefariaCache(cache_dir=FIXTURE_DIR, offline=True)
+
+    chapter = cache.chapter("Genesis", 1)
+
+    assert len(chapter["he"]) == 31
+    assert tokenize(chapter["he"][0])[:3] == ["בראשית", "ברא", "אלהים"]
+    assert cache.stats["hits"] == 1
+    assert cache.chapter_hash("Genesis", 1) is not None
+
+
+def test_offline_miss():
+    cache = SefariaCache(cache_dir=FIXTURE_DIR, offline=True)
+
+    with pytest.raises(CacheMiss, match="Genesis.4"):
+        cache.chapter("Genesis", 4)
+
+    assert cache.chapter_hash("Genesis", 4) is None
+    assert cache.stats == {"hits": 0, "revalidated": 0, "downloaded": 0, "stale": 0}
+
+
+def test_fresh_entry_is_served_from_disk(cache_dir, stub_server):
+    cache = online_cache(cache_dir, stub_server, max_age=7 * 24 * 3600)
+    key = cache.make_key("texts", "Genesis.1", {"context": 0})
+    entry = cache._read_entry(key)
+    entry["fetched_at"] = 2e9  # far in the future: fresh
+    cache._write_atomic(cache._key_path(key), json.dumps(entry).encode("utf-8"))
+
+    assert len(cache.chapter("Genesis", 1)["he"]) == 31
+    assert stub_server.requests == []
+    assert cache.stats["hits"] == 1
+
+
+def test_stale_entry_revalidated_with_etag(cache_dir, stub_server):
+    stub_server.responses = [(304, {}, b"")]
+    cache = online_cache(cache_dir, stub_server, max_age=60)
+    key = cache.make_key("texts", "Genesis.1", {"context": 0})
+    entry = cache._read_entry(key)
+    expected = SefariaCache(cache_dir=FIXTURE_DIR, offline=True).chapter("Genesis", 1)
+
+    assert cache.chapter("Genesis", 1) == expected
+
+    (path, headers), = stub_server.requests
+    assert path == "/api/texts/Genesis.1?context=0"
+    assert headers["If-None-Match"] == entry["etag"]
+    assert cache.stats["revalidated"] == 1
+    # The entry is fresh again, still pointing at the same object
+    revalidated = cache._read_entry(key)
+    assert revalidated["object"] == entry["object"]
+    assert revalidated["fetched_at"] > entry["fetched_at"]
+    assert cache.is_fresh(key)
+
+
+def test_stale_entry_replaced_when_changed(cache_dir, stub_server):
+    body = json.dumps({"he": ["new"], "text": ["new"]}).encode("utf-8")
+    stub_server.responses = [(200, {"ETag": '"v2"'}, body)]
+    cache = online_cache(cache_dir, stub_server, max_age=60)
+    old_hash = cache.chapter_hash("Genesis", 1)
+
+    assert cache.chapter("Genesis", 1) == {"he": ["new"], "text": ["new"]}
+
+    assert cache.stats["downloaded"] == 1
+    assert cache.chapter_hash("Genesis", 1) != old_hash
+    assert cache._read_entry(cache.make_key("texts", "Genesis.1", {"context": 0}))["etag"] == '"v2"'
+
+
+def test_stale_copy_served_when_fetch_fails(cache_dir, stub_server, sleeps):
+    stub_server.responses = [(503, {}, b"unavailable")]
+    cache = online_cache(cache_dir, stub_server, max_age=60)
+
+    assert len(cache.chapter("Genesis", 1)["he"]) == 31
+
+    assert len(stub_server.requests) == 2
+    assert cache.stats["stale"] == 1
+
+
+def test_miss_downloads_and_stores(cache_dir, stub_server):
+    body = json.dumps({"he": ["א"], "text": ["a"]}).encode("utf-8")
+    stub_server.responses = [(200, {"ETag": '"g4"'}, body)]
+    cache = online_cache(cache_dir, stub_server)
+
+    assert cache.chapter("Genesis", 4) == {"he": ["א"], "text": ["a"]}
+
+    offline = SefariaCache(cache_dir=cache_dir, offline=True)
+    assert offline.chapter("Genesis", 4) == {"he": ["א"], "text": ["a"]}
+    assert "If-None-Match" not in stub_server.requests[0][1]
+
+
+def test_non_json_body_is_not_cached(cache_dir, stub_server):
+    body = json.dumps({"he": ["א"], "text": ["a"]}).encode("utf-8")
+    stub_server.responses = [(200, {}, b"<html>Bad gateway</html>"), (200, {"ETag": '"g4"'}, body)]
+    cache = online_cache(cache_dir, stub_server)
+
+    with pytest.raises(IOError, match="not JSON"):
+        cache.chapter("Genesis", 4)
+    assert cache.chapter_hash("Genesis", 4) is None
+
+    # The next request goes back to the network instead of replaying the bad body
+    assert cache.chapter("Genesis", 4) == {"he": ["א"], "text": ["a"]}
+    assert len(stub_server.requests) == 2
+    assert cache.stats["downloaded"] == 1
+
+
+def test_non_json_body_keeps_the_stale_copy(cache_dir, stub_server):
+    stub_server.responses = [(200, {}, b'{"he": ["trunc')]
+    cache = online_cache(cache_dir, stub_server, max_age=60)
+    old_hash = cache.chapter_hash("Genesis", 1)
+
+    assert len(cache.chapter("Genesis", 1)["he"]) == 31
+
+    assert cache.stats["stale"] == 1
+    assert cache.chapter_hash("Genesis", 1) == old_hash
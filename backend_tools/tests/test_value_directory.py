@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from index_format import IndexWriter, ShardedIndex, ValueDirectory
+
+
+def write_directory(path, values, counts):
+    with IndexWriter(str(path), {}) as w:
+        w.add_array("values", "u32", values)
+        w.add_array("counts", "u32", counts)
+    return ValueDirectory.open(str(path))
+
+
+def brute_range(values, counts, lo, hi):
+    return [(v, c) for v, c in zip(values, counts) if lo <= v <= hi]
+
+
+def brute_pairs(values, counts, target):
+    count = dict(zip(values, counts))
+    return [(a, count[a], target - a, count[target - a]) for a in values if a <= target - a and target - a in count]
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return write_directory(tmp_path / "values.bin", [1, 2, 5, 10, 13, 26], [7, 1, 3, 2, 4, 9])
+
+
+def test_in_range_includes_both_ends(directory):
+    assert directory.in_range(2, 10) == [(2, 1), (5, 3), (10, 2)]
+    assert directory.in_range(3, 9) == [(5, 3)]
+    assert directory.in_range(26, 26) == [(26, 9)]
+    assert directory.in_range(0, 1) == [(1, 7)]
+
+
+def test_in_range_empty(directory):
+    assert directory.in_range(27, 100) == []
+    assert directory.in_range(6, 9) == []
+    assert directory.in_range(10, 2) == []
+
+
+def test_within(directory):
+    assert directory.within(11, 2) == [(10, 2), (13, 4)]
+    assert directory.within(1, 5) == [(1, 7), (2, 1), (5, 3)]
+    assert directory.within(5, 0) == [(5, 3)]
+
+
+def test_pairs(directory):
+    # 26 = 13 + 13: one value twice meets in the middle of the walk
+    assert directory.pairs(26) == [(13, 4, 13, 4)]
+    assert directory.pairs(15) == [(2, 1, 13, 4), (5, 3, 10, 2)]
+    assert directory.pairs(27) == [(1, 7, 26, 9)]
+    # Every value is larger than the target's partner could be
+    assert directory.pairs(1) == []
+    assert directory.pairs(53) == []
+
+
+def test_empty_directory(tmp_path):
+    directory = write_directory(tmp_path / "values.bin", [], [])
+    assert len(directory) == 0
+    assert directory.in_range(0, 100) == []
+    assert directory.pairs(10) == []
+
+
+def test_matches_brute_force(tmp_path):
+    rng = random.Random(1)
+    for trial in range(20):
+        values = sorted(rng.sample(range(1, 200), rng.randint(1, 40)))
+        counts = [rng.randint(1, 9) for _ in values]
+        directory = write_directory(tmp_path / f"values-{trial}.bin", values, counts)
+        for target in range(0, 402, 7):
+            assert directory.pairs(target) == brute_pairs(values, counts, target)
+            assert directory.within(target // 2, trial) == brute_range(values, counts, target // 2 - trial,
+                                                                     target // 2 + trial)
+
+
+def test_fixture_directories(fixture_index):
+    index = ShardedIndex(fixture_index)
+    for method, info in index.methods.items():
+        directory = index.values(method)
+        values, counts = list(directory.values), list(directory.counts)
+        assert values == sorted(set(values))
+        # The directory counts every posting of every shard
+        assert sum(counts) == info["postings"]
+        for target in (26, 86, 376, 913):
+            assert directory.pairs(target) == brute_pairs(values, counts, target)
+            assert directory.within(target, 3) == brute_range(values, counts, target - 3, target + 3)
@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+
+from conftest import BACKEND_DIR
+from verse_ids import VerseTable
+
+VERSE_TABLE_PATH = os.path.join(BACKEND_DIR, "..", "src", "data", "verse_table.json")
+
+
+@pytest.fixture(scope="module")
+def table():
+    with open(VERSE_TABLE_PATH, "r", encoding="utf-8") as f:
+        return VerseTable.from_json(json.load(f))
+
+
+def test_every_verse_round_trips(table):
+    expected = 0
+    for book, counts in table.books:
+        for chapter, count in enumerate(counts, start=1):
+            for verse in range(1, count + 1):
+                assert table.verse_id(book, chapter, verse) == expected
+                assert table.locate(expected) == (book, chapter, verse)
+                assert table.ref(expected) == f"{book} {chapter}:{verse}"
+                expected += 1
+    assert expected == len(table) == 5846
+
+
+@pytest.mark.parametrize("book, first, last, last_ref", [
+    ("Genesis", 0, 1532, "Genesis 50:26"),
+    ("Exodus", 1533, 2742, "Exodus 40:38"),
+    ("Leviticus", 2743, 3601, "Leviticus 27:34"),
+    ("Numbers", 3602, 4889, "Numbers 36:13"),
+    ("Deuteronomy", 4890, 5845, "Deuteronomy 34:12"),
+])
+def test_book_ends(table, book, first, last, last_ref):
+    assert table.ref(first) == f"{book} 1:1"
+    assert table.verse_id(book, 1, 1) == first
+    assert table.ref(last) == last_ref
+    # The next id is the next book's first verse (or past the end)
+    if last + 1 < len(table):
+        assert table.locate(last + 1)[1:] == (1, 1)
+
+
+def test_out_of_range(table):
+    with pytest.raises(IndexError):
+        table.locate(-1)
+    with pytest.raises(IndexError):
+        table.locate(len(table))
+
+
+def test_range_ref(table):
+    assert table.range_ref(0, 0) == "Genesis 1:1"
+    assert table.range_ref(0, 30) == "Genesis 1:1-31"
+    assert table.range_ref(0, 145) == "Genesis 1:1-6:8"
+    assert table.range_ref(1532, 1533) == "Genesis 50:26-Exodus 1:1"
+
+
+def test_json_round_trip(table):
+    assert VerseTable.from_json(json.loads(json.dumps(table.to_json()))).books == table.books
+
+
+def test_from_chapters_with_missing_chapters():
+    table = VerseTable.from_chapters([("Genesis", 1, 31), ("Genesis", 3, 24), ("Exodus", 1, 22)])
+
+    assert table.books == [("Genesis", [31, 0, 24]), ("Exodus", [22])]
+    assert table.verse_id("Genesis", 3, 1) == 31
+    assert table.locate(31) == ("Genesis", 3, 1)
+    assert table.locate(55) == ("Exodus", 1, 1)
+    assert table.holds("Genesis", 1, 31)
+    assert not table.holds("Genesis", 2, 1)
+    assert not table.holds("Genesis", 1, 32)
+    assert not table.holds("Exodus", 2, 1)
+    assert not table.holds("Numbers", 1, 1)
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from index_format import IndexWriter, ShardedIndex, WordCorpus
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Three verses (ids 10-12) of words worth 1 2 3 | 4 5 | 6."""
+    path = str(tmp_path / "words.bin")
+    with IndexWriter(path, {}) as w:
+        w.add_strings("word", ["a", "b", "c", "d", "e", "f"])
+        w.add_array("words", "u32", range(6))
+        w.add_array("word_value.standard", "u16", [1, 2, 3, 4, 5, 6])
+        w.add_array("verse_id", "u32", [10, 11, 12])
+        w.add_array("verse_word_offsets", "u32", [0, 3, 5, 6])
+    return WordCorpus.open(path, None)
+
+
+def brute_spans(values, target, max_words=None, cuts=(), lo=0, hi=None):
+    hi = len(values) if hi is None else hi
+    return [(start, end)
+            for end in range(lo + 1, hi + 1)
+            for start in range(lo, end)
+            if sum(values[start:end]) == target
+            and not (max_words and end - start > max_words)
+            and not any(start < cut < end for cut in cuts)]
+
+
+def test_spans_cross_verses_unless_cut(corpus):
+    assert corpus.spans(6) == [(0, 3), (5, 6)]
+    assert corpus.spans(7) == [(2, 4)]
+    assert corpus.spans(7, cuts=corpus.verse_cuts()) == []
+    assert corpus.spans(9) == [(1, 4), (3, 5)]
+    assert corpus.spans(9, cuts=corpus.verse_cuts()) == [(3, 5)]
+
+
+def test_a_run_may_end_at_a_cut(corpus):
+    assert corpus.verse_cuts() == [3, 5, 6]
+    assert corpus.spans(3, cuts=corpus.verse_cuts()) == [(0, 2), (2, 3)]
+    assert corpus.spans(15, cuts=[5, 6]) == [(0, 5)]
+
+
+def test_cuts_before(corpus):
+    assert corpus.cuts_before([11]) == [3, 6]
+    assert corpus.cuts_before([12, 10, 99]) == [0, 5, 6]
+    assert corpus.spans(9, cuts=corpus.cuts_before([11])) == [(3, 5)]
+
+
+def test_max_words_and_bounds(corpus):
+    assert corpus.spans(6, max_words=2) == [(5, 6)]
+    assert corpus.spans(6, lo=1) == [(5, 6)]
+    assert corpus.spans(6, hi=5) == [(0, 3)]
+    assert corpus.spans(9, lo=1, hi=4) == [(1, 4)]
+    assert corpus.word_range(11, 12) == (3, 6)
+
+
+def test_no_spans_for_non_positive_targets(corpus):
+    assert corpus.spans(0) == []
+    assert corpus.spans(-3) == []
+    assert corpus.spans(22) == []
+    assert corpus.spans(21) == [(0, 6)]
+
+
+def test_prefix_sums_are_built_once_per_method(corpus):
+    first = corpus.spans(9)
+    prefix = corpus.prefix_sums["standard"]
+    assert corpus.spans(9) == first
+    assert corpus.prefix_sums["standard"] is prefix
+    assert list(prefix[0]) == [0, 1, 3, 6, 10, 15, 21]
+
+
+@pytest.mark.parametrize("method", ["standard", "katan"])
+def test_fixture_corpus_matches_brute_force(fixture_index, method):
+    corpus = ShardedIndex(fixture_index).corpus
+    values = list(corpus.word_value(method))
+    rng = random.Random(method)
+    cuts = corpus.verse_cuts()
+    for _ in range(20):
+        lo = rng.randrange(len(corpus) - 200)
+        hi = lo + rng.randrange(1, 200)
+        start = rng.randrange(lo, hi)
+        end = rng.randrange(start + 1, hi + 1)
+        target = sum(values[start:end])
+        assert (start, end) in corpus.spans(target, lo=lo, hi=hi, method=method)
+        for kwargs in ({}, {"max_words": 4}, {"cuts": cuts}, {"max_words": 6, "cuts": cuts}):
+            expected = brute_spans(values, target, lo=lo, hi=hi, **kwargs)
+            assert corpus.spans(target, lo=lo, hi=hi, method=method, **kwargs) == expected
@@ -0,0 +1,86 @@
+"""
+Global verse ids.
+
+Every artifact refers to a verse by its 0-based position in the corpus
+(Chapter.first_index + verse - 1) instead of a "Book C:V" string. The
+mapping back is a table of verse counts per chapter, one small integer per
+chapter:
+
+    {"books": [["Genesis", [31, 25, 24, ...]], ["Exodus", [...]], ...]}
+
+build_timeline.py writes it to src/data/verse_table.json; the index
+manifest carries a copy. src/utils/verseIds.js decodes it the same way.
+"""
+from bisect import bisect_right
+
+
+class VerseTable:
+    def __init__(self, books):
+        """books: [(book, [verse count of chapter 1, chapter 2, ...])] in corpus order."""
+        self.books = [(book, list(counts)) for book, counts in books]
+        self.chapters = []        # (book, chapter) in order
+        self.chapter_starts = []  # global id of each chapter's first verse
+        self.book_starts = {}     # book -> index into self.chapters of its chapter 1
+        total = 0
+        for book, counts in self.books:
+            self.book_starts[book] = len(self.chapters)
+            for number, count in enumerate(counts, start=1):
+                self.chapters.append((book, number))
+                self.chapter_starts.append(total)
+                total += count
+        self.total = total
+
+    @classmethod
+    def from_chapters(cls, chapters):
+        """From (book, chapter, verse count) in corpus order; missing chapters count 0 verses."""
+        books = []
+        for book, number, count in chapters:
+            if not books or books[-1][0] != book:
+                books.append((book, []))
+            counts = books[-1][1]
+            counts.extend([0] * (number - 1 - len(counts)))
+            counts.append(count)
+        return cls(books)
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["books"])
+
+    def to_json(self):
+        return {"books": [[book, counts] for book, counts in self.books]}
+
+    def __len__(self):
+        return self.total
+
+    def holds(self, book, chapter, verse):
+        """Whether the table has Book chapter:verse (a chapter that wasn't read has no verses)."""
+        counts = dict(self.books).get(book, [])
+        return 1 <= chapter <= len(counts) and 1 <= verse <= counts[chapter - 1]
+
+    def verse_id(self, book, chapter, verse):
+        return self.chapter_starts[self.book_starts[book] + chapter - 1] + verse - 1
+
+    def locate(self, verse_id):
+        """(book, chapter, verse) of a global verse id."""
+        if not 0 <= verse_id < self.total:
+            raise IndexError(f"verse id {verse_id} out of range")
+        k = bisect_right(self.chapter_starts, verse_id) - 1
+        book, chapter = self.chapters[k]
+        return book, chapter, verse_id - self.chapter_starts[k] + 1
+
+    def ref(self, verse_id):
+        """"Book C:V" of a global verse id."""
+        book, chapter, verse = self.locate(verse_id)
+        return f"{book} {chapter}:{verse}"
+
+    def range_ref(self, first, last):
+        """"Book C:V", "Book C:V-W" or "Book C:V-D:W" for verses first..last."""
+        book, chapter, verse = self.locate(first)
+        if last == first:
+            return f"{book} {chapter}:{verse}"
+        end_book, end_chapter, end_verse = self.locate(last)
+        if end_book != book:
+            return f"{book} {chapter}:{verse}-{end_book} {end_chapter}:{end_verse}"
+        if end_chapter != chapter:
+            return f"{book} {chapter}:{verse}-{end_chapter}:{end_verse}"
+        return f"{book} {chapter}:{verse}-{end_verse}"
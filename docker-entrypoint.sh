@@ -0,0 +1,32 @@
+#!/bin/sh
+# Runs nginx and, when the image holds an index to serve, the query service
+# (backend_tools/query_server.py). If either process exits, the other is
+# stopped and the container exits non-zero, so the restart policy brings both
+# back instead of nginx answering every /api/ call alone.
+
+if [ "$QUERY_SERVER" = 0 ]; then
+    exec nginx -g 'daemon off;'
+fi
+if [ ! -f "$QUERY_INDEX_DIR/manifest.json" ]; then
+    echo "query service disabled: no index at $QUERY_INDEX_DIR (run build.py index)" >&2
+    exec nginx -g 'daemon off;'
+fi
+
+python3 /srv/query/query_server.py &
+server=$!
+nginx -g 'daemon off;' &
+nginx=$!
+
+trap 'kill -TERM "$server" "$nginx" 2>/dev/null; wait; exit 0' TERM INT
+
+while kill -0 "$server" 2>/dev/null && kill -0 "$nginx" 2>/dev/null; do
+    sleep 1
+done
+if kill -0 "$server" 2>/dev/null; then
+    echo "nginx exited; stopping the query service" >&2
+else
+    echo "query service exited; stopping nginx" >&2
+fi
+kill -TERM "$server" "$nginx" 2>/dev/null
+wait
+exit 1
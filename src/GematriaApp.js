@@ -1,15 +1,18 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useMemo, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { ArrowLeft, RotateCcw } from 'lucide-react';
-import { getGematria } from './utils/gematria';
+import { getGematria, GEMATRIA_METHODS, DEFAULT_METHOD } from './utils/gematria';
 import { PARSHAS } from './utils/parshas';
-import { isRefInParsha } from './utils/filter';
+import { loadValueDirectory } from './utils/indexStore';
+import { search, occurrences } from './utils/searchClient';
 import commonDb from './data/common_gematria.json';
 import HebrewKeyboard from './utils/HebrewKeyboard';
 import TrendsView from './utils/TrendsView'; // Ensure this file exists
 import WordRace from './utils/WordRace';     // Ensure this file exists
 import './App.css'; 
 
+const EMPTY_PAGE = { counts: {}, total: 0, results: [] };
+
 const GematriaApp = () => {
   // --- STATE ---
   const navigate = useNavigate();
@@ -20,64 +23,73 @@ const GematriaApp = () => {
   // 2. Calculator Inputs
   const [inputText, setInputText] = useState("");
   const [gematriaValue, setGematriaValue] = useState(0);
+  const [method, setMethod] = useState(DEFAULT_METHOD); // see GEMATRIA_METHODS
   
   // 3. Search Configuration
   const [isSearchMode, setIsSearchMode] = useState(false);
   const [selectedParsha, setSelectedParsha] = useState("All");
-  const [isColelMode, setIsColelMode] = useState(false);
+  const [tolerance, setTolerance] = useState(0); // 0 = exact, 1 = Colel, k = every indexed value within ±k
   const [isSingleWordMode, setIsSingleWordMode] = useState(false);
 
   // 4. Matcher/Bridge Mode State
   const [isMatcherMode, setIsMatcherMode] = useState(false);
   const [matcherTarget, setMatcherTarget] = useState("");
   const [matcherTargetValue, setMatcherTargetValue] = useState(0);
+  const [selectedPair, setSelectedPair] = useState(null); // two-phrase bridge { a, b }
   
   // 5. UI Focus Tracking
   const [activeField, setActiveField] = useState('main'); // 'main' or 'target'
 
   // 6. Data
-  const [indexData, setIndexData] = useState(null);
-  const [searchResults, setSearchResults] = useState([]);
+  const [valueDirectories, setValueDirectories] = useState({}); // one per method, loaded on demand
+  const [searchQuery, setSearchQuery] = useState(null); // what the worker searches
+  const [searchPage, setSearchPage] = useState(EMPTY_PAGE); // its counts and current page
+  const [expandedGroups, setExpandedGroups] = useState({}); // group -> { total, results } of loaded occurrences
   const [isLoadingDB, setIsLoadingDB] = useState(false);
   const [isSearching, setIsSearching] = useState(false);
   
   // 7. Tab & Pagination State
   const [activeTabValue, setActiveTabValue] = useState(0); 
+  const [tabValues, setTabValues] = useState([]);
   const [currentPage, setCurrentPage] = useState(1);
   const ITEMS_PER_PAGE = 10; 
+  const OCCURRENCES_PER_PAGE = 20;
+  const MAX_BRIDGE_PAIRS = 12;
+
+  const answeredQuery = useRef(null);
+
+  const valueDirectory = valueDirectories[method] || null;
+  const isIndexReady = valueDirectory !== null;
+  const bridgeGap = Math.abs(matcherTargetValue - gematriaValue);
 
   // --- EFFECTS ---
 
   // A. Calculate Gematria (Main Input)
   useEffect(() => {
-    const calc = (str) => /^\d+$/.test(str) ? parseInt(str, 10) : getGematria(str);
+    const calc = (str) => /^\d+$/.test(str) ? parseInt(str, 10) : getGematria(str, method);
     setGematriaValue(calc(inputText));
-  }, [inputText]);
+  }, [inputText, method]);
 
   // B. Calculate Matcher Target (Target Input)
   useEffect(() => {
-    const calc = (str) => /^\d+$/.test(str) ? parseInt(str, 10) : getGematria(str);
+    const calc = (str) => /^\d+$/.test(str) ? parseInt(str, 10) : getGematria(str, method);
     setMatcherTargetValue(calc(matcherTarget));
-  }, [matcherTarget]);
+  }, [matcherTarget, method]);
+
+  // A pair chosen for one gap does not bridge another
+  useEffect(() => {
+    setSelectedPair(null);
+  }, [bridgeGap]);
 
 // C. Lazy Load DB
+  // Only the manifest and the method's value directory are fetched here; shards are fetched per search
   useEffect(() => {
-    if ((isSearchMode || isMatcherMode || viewMode === 'trends') && !indexData) {
+    if ((isSearchMode || isMatcherMode) && !isIndexReady) {
       setIsLoadingDB(true);
-      
-      // FIX: Use process.env.PUBLIC_URL to ensure we look in the right folder
-      // whether we are on localhost or marklebrett.co.uk/gematria-explorer
-      fetch('/torah_index.json')
-        .then(response => {
-           // Check if the response is actually valid JSON
-           const contentType = response.headers.get("content-type");
-           if (!response.ok || (contentType && contentType.indexOf("application/json") === -1)) {
-               throw new Error("File not found or invalid format");
-           }
-           return response.json();
-        })
-        .then((data) => {
-          setIndexData(data);
+
+      loadValueDirectory(method)
+        .then((directory) => {
+          setValueDirectories(prev => ({ ...prev, [method]: directory }));
           setIsLoadingDB(false);
         })
         .catch((err) => {
@@ -85,9 +97,10 @@ const GematriaApp = () => {
           setIsLoadingDB(false);
         });
     }
-  }, [isSearchMode, isMatcherMode, viewMode, indexData]);
+  }, [isSearchMode, isMatcherMode, isIndexReady, method]);
 
   // D. Search Logic (The Core)
+  // Works out which values to search; the search itself runs in a Web Worker
   useEffect(() => {
     // Only run search logic if we are in 'search' view and have data
     if (viewMode !== 'search') return;
@@ -98,118 +111,136 @@ const GematriaApp = () => {
     
     // 1. Determine what numbers we are looking for
     if (isMatcherMode) {
-        const diff = Math.abs(matcherTargetValue - gematriaValue);
-        if (diff > 0) {
+        const diff = bridgeGap;
+        if (diff > 0 && selectedPair && selectedPair.a + selectedPair.b === diff) {
+            searchValues = selectedPair.a === selectedPair.b ? [selectedPair.a] : [selectedPair.a, selectedPair.b];
+            setActiveTabValue(selectedPair.a);
+        } else if (diff > 0) {
             searchValues = [diff];
             setActiveTabValue(diff);
         } else {
-            setSearchResults([]); 
+            setSearchQuery(null);
             return;
         }
     } else {
         // Standard Mode
         if (gematriaValue === 0 && !inputText) {
-            setSearchResults([]);
+            setSearchQuery(null);
             return;
         }
         
-        searchValues = isColelMode 
-            ? [gematriaValue, gematriaValue - 1, gematriaValue + 1] 
-            : [gematriaValue];
+        // Neighbours come from the value directory, so values with no
+        // phrases are never looked up
+        const neighbours = tolerance > 0 && valueDirectory
+            ? valueDirectory.within(gematriaValue, tolerance)
+                .map(e => e.value)
+                .filter(v => v !== gematriaValue)
+            : [];
+        searchValues = [gematriaValue, ...neighbours];
         setActiveTabValue(gematriaValue);
     }
+    setTabValues(searchValues);
 
-    if ((!isSearchMode && !isMatcherMode) || !indexData || searchValues[0] === 0) {
-      setSearchResults([]);
+    if ((!isSearchMode && !isMatcherMode) || !isIndexReady || searchValues[0] === 0) {
+      setSearchQuery(null);
       return;
     }
 
-    setIsSearching(true);
-
-    const timer = setTimeout(() => {
-      let combinedResults = [];
-
-      searchValues.forEach(targetVal => {
-        if (targetVal <= 0) return; 
-
-        // A. FIND STANDARD MATCHES FROM DB
-        const matches = indexData[String(targetVal)] || [];
-        
-        // Filter standard matches
-        const filteredMatches = matches.filter(item => {
-             if (isSingleWordMode) {
-                 if (item.isVerse) return false;
-                 if (item.phrase.includes(' ')) return false;
-             }
-             return true;
-        });
-
-        const matchesWithMeta = filteredMatches.map(item => ({
-          ...item,
-          actualValue: targetVal, 
-          isExact: targetVal === (isMatcherMode ? Math.abs(matcherTargetValue - gematriaValue) : gematriaValue),
-          type: 'standard'
-        }));
-
-        // B. FIND PARSHA STATS MATCHES
-        // (Only relevant in Standard Search usually)
-        let parshaMatches = [];
-        if (!isMatcherMode) {
-            const matchingParshas = PARSHAS.filter(p => p.verse_count === targetVal);
-            parshaMatches = matchingParshas.map(p => ({
-                phrase: `Parshat ${p.name}`,
-                ref: "Torah Stats",
-                context_en: `This Parsha contains exactly ${p.verse_count} verses.`,
-                actualValue: targetVal,
-                isExact: true,
-                type: 'stat', 
-                isVerse: false
-            }));
-        }
-
-        combinedResults = [...combinedResults, ...parshaMatches, ...matchesWithMeta];
+    setSearchQuery({
+      values: searchValues,
+      method,
+      exactValue: isMatcherMode ? bridgeGap : gematriaValue,
+      single: isSingleWordMode,
+      // Parsha filtering and verse-count stats are for standard search only
+      parsha: selectedParsha !== "All" && !isMatcherMode ? selectedParsha : null,
+      stats: !isMatcherMode
+    });
+  }, [gematriaValue, inputText, isSearchMode, isMatcherMode, matcherTargetValue, bridgeGap, selectedPair, selectedParsha, valueDirectory, isIndexReady, tolerance, isSingleWordMode, viewMode, method]);
+
+  // D2. Ask the worker for the counts and the current page. Paging and tab
+  // switches reuse the worker's filtered postings, so only a new query
+  // shows "Searching..."
+  useEffect(() => {
+    if (!searchQuery) {
+      setSearchPage(EMPTY_PAGE);
+      setIsSearching(false);
+      return;
+    }
+    let cancelled = false;
+    if (searchQuery !== answeredQuery.current) setIsSearching(true);
+
+    search({ ...searchQuery, tab: activeTabValue, page: currentPage, perPage: ITEMS_PER_PAGE })
+      .then((page) => {
+        if (cancelled || !page) return;
+        answeredQuery.current = searchQuery;
+        setSearchPage(page);
+        setIsSearching(false);
+      })
+      .catch((err) => {
+        if (cancelled) return;
+        console.error("Failed to load index shard:", err);
+        setSearchPage(EMPTY_PAGE);
+        setIsSearching(false);
       });
 
-      // Filter by Parsha (Standard search only)
-      if (selectedParsha !== "All" && !isMatcherMode) {
-        const parshaRange = PARSHAS.find(p => p.name === selectedParsha);
-        if (parshaRange) {
-          combinedResults = combinedResults.filter(item => 
-            item.type === 'stat' || isRefInParsha(item.ref, parshaRange)
-          );
-        }
-      }
-
-      setSearchResults(combinedResults);
-      setIsSearching(false);
-    }, 300);
+    return () => {
+      cancelled = true;
+    };
+  }, [searchQuery, activeTabValue, currentPage]);
 
-    return () => clearTimeout(timer);
-  }, [gematriaValue, isSearchMode, isMatcherMode, matcherTargetValue, selectedParsha, indexData, isColelMode, isSingleWordMode, viewMode]);
+  // Expanded groups belong to one tab of one search
+  useEffect(() => {
+    setExpandedGroups({});
+  }, [searchQuery, activeTabValue]);
 
   // E. Common Matches (Did You Know?)
+  // The dictionary is keyed by standard values
   const commonMatches = useMemo(() => {
-    if (gematriaValue === 0) return [];
+    if (gematriaValue === 0 || method !== DEFAULT_METHOD) return [];
     return commonDb[String(gematriaValue)] || [];
-  }, [gematriaValue]);
+  }, [gematriaValue, method]);
 
-  // --- HELPERS ---
+  // F. Two-phrase bridges: value pairs a + b = gap, most combinations first
+  const bridgePairs = useMemo(() => {
+    if (!isMatcherMode || !valueDirectory || bridgeGap === 0) return [];
+    return valueDirectory.pairs(bridgeGap)
+      .sort((x, y) => y.countA * y.countB - x.countA * x.countB)
+      .slice(0, MAX_BRIDGE_PAIRS);
+  }, [isMatcherMode, valueDirectory, bridgeGap]);
 
-  // Pagination Slice
-  const currentTabResults = useMemo(() => {
-    return searchResults.filter(r => r.actualValue === activeTabValue);
-  }, [searchResults, activeTabValue]);
+  // --- HELPERS ---
 
-  const totalPages = Math.ceil(currentTabResults.length / ITEMS_PER_PAGE);
-  const paginatedResults = useMemo(() => {
-    const start = (currentPage - 1) * ITEMS_PER_PAGE;
-    return currentTabResults.slice(start, start + ITEMS_PER_PAGE);
-  }, [currentTabResults, currentPage]);
+  // Pagination: the worker sends the current page only
+  const totalPages = Math.ceil(searchPage.total / ITEMS_PER_PAGE);
+  const paginatedResults = searchPage.results;
 
   const handlePageChange = (newPage) => {
     if (newPage >= 1 && newPage <= totalPages) setCurrentPage(newPage);
   };
 
+  // A result is every occurrence of one phrase; its occurrences are fetched
+  // from the worker a page at a time when it is expanded
+  const loadOccurrences = (group, page) => {
+    const query = searchQuery;
+    occurrences({ ...query, tab: activeTabValue, group, page, perPage: OCCURRENCES_PER_PAGE })
+      .then(({ total, results }) => {
+        if (answeredQuery.current !== query) return;
+        setExpandedGroups(prev => ({
+          ...prev,
+          [group]: { total, results: page === 1 ? results : [...(prev[group]?.results || []), ...results] }
+        }));
+      })
+      .catch(err => console.error("Failed to load occurrences:", err));
+  };
+
+  const toggleOccurrences = (group) => {
+    if (expandedGroups[group]) {
+      setExpandedGroups(({ [group]: _, ...rest }) => rest);
+    } else {
+      loadOccurrences(group, 1);
+    }
+  };
+
   const handleKeyboardPress = (char) => {
     if (activeField === 'main') {
         if (char === "BACKSPACE") setInputText(prev => prev.slice(0, -1));
@@ -220,7 +251,7 @@ const GematriaApp = () => {
     }
   };
 
-  const getCountForValue = (val) => searchResults.filter(r => r.actualValue === val).length;
+  const getCountForValue = (val) => searchPage.counts[val] || 0;
 
   const triggerSearch = (text) => {
     setInputText(text);
@@ -237,7 +268,8 @@ const GematriaApp = () => {
     setMatcherTarget("");
     setIsSearchMode(false);
     setIsMatcherMode(false);
-    setSearchResults([]);
+    setSelectedPair(null);
+    setSearchQuery(null);
     setActiveField('main');
     setSelectedParsha("All");
     setViewMode("search");
@@ -324,7 +356,7 @@ const GematriaApp = () => {
         {/* ======================= */}
         {/* VIEW 1: TRENDS     */}
         {/* ======================= */}
-        {viewMode === "trends" && <TrendsView indexData={indexData} />}
+        {viewMode === "trends" && <TrendsView />}
 
         {/* ======================= */}
         {/* VIEW 2: RACE       */}
@@ -410,8 +442,35 @@ const GematriaApp = () => {
                     <div className="bg-white p-3 rounded border border-purple-100 shadow-sm">
                       <span className="text-gray-500">Gap to Bridge:</span>
                       <div className="text-3xl font-bold text-purple-600 my-1">
-                        {Math.abs(matcherTargetValue - gematriaValue)}
+                        {bridgeGap}
                       </div>
+                      {bridgePairs.length > 0 && (
+                        <div className="mt-2">
+                          <span className="text-xs text-gray-500">
+                            Or bridge with two phrases:
+                          </span>
+                          <div className="flex flex-wrap justify-center gap-2 mt-1">
+                            <button
+                              className={`tab-button ${!selectedPair ? "active" : ""}`}
+                              onClick={() => setSelectedPair(null)}
+                            >
+                              {bridgeGap}
+                            </button>
+                            {bridgePairs.map((pair) => (
+                              <button
+                                key={pair.a}
+                                className={`tab-button ${
+                                  selectedPair && selectedPair.a === pair.a ? "active" : ""
+                                }`}
+                                onClick={() => setSelectedPair({ a: pair.a, b: pair.b })}
+                                title={`${pair.countA} × ${pair.countB} phrase combinations`}
+                              >
+                                {pair.a} + {pair.b}
+                              </button>
+                            ))}
+                          </div>
+                        </div>
+                      )}
                     </div>
                   ) : (
                     <div className="text-gray-400 text-sm italic">
@@ -536,6 +595,19 @@ const GematriaApp = () => {
                     </option>
                   ))}
                 </select>
+
+                <select
+                  value={method}
+                  onChange={(e) => setMethod(e.target.value)}
+                  className="parsha-select"
+                  title="Gematria method"
+                >
+                  {GEMATRIA_METHODS.map((m) => (
+                    <option key={m.id} value={m.id}>
+                      {m.label}
+                    </option>
+                  ))}
+                </select>
               </div>
 
               {(isSearchMode || isMatcherMode) && (
@@ -543,12 +615,17 @@ const GematriaApp = () => {
                   {!isMatcherMode && (
                     <div className="text-sm text-gray-600 bg-gray-50 p-2 rounded border border-gray-200">
                       <label className="flex items-center gap-2 cursor-pointer">
-                        <input
-                          type="checkbox"
-                          checked={isColelMode}
-                          onChange={(e) => setIsColelMode(e.target.checked)}
-                        />
-                        <span>±1 (Colel)</span>
+                        <span>Tolerance</span>
+                        <select
+                          value={tolerance}
+                          onChange={(e) => setTolerance(parseInt(e.target.value, 10))}
+                        >
+                          <option value={0}>Exact</option>
+                          <option value={1}>±1 (Colel)</option>
+                          <option value={2}>±2</option>
+                          <option value={5}>±5</option>
+                          <option value={10}>±10</option>
+                        </select>
                       </label>
                     </div>
                   )}
@@ -580,7 +657,7 @@ const GematriaApp = () => {
                   <div className="status">Searching...</div>
                 )}
 
-                {!isLoadingDB && !isSearching && searchResults.length >= 0 && (
+                {!isLoadingDB && !isSearching && (
                   <>
                     <div className="mb-4 flex items-center justify-between px-2">
                       <h2 className="text-xl font-bold text-gray-800">
@@ -593,63 +670,32 @@ const GematriaApp = () => {
                       </span>
                     </div>
 
-                    {!isMatcherMode && (
+                    {(!isMatcherMode || tabValues.length > 1) && (
                       <div className="tabs-container">
-                        <button
-                          className={`tab-button ${
-                            activeTabValue === gematriaValue ? "active" : ""
-                          }`}
-                          onClick={() => {
-                            setActiveTabValue(gematriaValue);
-                            setCurrentPage(1);
-                          }}
-                        >
-                          Value {gematriaValue}
-                          <span className="tab-count">
-                            {getCountForValue(gematriaValue)}
-                          </span>
-                        </button>
-                        {isColelMode && (
-                          <>
-                            <button
-                              className={`tab-button ${
-                                activeTabValue === gematriaValue - 1
-                                  ? "active"
-                                  : ""
-                              }`}
-                              onClick={() => {
-                                setActiveTabValue(gematriaValue - 1);
-                                setCurrentPage(1);
-                              }}
-                            >
-                              {gematriaValue - 1}
-                              <span className="tab-count">
-                                {getCountForValue(gematriaValue - 1)}
-                              </span>
-                            </button>
-                            <button
-                              className={`tab-button ${
-                                activeTabValue === gematriaValue + 1
-                                  ? "active"
-                                  : ""
-                              }`}
-                              onClick={() => {
-                                setActiveTabValue(gematriaValue + 1);
-                                setCurrentPage(1);
-                              }}
-                            >
-                              {gematriaValue + 1}
-                              <span className="tab-count">
-                                {getCountForValue(gematriaValue + 1)}
-                              </span>
-                            </button>
-                          </>
-                        )}
+                        {tabValues.map((value) => (
+                          <button
+                            key={value}
+                            className={`tab-button ${
+                              activeTabValue === value ? "active" : ""
+                            }`}
+                            onClick={() => {
+                              setActiveTabValue(value);
+                              setCurrentPage(1);
+                            }}
+                          >
+                            {value === gematriaValue && !isMatcherMode
+                              ? `Value ${value}`
+                              : value}
+                            <span className="tab-count">
+                              {getCountForValue(value)}
+                            </span>
+                          </button>
+                        ))}
                       </div>
                     )}
 
                     <div className="table-container">
-                      {currentTabResults.length === 0 ? (
+                      {searchPage.total === 0 ? (
                         <div className="text-center py-8 text-gray-500">
                           {isMatcherMode
                             ? "No words found to bridge this exact gap."
@@ -667,63 +713,118 @@ const GematriaApp = () => {
                             </thead>
                             <tbody>
                               {paginatedResults.map((result, idx) => (
-                                <tr
-                                  key={idx}
-                                  className={
-                                    result.isVerse
-                                      ? "bg-blue-50"
-                                      : result.type === "stat"
-                                      ? "bg-yellow-50"
-                                      : ""
-                                  }
+                                <React.Fragment
+                                  key={result.type === "stat" ? `stat-${idx}` : result.group}
                                 >
-                                  <td
-                                    className={`col-phrase ${
-                                      result.isVerse ? "verse-match" : ""
-                                    }`}
+                                  <tr
+                                    className={
+                                      result.isVerse
+                                        ? "bg-blue-50"
+                                        : result.type === "stat"
+                                        ? "bg-yellow-50"
+                                        : ""
+                                    }
                                   >
-                                    {result.type === "stat" ? (
-                                      <div className="flex flex-col items-end text-yellow-800">
-                                        <span className="stat-label">
-                                          STRUCTURE MATCH
-                                        </span>
-                                        {result.phrase}
-                                      </div>
-                                    ) : result.isVerse ? (
-                                      <div className="flex flex-col items-end">
-                                        <span className="verse-label">
-                                          WHOLE VERSE
-                                        </span>
-                                        <span className="block mt-1">
-                                          {result.original_he}
+                                    <td
+                                      className={`col-phrase ${
+                                        result.isVerse ? "verse-match" : ""
+                                      }`}
+                                    >
+                                      {result.type === "stat" ? (
+                                        <div className="flex flex-col items-end text-yellow-800">
+                                          <span className="stat-label">
+                                            STRUCTURE MATCH
+                                          </span>
+                                          {result.phrase}
+                                        </div>
+                                      ) : result.isVerse ? (
+                                        <div className="flex flex-col items-end">
+                                          <span className="verse-label">
+                                            WHOLE VERSE
+                                          </span>
+                                          <span className="block mt-1">
+                                            {result.original_he}
+                                          </span>
+                                        </div>
+                                      ) : (
+                                        <>
+                                          {result.phrase}
+                                          {result.occurrences > 1 && (
+                                            <span className="occurrence-count">
+                                              ×{result.occurrences}
+                                            </span>
+                                          )}
+                                        </>
+                                      )}
+                                    </td>
+                                    <td className="col-ref">
+                                      {result.type === "stat" ? (
+                                        <span className="font-bold text-yellow-700">
+                                          Torah Stats
                                         </span>
-                                      </div>
-                                    ) : (
-                                      result.phrase
-                                    )}
-                                  </td>
-                                  <td className="col-ref">
-                                    {result.type === "stat" ? (
-                                      <span className="font-bold text-yellow-700">
-                                        Torah Stats
-                                      </span>
-                                    ) : (
-                                      <a
-                                        href={`https://www.sefaria.org/${result.ref}`}
-                                        target="_blank"
-                                        rel="noreferrer"
-                                      >
-                                        {result.ref}
-                                      </a>
-                                    )}
-                                  </td>
-                                  <td className="col-context">
-                                    {result.type === "stat" && (
-                                      <span className="text-2xl mr-2">📊</span>
-                                    )}
-                                    {result.context_en}
-                                  </td>
-                                </tr>
+                                      ) : (
+                                        <a
+                                          href={`https://www.sefaria.org/${result.ref}`}
+                                          target="_blank"
+                                          rel="noreferrer"
+                                        >
+                                          {result.ref}
+                                        </a>
+                                      )}
+                                      {result.occurrences > 1 && (
+                                        <button
+                                          className="occurrences-toggle"
+                                          onClick={() => toggleOccurrences(result.group)}
+                                        >
+                                          {expandedGroups[result.group]
+                                            ? "Hide"
+                                            : `+${result.occurrences - 1} more`}
+                                        </button>
+                                      )}
+                                    </td>
+                                    <td className="col-context">
+                                      {result.type === "stat" && (
+                                        <span className="text-2xl mr-2">📊</span>
+                                      )}
+                                      {result.context_en}
+                                    </td>
+                                  </tr>
+                                  {expandedGroups[result.group] && (
+                                    <tr className="occurrences-row">
+                                      <td colSpan={3}>
+                                        <ul className="occurrence-list">
+                                          {expandedGroups[result.group].results.map((occurrence) => (
+                                            <li key={occurrence.verseId}>
+                                              <a
+                                                href={`https://www.sefaria.org/${occurrence.ref}`}
+                                                target="_blank"
+                                                rel="noreferrer"
+                                              >
+                                                {occurrence.ref}
+                                              </a>
+                                              <span>{occurrence.context_en}</span>
+                                            </li>
+                                          ))}
+                                        </ul>
+                                        {expandedGroups[result.group].results.length <
+                                          expandedGroups[result.group].total && (
+                                          <button
+                                            className="page-btn"
+                                            onClick={() =>
+                                              loadOccurrences(
+                                                result.group,
+                                                expandedGroups[result.group].results.length /
+                                                  OCCURRENCES_PER_PAGE + 1
+                                              )
+                                            }
+                                          >
+                                            Show more
+                                          </button>
+                                        )}
+                                      </td>
+                                    </tr>
+                                  )}
+                                </React.Fragment>
                               ))}
                             </tbody>
                           </table>
@@ -1,6 +1,9 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import HebrewKeyboard from './HebrewKeyboard';
+import { normalize, stripHtml } from './hebrew';
+import { assetUrl } from './assets';
+import { verseBook, verseRef } from './verseIds';
 
 const COLORS = ['#2563eb', '#dc2626', '#16a34a', '#d97706', '#9333ea'];
 const BOOKS = ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"];
@@ -12,15 +15,84 @@ const HEBREW_BOOKS = {
     "Deuteronomy": "Devarim"
 };
 
-// STRICT PREFIXES
-const VALID_PREFIXES = [
-  "ו", "ב", "כ", "ל", "מ",
-  "וב", "וכ", "ול", "ומ",
-  "ש"
-];
+// torah_words.json (built by build_torah_text.py) holds every word's
+// occurrences as delta-encoded global verse ids: "exact" for the word itself,
+// "stem" for the word behind one of the strict prefixes. "exact_counts" /
+// "stem_counts" are the same occurrences counted up to each chart bucket.
+// torah_text.json is { t: [clean], o: [original] }, indexed by the same ids.
+const decodePostings = (gaps) => {
+  const postings = new Array(gaps ? gaps.length : 0);
+  let verseIdx = 0;
+  for (let k = 0; k < postings.length; k++) {
+    verseIdx += gaps[k];
+    postings[k] = verseIdx;
+  }
+  return postings;
+};
+
+const mergeSorted = (a, b) => {
+  const out = [];
+  let i = 0;
+  let j = 0;
+  while (i < a.length || j < b.length) {
+    if (j >= b.length || (i < a.length && a[i] <= b[j])) out.push(a[i++]);
+    else out.push(b[j++]);
+  }
+  return out;
+};
+
+// Cumulative count at each of n buckets, from [bucket gap, count] steps
+// (the count only changes at the buckets listed)
+const decodeCounts = (steps, n) => {
+  const counts = new Array(n);
+  let s = 0;
+  let bucket = -1;
+  let count = 0;
+  for (let b = 0; b < n; b++) {
+    if (steps && s < steps.length && b === bucket + steps[s][0]) {
+      bucket = b;
+      count = steps[s][1];
+      s++;
+    }
+    counts[b] = count;
+  }
+  return counts;
+};
+
+// Same as TREND_PREFIXES in build_torah_text.py ("stem" postings)
+const TREND_PREFIXES = new Set(["ו", "ב", "כ", "ל", "מ", "וב", "וכ", "ול", "ומ", "ש"]);
+
+const matchesWord = (token, word, withPrefixes) => {
+  if (token === word) return true;
+  const k = token.length - word.length;
+  return withPrefixes && k >= 1 && k <= 2 && token.endsWith(word) && TREND_PREFIXES.has(token.slice(0, k));
+};
+
+// The original verse with every occurrence of `word` marked, using the
+// normalizer's spans into the niqqud text
+const highlightVerse = (original, word, withPrefixes) => {
+  const { words, spans } = normalize(original);
+  const parts = [];
+  let last = 0;
+  words.forEach((token, k) => {
+    if (!matchesWord(token, word, withPrefixes)) return;
+    const [start, end] = spans[k];
+    parts.push(stripHtml(original.slice(last, start)));
+    parts.push(<mark key={k} className="bg-yellow-200 rounded">{stripHtml(original.slice(start, end))}</mark>);
+    last = end;
+  });
+  parts.push(stripHtml(original.slice(last)));
+  return parts;
+};
+
+// Content-hashed URLs, so the browser cache can keep them
+const fetchJson = (file) =>
+  assetUrl(file).then(url => fetch(url)).then(res => res.json());
 
 const TrendsView = () => {
   const [torahText, setTorahText] = useState(null);
+  const [wordIndex, setWordIndex] = useState(null);
+  const postingsCache = useRef(new Map());
   const [inputs, setInputs] = useState(['']); 
   const [chartData, setChartData] = useState([]);
   const [tableData, setTableData] = useState([]); 
@@ -33,20 +105,20 @@ const TrendsView = () => {
 
   useEffect(() => {
       setIsLoading(true);
-      fetch(`${process.env.PUBLIC_URL}/torah_text.json?v=${new Date().getTime()}`)
-        .then(res => res.json())
-        .then(data => {
-            setTorahText(data);
+      Promise.all([fetchJson('torah_text.json'), fetchJson('torah_words.json')])
+        .then(([text, words]) => {
+            setTorahText(text);
+            setWordIndex(words);
             setIsLoading(false);
         })
         .catch(err => {
-            console.error("Missing torah_text.json", err);
+            console.error("Missing torah_text.json / torah_words.json", err);
             setIsLoading(false);
         });
   }, []);
 
   useEffect(() => {
-    if (!torahText || inputs.length === 0 || !inputs[0]) {
+    if (!torahText || !wordIndex || inputs.length === 0 || !inputs[0]) {
         if (!inputs[0]) {
             setChartData([]);
             setTableData([]);
@@ -54,82 +126,62 @@ const TrendsView = () => {
         return;
     }
 
-    const SAMPLE_RATE = 50; 
-    let dataPoints = [];
-    let allMatches = []; 
-    
-    // Init Buckets
-    for (let i = 0; i < torahText.length; i += SAMPLE_RATE) {
-      dataPoints.push({ 
-        index: i, 
-        name: torahText[i].r, 
-        book: torahText[i].b 
-      });
-    }
+    // Sorted verse index of every occurrence of `word`, decoded once per word
+    const getPostings = (word) => {
+      const key = `${usePrefixes ? 1 : 0}:${word}`;
+      if (!postingsCache.current.has(key)) {
+        const exact = decodePostings(wordIndex.exact[word]);
+        postingsCache.current.set(key, usePrefixes
+          ? mergeSorted(exact, decodePostings(wordIndex.stem[word]))
+          : exact);
+      }
+      return postingsCache.current.get(key);
+    };
 
-    // FIX: Add Final Bucket to catch the last few verses (Deut 33-34)
-    if (dataPoints.length > 0 && dataPoints[dataPoints.length - 1].index < torahText.length - 1) {
-        dataPoints.push({
-            index: torahText.length - 1,
-            name: torahText[torahText.length - 1].r,
-            book: torahText[torahText.length - 1].b
-        });
-    }
+    // Chart counts of `word` at every bucket; the stem counts add up with the exact ones
+    const n = wordIndex.buckets.length;
+    const getCounts = (word) => {
+      const exact = decodeCounts(wordIndex.exact_counts[word], n);
+      if (!usePrefixes) return exact;
+      const stem = decodeCounts(wordIndex.stem_counts[word], n);
+      return exact.map((c, b) => c + stem[b]);
+    };
+
+    // Buckets: every SAMPLE_RATE verses plus the final verse
+    let dataPoints = wordIndex.buckets.map(index => ({ index, name: verseRef(index), book: verseBook(index) }));
+    let allMatches = []; 
 
     // Process inputs
     inputs.forEach((word) => {
        if (!word) return;
 
-       let count = 0;
-       let verseIdx = 0;
-
-       dataPoints = dataPoints.map(pt => {
-          // Process all verses up to this bucket's index
-          while (verseIdx < torahText.length && verseIdx <= pt.index) {
-             const verseObj = torahText[verseIdx];
-             const verseText = verseObj.t; 
-             const wordsInVerse = verseText.split(" ");
-             
-             let verseMatchFound = false;
-             let matchesInVerse = 0;
-
-             for (let w of wordsInVerse) {
-                 let isMatch = false;
-                 if (w === word) {
-                     isMatch = true;
-                 } else if (usePrefixes && w.endsWith(word)) {
-                     const prefix = w.substring(0, w.length - word.length);
-                     if (VALID_PREFIXES.includes(prefix)) {
-                         isMatch = true;
-                     }
-                 }
-                 if (isMatch) {
-                     count++;
-                     matchesInVerse++;
-                     verseMatchFound = true;
-                 }
-             }
-
-             if (verseMatchFound) {
-                 allMatches.push({
-                     ref: verseObj.r,
-                     book: verseObj.b,
-                     text: verseObj.o || verseObj.t, 
-                     word: word, 
-                     count: matchesInVerse,
-                     index: verseObj.i
-                 });
-             }
-             verseIdx++;
-          }
-          return { ...pt, [word]: count };
-       });
+       const counts = getCounts(word);
+       dataPoints = dataPoints.map((pt, b) => ({ ...pt, [word]: counts[b] }));
+
+       const postings = getPostings(word);
+
+       // A run of equal verse indices is the occurrences within one verse
+       for (let p = 0; p < postings.length; ) {
+           const verseId = postings[p];
+           let end = p;
+           while (end < postings.length && postings[end] === verseId) end++;
+           allMatches.push({
+               ref: verseRef(verseId),
+               book: verseBook(verseId),
+               text: torahText.o[verseId] || torahText.t[verseId], 
+               word: word, 
+               prefixed: usePrefixes,
+               count: end - p,
+               index: verseId
+           });
+           p = end;
+       }
     });
 
     setChartData(dataPoints);
     setTableData(allMatches.sort((a, b) => a.index - b.index));
     setCurrentPage(1); 
-  }, [inputs, torahText, usePrefixes]);
+  }, [inputs, torahText, wordIndex, usePrefixes]);
 
   const getStats = () => {
       const stats = {};
@@ -157,7 +209,7 @@ const TrendsView = () => {
           r.book, 
           r.word, 
           r.count, 
-          `"${r.text.replace(/"/g, '""')}"` 
+          `"${stripHtml(r.text).replace(/"/g, '""')}"` 
       ]);
       const csvContent = "data:text/csv;charset=utf-8,\uFEFF" 
           + [headers.join(","), ...rows.map(e => e.join(","))].join("\n");
@@ -310,7 +362,7 @@ const TrendsView = () => {
                                       {row.ref}
                                   </td>
                                   <td className="text-xl font-serif leading-relaxed text-gray-900 text-right" dir="rtl">
-                                      {row.text}
+                                      {highlightVerse(row.text, row.word, row.prefixed)}
                                   </td>
                               </tr>
                           ))}
@@ -1,6 +1,7 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, Cell } from 'recharts';
 import raceData from '../data/race_data.json';
+import { locateVerse } from './verseIds';
 
 const COLORS = [
   '#2563eb', '#3b82f6', '#60a5fa', '#93c5fd', '#bfdbfe', 
@@ -9,6 +10,29 @@ const COLORS = [
   '#d97706', '#f59e0b', '#fbbf24', '#fcd34d', '#fde68a'
 ];
 
+// race_data.json stores each frame as a delta against the previous one
+// ({ v: verseId, s: [[nameId, exact, prefix]], d: [nameId] }, v being the
+// chapter's first verse); frames are expanded on first use, each from the
+// one before it.
+const FRAME_COUNT = raceData.frames.length;
+const expandedFrames = [];
+
+const getFrame = (index) => {
+  for (let i = expandedFrames.length; i <= index; i++) {
+    const delta = raceData.frames[i];
+    const board = new Map(i > 0 ? expandedFrames[i - 1].board : []);
+    (delta.d || []).forEach(id => board.delete(id));
+    (delta.s || []).forEach(([id, exact, prefix]) => board.set(id, { name: raceData.names[id], exact, prefix }));
+
+    // Leaderboard order: prefix count, then name (as in build_race_data.py)
+    const data = [...board.values()].sort((a, b) =>
+      b.prefix - a.prefix || (a.name < b.name ? -1 : a.name > b.name ? 1 : 0));
+    const { book, chapter } = locateVerse(delta.v);
+    expandedFrames.push({ label: `${book} Ch.${chapter}`, board, data });
+  }
+  return expandedFrames[index];
+};
+
 const WordRace = () => {
   const [frameIndex, setFrameIndex] = useState(0);
   const [isPlaying, setIsPlaying] = useState(false);
@@ -22,7 +46,7 @@ const WordRace = () => {
     if (isPlaying) {
       timerRef.current = setInterval(() => {
         setFrameIndex((prev) => {
-          if (prev >= raceData.length - 1) {
+          if (prev >= FRAME_COUNT - 1) {
             setIsPlaying(false);
             return prev;
           }
@@ -35,7 +59,7 @@ const WordRace = () => {
     return () => clearInterval(timerRef.current);
   }, [isPlaying]);
 
-  const currentFrame = raceData[frameIndex];
+  const currentFrame = getFrame(frameIndex);
   const dataKey = usePrefixes ? "prefix" : "exact";
   
   // Sort and Slice
@@ -119,7 +143,7 @@ const WordRace = () => {
         <input 
             type="range" 
             min="0" 
-            max={raceData.length - 1} 
+            max={FRAME_COUNT - 1} 
             value={frameIndex}
             onChange={(e) => {
                 setIsPlaying(false);
@@ -0,0 +1,39 @@
+// Resolves data files in public/ to their content-hashed names.
+// assets.json (written by backend_tools/artifacts.py) maps e.g.
+// "torah_text.json" -> "torah_text.3f9c01a2b4.json". It is small and
+// revalidated on every visit; the hashed files themselves are immutable, so
+// a repeat visit fetches nothing else. Without assets.json (a fresh clone
+// that hasn't run the build) the plain names are used.
+
+let assetsPromise = null;
+// Inside a Web Worker relative URLs resolve against the worker script, so
+// the worker is handed the page's absolute public URL (setPublicUrl)
+let publicUrl = process.env.PUBLIC_URL;
+
+export function setPublicUrl(url) {
+  publicUrl = url;
+}
+
+function loadAssets() {
+  if (!assetsPromise) {
+    assetsPromise = fetch(publicPath("assets.json"), { cache: "no-cache" })
+      .then(response => {
+        const contentType = response.headers.get("content-type");
+        if (!response.ok || (contentType && contentType.indexOf("text/html") !== -1)) return {};
+        return response.json();
+      })
+      .catch(() => ({}));
+  }
+  return assetsPromise;
+}
+
+// URL of a public/ file by its exact name, e.g. a hashed shard name from the manifest
+export function publicPath(name) {
+  return `${publicUrl}/${name}`;
+}
+
+// URL of a public/ data file, e.g. assetUrl("torah_index/manifest.json")
+export async function assetUrl(name) {
+  const assets = await loadAssets();
+  return publicPath(assets[name] || name);
+}
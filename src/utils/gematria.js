@@ -1,18 +1,46 @@
-export function getGematria(text) {
-  if (!text) return 0;
+import { tokenize } from './hebrew';
+
+const values = {
+  'א': 1, 'ב': 2, 'ג': 3, 'ד': 4, 'ה': 5, 'ו': 6, 'ז': 7, 'ח': 8, 'ט': 9,
+  'י': 10, 'כ': 20, 'ל': 30, 'מ': 40, 'נ': 50, 'ס': 60, 'ע': 70, 'פ': 80, 'צ': 90,
+  'ק': 100, 'ר': 200, 'ש': 300, 'ת': 400,
+  'ך': 20, 'ם': 40, 'ן': 50, 'ף': 80, 'ץ': 90
+};
+
+const ALPHABET = "אבגדהוזחטיכלמנסעפצקרשת";
+const FINAL_FORMS = { 'ך': 'כ', 'ם': 'מ', 'ן': 'נ', 'ף': 'פ', 'ץ': 'צ' };
+const baseLetter = (char) => FINAL_FORMS[char] || char;
+const withValues = (valueOf) =>
+  Object.fromEntries(Object.keys(values).map(char => [char, valueOf(char)]));
 
-  const values = {
-    'א': 1, 'ב': 2, 'ג': 3, 'ד': 4, 'ה': 5, 'ו': 6, 'ז': 7, 'ח': 8, 'ט': 9,
-    'י': 10, 'כ': 20, 'ל': 30, 'מ': 40, 'נ': 50, 'ס': 60, 'ע': 70, 'פ': 80, 'צ': 90,
-    'ק': 100, 'ר': 200, 'ש': 300, 'ת': 400,
-    'ך': 20, 'ם': 40, 'ן': 50, 'ף': 80, 'ץ': 90
-  };
+// Letter values of every method, the same tables as GEMATRIA_METHODS in
+// backend_tools/hebrew.py; the index has one set of shards per method
+const METHOD_VALUES = {
+  standard: values,
+  gadol: { ...values, 'ך': 500, 'ם': 600, 'ן': 700, 'ף': 800, 'ץ': 900 },
+  katan: withValues(char => Number(String(values[char])[0])),
+  ordinal: withValues(char => ALPHABET.indexOf(baseLetter(char)) + 1),
+  atbash: withValues(char => values[ALPHABET[ALPHABET.length - 1 - ALPHABET.indexOf(baseLetter(char))]])
+};
 
-  // 1. Replace Maqaf (Hebrew Hyphen) with a space
-  let formatted = text.replace(/\u05BE/g, " ");
-  
-  // 2. Remove anything that isn't a Hebrew letter
-  const clean = formatted.replace(/[^\u05D0-\u05EA]/g, "");
+export const DEFAULT_METHOD = "standard";
+
+export const GEMATRIA_METHODS = [
+  { id: "standard", label: "Standard (Hechrechi)" },
+  { id: "gadol", label: "Gadol (final letters 500-900)" },
+  { id: "katan", label: "Katan (reduced)" },
+  { id: "ordinal", label: "Ordinal (Siduri)" },
+  { id: "atbash", label: "Atbash" }
+];
+
+export function getGematria(text, method = DEFAULT_METHOD) {
+  if (!text) return 0;
 
-  return clean.split('').reduce((sum, char) => sum + (values[char] || 0), 0);
-}
\ No newline at end of file
+  // Same normalization as the index: only the letters of the cleaned words count
+  const table = METHOD_VALUES[method];
+  let sum = 0;
+  for (const word of tokenize(text)) {
+    for (const char of word) sum += table[char];
+  }
+  return sum;
+}
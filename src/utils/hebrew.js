@@ -0,0 +1,59 @@
+// Hebrew normalizer, the same rules as backend_tools/hebrew.py:
+//   - Hebrew letters (א-ת) are kept
+//   - Niqqud and cantillation (U+0591-U+05C7) are dropped, so letters around
+//     them stay one word; HTML tags are dropped the same way
+//   - Maqaf, '-' and everything else separate words
+// One pass over the text, returning the cleaned words and where each one
+// sits in the original (niqqud) text.
+
+const isLetter = (code) => code >= 0x05D0 && code <= 0x05EA;
+const isMark = (code) => code >= 0x0591 && code <= 0x05C7 && code !== 0x05BE;
+
+// { words, spans }: spans[k] = [start, end) of words[k] in `text`
+export function normalize(text) {
+  const words = [];
+  const spans = [];
+  if (!text) return { words, spans };
+
+  let word = "";
+  let start = -1;
+  let end = -1;
+  for (let i = 0; i < text.length; ) {
+    const code = text.charCodeAt(i);
+    if (code === 0x3C) { // '<': a tag is skipped like a mark
+      const close = text.indexOf(">", i + 1);
+      if (close > i + 1) {
+        if (start !== -1) end = close + 1;
+        i = close + 1;
+        continue;
+      }
+    }
+    if (isLetter(code)) {
+      if (start === -1) start = i;
+      word += text[i];
+      end = ++i;
+      continue;
+    }
+    if (isMark(code)) {
+      if (start !== -1) end = i + 1;
+      i++;
+      continue;
+    }
+    if (start !== -1) {
+      words.push(word);
+      spans.push([start, end]);
+      word = "";
+      start = -1;
+    }
+    i++;
+  }
+  if (start !== -1) {
+    words.push(word);
+    spans.push([start, end]);
+  }
+  return { words, spans };
+}
+
+export const tokenize = (text) => normalize(text).words;
+
+export const stripHtml = (text) => (text || "").replace(/<[^>]+>/g, "");
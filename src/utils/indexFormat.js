@@ -0,0 +1,194 @@
+// Decoders for public/torah_index/ files (see backend_tools/index_format.py):
+// one index shard, one chapter's text, or the value directory (values.bin).
+// Arrays are typed-array views straight into the downloaded buffer, and
+// strings are only decoded for the entries a lookup actually returns.
+// Shards store global verse ids only; refs come from the manifest's verse
+// table (createVerseTable in verseIds.js) and the verse text from the
+// chapter's text file.
+
+const MAGIC = "GMIX";
+const VERSION = 4;
+export const WHOLE_VERSE = "(Whole Verse)";
+
+const decoder = new TextDecoder("utf-8");
+
+// Index of `value` in a sorted typed array, or -1
+export function findSorted(sorted, value) {
+  let lo = 0;
+  let hi = sorted.length - 1;
+  while (lo <= hi) {
+    const mid = (lo + hi) >> 1;
+    if (sorted[mid] === value) return mid;
+    if (sorted[mid] < value) lo = mid + 1;
+    else hi = mid - 1;
+  }
+  return -1;
+}
+
+// First index in a sorted typed array whose element is >= value
+export function lowerBound(sorted, value) {
+  let lo = 0;
+  let hi = sorted.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (sorted[mid] < value) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+function decodeContainer(buffer) {
+  const view = new DataView(buffer);
+  const magic = decoder.decode(new Uint8Array(buffer, 0, 4));
+  if (magic !== MAGIC) throw new Error("Not a Gematria index file");
+  const version = view.getUint32(4, true);
+  if (version !== VERSION) throw new Error(`Unsupported index version ${version}`);
+
+  const tocOffset = view.getUint32(8, true);
+  const tocLength = view.getUint32(12, true);
+  const toc = JSON.parse(decoder.decode(new Uint8Array(buffer, tocOffset, tocLength)));
+
+  // The file is little-endian, like every browser platform we ship to
+  const array = (name) => {
+    const s = toc.sections[name];
+    const Type = s.type === "u16" ? Uint16Array : Uint32Array;
+    return new Type(buffer, s.offset, s.count);
+  };
+  const strings = (name) => {
+    const offsets = array(`${name}.offsets`);
+    const s = toc.sections[`${name}.data`];
+    const data = new Uint8Array(buffer, s.offset, s.length);
+    return (i) => decoder.decode(data.subarray(offsets[i], offsets[i + 1]));
+  };
+
+  return { toc, array, strings };
+}
+
+// One chapter's verses (text-<book>-<chapter>.bin): verse i is verse i + 1
+export function decodeText(buffer) {
+  const { toc, array, strings } = decodeContainer(buffer);
+  const verseWordOffsets = array("verse_word_offsets");
+  const verseWords = array("verse_words");
+  const word = strings("word");
+
+  return {
+    meta: toc.meta,
+    he: strings("verse_he"),
+    en: strings("verse_en"),
+    phrase(i, start, length) {
+      const base = verseWordOffsets[i] + start;
+      const words = [];
+      for (let k = base; k < base + length; k++) words.push(word(verseWords[k]));
+      return words.join(" ");
+    }
+  };
+}
+
+// `verses` decodes the shard's global verse ids (see verseIds.js)
+export function decodeIndex(buffer, verses) {
+  const { toc, array } = decodeContainer(buffer);
+
+  const values = array("values");
+  const valueOffsets = array("value_offsets");
+  const groupOffsets = array("group_offsets");
+  const postVerse = array("post_verse");
+  const postStart = array("post_start");
+  const postLen = array("post_len");
+
+  // Posting p in the same shape the old torah_index.json entries had, plus
+  // the global verseId used for parsha filtering. `text` is the decoded
+  // text file of the verse's chapter (decodeText).
+  const entry = (p, text) => {
+    const verseId = postVerse[p];
+    const i = verses.locate(verseId).verse - 1;
+    const length = postLen[p];
+    if (length === 0) {
+      return {
+        phrase: WHOLE_VERSE,
+        original_he: text.he(i),
+        ref: verses.ref(verseId),
+        verseId,
+        context_en: text.en(i),
+        isVerse: true
+      };
+    }
+    return {
+      phrase: text.phrase(i, postStart[p], length),
+      ref: verses.ref(verseId),
+      verseId,
+      context_en: text.en(i),
+      isVerse: false
+    };
+  };
+
+  // [start, end) of the value's postings, empty if absent
+  const postings = (value) => {
+    const i = findSorted(values, value);
+    return i === -1 ? [0, 0] : [valueOffsets[i], valueOffsets[i + 1]];
+  };
+
+  return {
+    meta: toc.meta,
+    values,
+    postings,
+    entry,
+    // Per-posting fields read straight from the arrays, for filtering
+    // without building entries (0 words = whole verse)
+    wordCount: (p) => postLen[p],
+    verseId: (p) => postVerse[p],
+    // [start, end) of posting p's phrase group: every occurrence of the same
+    // phrase under the same value, contiguous, most frequent phrase first
+    groupRange(p) {
+      const g = lowerBound(groupOffsets, p + 1) - 1;
+      return [groupOffsets[g], groupOffsets[g + 1]];
+    }
+  };
+}
+
+// The sorted distinct values of the whole index with their posting counts
+export function decodeValueDirectory(buffer) {
+  const { toc, array } = decodeContainer(buffer);
+  const values = array("values");
+  const counts = array("counts");
+
+  // [{ value, count }] for every indexed value in [lo, hi]
+  const inRange = (lo, hi) => {
+    const results = [];
+    for (let i = lowerBound(values, lo); i < values.length && values[i] <= hi; i++) {
+      results.push({ value: values[i], count: counts[i] });
+    }
+    return results;
+  };
+
+  return {
+    meta: toc.meta,
+    values,
+    counts,
+    inRange,
+    within: (value, k) => inRange(value - k, value + k),
+    count(value) {
+      const i = findSorted(values, value);
+      return i === -1 ? 0 : counts[i];
+    },
+    // [{ a, countA, b, countB }] with a <= b and a + b === target:
+    // a two-pointer walk from both ends of the directory
+    pairs(target) {
+      const results = [];
+      let i = 0;
+      let j = lowerBound(values, target + 1) - 1;
+      while (i <= j) {
+        const total = values[i] + values[j];
+        if (total === target) {
+          results.push({ a: values[i], countA: counts[i], b: values[j], countB: counts[j] });
+          i++;
+          j--;
+        } else if (total < target) {
+          i++;
+        } else {
+          j--;
+        }
+      }
+      return results;
+    }
+  };
+}
@@ -0,0 +1,125 @@
+// Loads the value-range shards of public/torah_index/ on demand.
+// manifest.json says which shards exist for each gematria method; a lookup
+// fetches only the shard holding each value and keeps the most recently used
+// ones decoded. Shards only hold verse ids: the text of a result comes from
+// its chapter's text file, fetched when an entry of that chapter is shown.
+// A method's value directory (values-<method>.bin) is small and loaded once;
+// range, tolerance and pair queries are answered from it without touching a
+// shard.
+
+import { decodeIndex, decodeText, decodeValueDirectory } from './indexFormat';
+import { assetUrl, publicPath } from './assets';
+import { createVerseTable } from './verseIds';
+import { DEFAULT_METHOD } from './gematria';
+
+const INDEX_DIR = 'torah_index';
+const MAX_SHARDS = 16;
+const MAX_TEXTS = 64;
+
+let manifestPromise = null;
+const directoryPromises = new Map(); // method -> Promise<decoded value directory>
+const shards = new Map(); // "method/key" -> Promise<decoded shard>, oldest first
+const texts = new Map(); // "book/chapter" -> Promise<decoded chapter text>, oldest first
+
+const fetchOrThrow = (url) =>
+  fetch(url).then(response => {
+    // A missing file falls through to index.html, so reject HTML
+    const contentType = response.headers.get("content-type");
+    if (!response.ok || (contentType && contentType.indexOf("text/html") !== -1)) {
+      throw new Error(`${url}: file not found or invalid format`);
+    }
+    return response;
+  });
+
+export function loadManifest() {
+  if (!manifestPromise) {
+    // Shard and directory names in the manifest are content-hashed
+    manifestPromise = assetUrl(`${INDEX_DIR}/manifest.json`)
+      .then(fetchOrThrow)
+      .then(response => response.json())
+      // The verse table the shards' global verse ids refer to
+      .then(manifest => ({ ...manifest, verses: createVerseTable(manifest.verse_table.books) }))
+      .catch(err => {
+        manifestPromise = null; // let the next call retry
+        throw err;
+      });
+  }
+  return manifestPromise;
+}
+
+export function loadValueDirectory(method = DEFAULT_METHOD) {
+  if (!directoryPromises.has(method)) {
+    directoryPromises.set(method, loadManifest()
+      .then(manifest => fetchOrThrow(publicPath(`${INDEX_DIR}/${manifest.methods[method].directory.file}`)))
+      .then(response => response.arrayBuffer())
+      .then(decodeValueDirectory)
+      .catch(err => {
+        directoryPromises.delete(method);
+        throw err;
+      }));
+  }
+  return directoryPromises.get(method);
+}
+
+// The decoded file `file` of torah_index/, through an LRU map of promises
+function loadCached(cache, maxSize, key, file, decode) {
+  if (cache.has(key)) {
+    // Move to the back of the LRU
+    const cached = cache.get(key);
+    cache.delete(key);
+    cache.set(key, cached);
+    return cached;
+  }
+
+  const pending = fetchOrThrow(publicPath(`${INDEX_DIR}/${file}`))
+    .then(response => response.arrayBuffer())
+    .then(decode)
+    .catch(err => {
+      cache.delete(key);
+      throw err;
+    });
+  cache.set(key, pending);
+  if (cache.size > maxSize) {
+    cache.delete(cache.keys().next().value);
+  }
+  return pending;
+}
+
+function loadShard(manifest, method, shardKey) {
+  return loadCached(shards, MAX_SHARDS, `${method}/${shardKey}`, manifest.methods[method].shards[shardKey].file,
+    buffer => decodeIndex(buffer, manifest.verses));
+}
+
+// The decoded text file of the chapter holding a global verse id
+export async function loadTextFor(verseId) {
+  const manifest = await loadManifest();
+  const { book, chapter } = manifest.verses.locate(verseId);
+  return loadCached(texts, MAX_TEXTS, `${book}/${chapter}`, manifest.text[book][chapter - 1], decodeText);
+}
+
+// Posting p of a shard as an entry, with its chapter's text loaded
+export async function loadEntry(shard, p) {
+  return shard.entry(p, await loadTextFor(shard.verseId(p)));
+}
+
+// The decoded shard holding `value` in `method`, or null if no shard covers it
+export async function loadShardFor(value, method = DEFAULT_METHOD) {
+  const manifest = await loadManifest();
+  const { shard_size, shards: methodShards } = manifest.methods[method];
+  const key = String(Math.floor(value / shard_size));
+  if (value <= 0 || !methodShards[key]) return null;
+  return loadShard(manifest, method, key);
+}
+
+// Resolves to { [value]: entries } for every requested value
+export async function lookupValues(values, method = DEFAULT_METHOD) {
+  const results = {};
+  await Promise.all(values.map(async (value) => {
+    const shard = await loadShardFor(value, method);
+    const [start, end] = shard ? shard.postings(value) : [0, 0];
+    const entries = [];
+    for (let p = start; p < end; p++) entries.push(loadEntry(shard, p));
+    results[value] = await Promise.all(entries);
+  }));
+  return results;
+}
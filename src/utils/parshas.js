@@ -1,5 +1,6 @@
 export const PARSHAS = [
   {
+    "id": 0,
     "name": "Bereshit",
     "book": "Genesis",
     "start": [
@@ -10,9 +11,12 @@ export const PARSHAS = [
       6,
       8
     ],
+    "first_verse": 0,
+    "last_verse": 145,
     "verse_count": 146
   },
   {
+    "id": 1,
     "name": "Noach",
     "book": "Genesis",
     "start": [
@@ -23,9 +27,12 @@ export const PARSHAS = [
       11,
       32
     ],
+    "first_verse": 146,
+    "last_verse": 298,
     "verse_count": 153
   },
   {
+    "id": 2,
     "name": "Lech Lecha",
     "book": "Genesis",
     "start": [
@@ -36,9 +43,12 @@ export const PARSHAS = [
       17,
       27
     ],
+    "first_verse": 299,
+    "last_verse": 424,
     "verse_count": 126
   },
   {
+    "id": 3,
     "name": "Vayera",
     "book": "Genesis",
     "start": [
@@ -49,9 +59,12 @@ export const PARSHAS = [
       22,
       24
     ],
+    "first_verse": 425,
+    "last_verse": 571,
     "verse_count": 147
   },
   {
+    "id": 4,
     "name": "Chayei Sara",
     "book": "Genesis",
     "start": [
@@ -62,9 +75,12 @@ export const PARSHAS = [
       25,
       18
     ],
+    "first_verse": 572,
+    "last_verse": 676,
     "verse_count": 105
   },
   {
+    "id": 5,
     "name": "Toldot",
     "book": "Genesis",
     "start": [
@@ -75,9 +91,12 @@ export const PARSHAS = [
       28,
       9
     ],
+    "first_verse": 677,
+    "last_verse": 782,
     "verse_count": 106
   },
   {
+    "id": 6,
     "name": "Vayetzei",
     "book": "Genesis",
     "start": [
@@ -88,9 +107,12 @@ export const PARSHAS = [
       32,
       3
     ],
+    "first_verse": 783,
+    "last_verse": 930,
     "verse_count": 148
   },
   {
+    "id": 7,
     "name": "Vayishlach",
     "book": "Genesis",
     "start": [
@@ -101,9 +123,12 @@ export const PARSHAS = [
       36,
       43
     ],
+    "first_verse": 931,
+    "last_verse": 1083,
     "verse_count": 153
   },
   {
+    "id": 8,
     "name": "Vayeshev",
     "book": "Genesis",
     "start": [
@@ -114,9 +139,12 @@ export const PARSHAS = [
       40,
       23
     ],
+    "first_verse": 1084,
+    "last_verse": 1195,
     "verse_count": 112
   },
   {
+    "id": 9,
     "name": "Miketz",
     "book": "Genesis",
     "start": [
@@ -127,9 +155,12 @@ export const PARSHAS = [
       44,
       17
     ],
+    "first_verse": 1196,
+    "last_verse": 1341,
     "verse_count": 146
   },
   {
+    "id": 10,
     "name": "Vayigash",
     "book": "Genesis",
     "start": [
@@ -140,9 +171,12 @@ export const PARSHAS = [
       47,
       27
     ],
+    "first_verse": 1342,
+    "last_verse": 1447,
     "verse_count": 106
   },
   {
+    "id": 11,
     "name": "Vayechi",
     "book": "Genesis",
     "start": [
@@ -153,9 +187,12 @@ export const PARSHAS = [
       50,
       26
     ],
+    "first_verse": 1448,
+    "last_verse": 1532,
     "verse_count": 85
   },
   {
+    "id": 12,
     "name": "Shemot",
     "book": "Exodus",
     "start": [
@@ -166,9 +203,12 @@ export const PARSHAS = [
       6,
       1
     ],
+    "first_verse": 1533,
+    "last_verse": 1656,
     "verse_count": 124
   },
   {
+    "id": 13,
     "name": "Vaera",
     "book": "Exodus",
     "start": [
@@ -179,9 +219,12 @@ export const PARSHAS = [
       9,
       35
     ],
+    "first_verse": 1657,
+    "last_verse": 1777,
     "verse_count": 121
   },
   {
+    "id": 14,
     "name": "Bo",
     "book": "Exodus",
     "start": [
@@ -192,9 +235,12 @@ export const PARSHAS = [
       13,
       16
     ],
+    "first_verse": 1778,
+    "last_verse": 1883,
     "verse_count": 106
   },
   {
+    "id": 15,
     "name": "Beshalach",
     "book": "Exodus",
     "start": [
@@ -205,9 +251,12 @@ export const PARSHAS = [
       17,
       16
     ],
+    "first_verse": 1884,
+    "last_verse": 1999,
     "verse_count": 116
   },
   {
+    "id": 16,
     "name": "Yitro",
     "book": "Exodus",
     "start": [
@@ -218,9 +267,12 @@ export const PARSHAS = [
       20,
       23
     ],
+    "first_verse": 2000,
+    "last_verse": 2074,
     "verse_count": 75
   },
   {
+    "id": 17,
     "name": "Mishpatim",
     "book": "Exodus",
     "start": [
@@ -231,9 +283,12 @@ export const PARSHAS = [
       24,
       18
     ],
+    "first_verse": 2075,
+    "last_verse": 2192,
     "verse_count": 118
   },
   {
+    "id": 18,
     "name": "Terumah",
     "book": "Exodus",
     "start": [
@@ -244,9 +299,12 @@ export const PARSHAS = [
       27,
       19
     ],
+    "first_verse": 2193,
+    "last_verse": 2288,
     "verse_count": 96
   },
   {
+    "id": 19,
     "name": "Tetzaveh",
     "book": "Exodus",
     "start": [
@@ -257,9 +315,12 @@ export const PARSHAS = [
       30,
       10
     ],
+    "first_verse": 2289,
+    "last_verse": 2389,
     "verse_count": 101
   },
   {
+    "id": 20,
     "name": "Ki Tisa",
     "book": "Exodus",
     "start": [
@@ -270,9 +331,12 @@ export const PARSHAS = [
       34,
       35
     ],
+    "first_verse": 2390,
+    "last_verse": 2528,
     "verse_count": 139
   },
   {
+    "id": 21,
     "name": "Vayakhel",
     "book": "Exodus",
     "start": [
@@ -283,9 +347,12 @@ export const PARSHAS = [
       38,
       20
     ],
+    "first_verse": 2529,
+    "last_verse": 2650,
     "verse_count": 122
   },
   {
+    "id": 22,
     "name": "Pekudei",
     "book": "Exodus",
     "start": [
@@ -296,9 +363,12 @@ export const PARSHAS = [
       40,
       38
     ],
+    "first_verse": 2651,
+    "last_verse": 2742,
     "verse_count": 92
   },
   {
+    "id": 23,
     "name": "Vayikra",
     "book": "Leviticus",
     "start": [
@@ -309,9 +379,12 @@ export const PARSHAS = [
       5,
       26
     ],
+    "first_verse": 2743,
+    "last_verse": 2853,
     "verse_count": 111
   },
   {
+    "id": 24,
     "name": "Tzav",
     "book": "Leviticus",
     "start": [
@@ -322,9 +395,12 @@ export const PARSHAS = [
       8,
       36
     ],
+    "first_verse": 2854,
+    "last_verse": 2950,
     "verse_count": 97
   },
   {
+    "id": 25,
     "name": "Shmini",
     "book": "Leviticus",
     "start": [
@@ -335,9 +411,12 @@ export const PARSHAS = [
       11,
       47
     ],
+    "first_verse": 2951,
+    "last_verse": 3041,
     "verse_count": 91
   },
   {
+    "id": 26,
     "name": "Tazria",
     "book": "Leviticus",
     "start": [
@@ -348,9 +427,12 @@ export const PARSHAS = [
       13,
       59
     ],
+    "first_verse": 3042,
+    "last_verse": 3108,
     "verse_count": 67
   },
   {
+    "id": 27,
     "name": "Metzora",
     "book": "Leviticus",
     "start": [
@@ -361,9 +443,12 @@ export const PARSHAS = [
       15,
       33
     ],
+    "first_verse": 3109,
+    "last_verse": 3198,
     "verse_count": 90
   },
   {
+    "id": 28,
     "name": "Achrei Mot",
     "book": "Leviticus",
     "start": [
@@ -374,9 +459,12 @@ export const PARSHAS = [
       18,
       30
     ],
+    "first_verse": 3199,
+    "last_verse": 3278,
     "verse_count": 80
   },
   {
+    "id": 29,
     "name": "Kedoshim",
     "book": "Leviticus",
     "start": [
@@ -387,9 +475,12 @@ export const PARSHAS = [
       20,
       27
     ],
+    "first_verse": 3279,
+    "last_verse": 3342,
     "verse_count": 64
   },
   {
+    "id": 30,
     "name": "Emor",
     "book": "Leviticus",
     "start": [
@@ -400,9 +491,12 @@ export const PARSHAS = [
       24,
       23
     ],
+    "first_verse": 3343,
+    "last_verse": 3466,
     "verse_count": 124
   },
   {
+    "id": 31,
     "name": "Behar",
     "book": "Leviticus",
     "start": [
@@ -413,9 +507,12 @@ export const PARSHAS = [
       26,
       2
     ],
+    "first_verse": 3467,
+    "last_verse": 3523,
     "verse_count": 57
   },
   {
+    "id": 32,
     "name": "Bechukotai",
     "book": "Leviticus",
     "start": [
@@ -426,9 +523,12 @@ export const PARSHAS = [
       27,
       34
     ],
+    "first_verse": 3524,
+    "last_verse": 3601,
     "verse_count": 78
   },
   {
+    "id": 33,
     "name": "Bamidbar",
     "book": "Numbers",
     "start": [
@@ -439,9 +539,12 @@ export const PARSHAS = [
       4,
       20
     ],
+    "first_verse": 3602,
+    "last_verse": 3760,
     "verse_count": 159
   },
   {
+    "id": 34,
     "name": "Nasso",
     "book": "Numbers",
     "start": [
@@ -452,9 +555,12 @@ export const PARSHAS = [
       7,
       89
     ],
+    "first_verse": 3761,
+    "last_verse": 3936,
     "verse_count": 176
   },
   {
+    "id": 35,
     "name": "Beha'alotcha",
     "book": "Numbers",
     "start": [
@@ -465,9 +571,12 @@ export const PARSHAS = [
       12,
       16
     ],
+    "first_verse": 3937,
+    "last_verse": 4072,
     "verse_count": 136
   },
   {
+    "id": 36,
     "name": "Sh'lach",
     "book": "Numbers",
     "start": [
@@ -478,9 +587,12 @@ export const PARSHAS = [
       15,
       41
     ],
+    "first_verse": 4073,
+    "last_verse": 4191,
     "verse_count": 119
   },
   {
+    "id": 37,
     "name": "Korach",
     "book": "Numbers",
     "start": [
@@ -491,9 +603,12 @@ export const PARSHAS = [
       18,
       32
     ],
+    "first_verse": 4192,
+    "last_verse": 4286,
     "verse_count": 95
   },
   {
+    "id": 38,
     "name": "Chukat",
     "book": "Numbers",
     "start": [
@@ -504,9 +619,12 @@ export const PARSHAS = [
       22,
       1
     ],
+    "first_verse": 4287,
+    "last_verse": 4373,
     "verse_count": 87
   },
   {
+    "id": 39,
     "name": "Balak",
     "book": "Numbers",
     "start": [
@@ -517,9 +635,12 @@ export const PARSHAS = [
       25,
       9
     ],
+    "first_verse": 4374,
+    "last_verse": 4477,
     "verse_count": 104
   },
   {
+    "id": 40,
     "name": "Pinchas",
     "book": "Numbers",
     "start": [
@@ -530,9 +651,12 @@ export const PARSHAS = [
       30,
       1
     ],
+    "first_verse": 4478,
+    "last_verse": 4645,
     "verse_count": 168
   },
   {
+    "id": 41,
     "name": "Matot",
     "book": "Numbers",
     "start": [
@@ -543,9 +667,12 @@ export const PARSHAS = [
       32,
       42
     ],
+    "first_verse": 4646,
+    "last_verse": 4757,
     "verse_count": 112
   },
   {
+    "id": 42,
     "name": "Masei",
     "book": "Numbers",
     "start": [
@@ -556,9 +683,12 @@ export const PARSHAS = [
       36,
       13
     ],
+    "first_verse": 4758,
+    "last_verse": 4889,
     "verse_count": 132
   },
   {
+    "id": 43,
     "name": "Devarim",
     "book": "Deuteronomy",
     "start": [
@@ -569,9 +699,12 @@ export const PARSHAS = [
       3,
       22
     ],
+    "first_verse": 4890,
+    "last_verse": 4994,
     "verse_count": 105
   },
   {
+    "id": 44,
     "name": "Vaetchanan",
     "book": "Deuteronomy",
     "start": [
@@ -582,9 +715,12 @@ export const PARSHAS = [
       7,
       11
     ],
+    "first_verse": 4995,
+    "last_verse": 5116,
     "verse_count": 122
   },
   {
+    "id": 45,
     "name": "Eikev",
     "book": "Deuteronomy",
     "start": [
@@ -595,9 +731,12 @@ export const PARSHAS = [
       11,
       25
     ],
+    "first_verse": 5117,
+    "last_verse": 5227,
     "verse_count": 111
   },
   {
+    "id": 46,
     "name": "Re'eh",
     "book": "Deuteronomy",
     "start": [
@@ -608,9 +747,12 @@ export const PARSHAS = [
       16,
       17
     ],
+    "first_verse": 5228,
+    "last_verse": 5353,
     "verse_count": 126
   },
   {
+    "id": 47,
     "name": "Shoftim",
     "book": "Deuteronomy",
     "start": [
@@ -621,9 +763,12 @@ export const PARSHAS = [
       21,
       9
     ],
+    "first_verse": 5354,
+    "last_verse": 5450,
     "verse_count": 97
   },
   {
+    "id": 48,
     "name": "Ki Teitzei",
     "book": "Deuteronomy",
     "start": [
@@ -634,9 +779,12 @@ export const PARSHAS = [
       25,
       19
     ],
+    "first_verse": 5451,
+    "last_verse": 5560,
     "verse_count": 110
   },
   {
+    "id": 49,
     "name": "Ki Tavo",
     "book": "Deuteronomy",
     "start": [
@@ -647,9 +795,12 @@ export const PARSHAS = [
       29,
       8
     ],
+    "first_verse": 5561,
+    "last_verse": 5682,
     "verse_count": 122
   },
   {
+    "id": 50,
     "name": "Nitzavim",
     "book": "Deuteronomy",
     "start": [
@@ -660,9 +811,12 @@ export const PARSHAS = [
       30,
       20
     ],
+    "first_verse": 5683,
+    "last_verse": 5722,
     "verse_count": 40
   },
   {
+    "id": 51,
     "name": "Vayeilech",
     "book": "Deuteronomy",
     "start": [
@@ -670,12 +824,15 @@ export const PARSHAS = [
       1
     ],
     "end": [
-      30,
-      1
+      31,
+      30
     ],
+    "first_verse": 5723,
+    "last_verse": 5752,
     "verse_count": 30
   },
   {
+    "id": 52,
     "name": "Ha'Azinu",
     "book": "Deuteronomy",
     "start": [
@@ -683,12 +840,15 @@ export const PARSHAS = [
       1
     ],
     "end": [
-      52,
-      1
+      32,
+      52
     ],
+    "first_verse": 5753,
+    "last_verse": 5804,
     "verse_count": 52
   },
   {
+    "id": 53,
     "name": "V'Zot HaBerachah",
     "book": "Deuteronomy",
     "start": [
@@ -699,6 +859,8 @@ export const PARSHAS = [
       34,
       12
     ],
+    "first_verse": 5805,
+    "last_verse": 5845,
     "verse_count": 41
   }
 ];
\ No newline at end of file
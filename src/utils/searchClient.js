@@ -0,0 +1,41 @@
+// Main-thread side of searchWorker.js. The worker is started on the first
+// search; each call resolves with the worker's answer, or null when a newer
+// search superseded it before it ran.
+
+let worker = null;
+let nextId = 0;
+const pending = new Map(); // id -> { resolve, reject }
+
+function getWorker() {
+  if (!worker) {
+    worker = new Worker(new URL('./searchWorker.js', import.meta.url));
+    worker.onmessage = ({ data }) => {
+      const request = pending.get(data.id);
+      if (!request) return;
+      pending.delete(data.id);
+      if (data.error) request.reject(new Error(data.error));
+      else request.resolve(data.skipped ? null : data);
+    };
+    // Relative URLs inside the worker would resolve against its script
+    const publicUrl = new URL(`${process.env.PUBLIC_URL}/`, window.location.href).href.replace(/\/$/, "");
+    worker.postMessage({ type: 'init', publicUrl });
+  }
+  return worker;
+}
+
+function request(message) {
+  const id = nextId++;
+  return new Promise((resolve, reject) => {
+    pending.set(id, { resolve, reject });
+    getWorker().postMessage({ id, ...message });
+  });
+}
+
+// query: { values, method, exactValue, single, parsha, stats, tab, page, perPage }
+// Resolves to { counts: { [value]: occurrences }, total, results } (one page of
+// phrase groups, each with its `occurrences` count and `group` index), or null
+export const search = (query) => request(query);
+
+// One page of the occurrences of result `group` of a search's tab:
+// { ...the search, tab, group, page, perPage } -> { total, results }
+export const occurrences = (query) => request({ ...query, type: 'occurrences' });
@@ -0,0 +1,180 @@
+/* eslint-disable no-restricted-globals */
+// Index search off the UI thread. The worker fetches and decodes the shards
+// itself (indexStore.js), filters postings on their typed arrays, and sends
+// back only per-value counts and the requested page of results; only that
+// page's chapter texts are fetched.
+//
+// Results are phrase groups: each distinct phrase once, with the number of
+// its occurrences that pass the filters, most frequent first. A group's
+// occurrences are only turned into entries when the UI expands it.
+//
+// Request:  { id, values, method, exactValue, single, parsha, stats, tab, page, perPage }
+// Response: { id, counts: { [value]: occurrences }, total: groups, results }
+//           { id, skipped: true } when a newer request arrived first
+//           { id, error }
+//
+// Request:  { type: 'occurrences', id, ...the search, tab, group, page, perPage }
+// Response: { id, total, results }, one page of the tab's group-th result
+
+import { loadEntry, loadShardFor } from './indexStore';
+import { setPublicUrl } from './assets';
+import { PARSHAS } from './parshas';
+import { isVerseInParsha } from './filter';
+
+let latest = null;
+let busy = false;
+// Filtered postings of the last query; paging and tab switches reuse them
+let cached = { key: null, matches: null };
+
+// Parsha verse-count matches, listed before the index matches
+const statEntry = (p, value) => ({
+  phrase: `Parshat ${p.name}`,
+  ref: "Torah Stats",
+  context_en: `This Parsha contains exactly ${p.verse_count} verses.`,
+  actualValue: value,
+  isExact: true,
+  type: 'stat',
+  isVerse: false
+});
+
+// Posting ids of `value` that pass the filters, read from the shard's arrays
+// without decoding a single string
+const filterPostings = (shard, value, single, parsha) => {
+  const [start, end] = shard.postings(value);
+  const hits = new Uint32Array(end - start);
+  let n = 0;
+  for (let p = start; p < end; p++) {
+    if (single && shard.wordCount(p) !== 1) continue;
+    if (parsha && !isVerseInParsha(shard.verseId(p), parsha)) continue;
+    hits[n++] = p;
+  }
+  return hits.subarray(0, n);
+};
+
+// Phrase groups of the filtered postings. A group's postings are contiguous in
+// the shard, so its hits are too: group g is hits[starts[g]:starts[g + 1]].
+// The shard stores groups most frequent first; a parsha filter can change
+// that, so they are re-sorted by their filtered counts (stable for ties).
+const groupHits = (shard, hits) => {
+  const starts = [];
+  let end = 0;
+  for (let i = 0; i < hits.length; i++) {
+    if (hits[i] >= end) {
+      starts.push(i);
+      end = shard.groupRange(hits[i])[1];
+    }
+  }
+  starts.push(hits.length);
+  const size = (g) => starts[g + 1] - starts[g];
+  const order = Array.from({ length: starts.length - 1 }, (_, g) => g).sort((a, b) => size(b) - size(a));
+  return { starts: Uint32Array.from(starts), order: Uint32Array.from(order) };
+};
+
+const NO_GROUPS = { starts: new Uint32Array(1), order: new Uint32Array(0) };
+
+async function findMatches({ values, method, single, parsha, stats }) {
+  const range = parsha ? PARSHAS.find(p => p.name === parsha) : null;
+  const matches = new Map();
+  await Promise.all(values.map(async (value) => {
+    const shard = value > 0 ? await loadShardFor(value, method) : null;
+    const hits = shard ? filterPostings(shard, value, single, range) : new Uint32Array(0);
+    matches.set(value, {
+      shard,
+      stats: stats && value > 0 ? PARSHAS.filter(p => p.verse_count === value) : [],
+      hits,
+      groups: shard ? groupHits(shard, hits) : NO_GROUPS
+    });
+  }));
+  return matches;
+}
+
+async function matchesFor(query) {
+  const key = JSON.stringify([query.values, query.method, query.single, query.parsha, query.stats]);
+  if (cached.key !== key) {
+    cached = { key, matches: await findMatches(query) };
+  }
+  return cached.matches;
+}
+
+const pageRange = (query, total) => {
+  const start = (query.page - 1) * query.perPage;
+  return [start, Math.min(start + query.perPage, total)];
+};
+
+async function answer(query) {
+  const matches = await matchesFor(query);
+
+  const counts = {};
+  matches.forEach((m, value) => { counts[value] = m.stats.length + m.hits.length; });
+
+  const m = matches.get(query.tab);
+  const results = [];
+  if (!m) return { counts, total: 0, results };
+
+  const total = m.stats.length + m.groups.order.length;
+  const [start, end] = pageRange(query, total);
+  for (let k = start; k < end; k++) {
+    if (k < m.stats.length) {
+      results.push(statEntry(m.stats[k], query.tab));
+      continue;
+    }
+    const group = k - m.stats.length;
+    const g = m.groups.order[group];
+    // Only this page's entries are built, so only their chapters' text is fetched
+    results.push(loadEntry(m.shard, m.hits[m.groups.starts[g]]).then(entry => ({
+      ...entry,
+      occurrences: m.groups.starts[g + 1] - m.groups.starts[g],
+      group,
+      actualValue: query.tab,
+      isExact: query.tab === query.exactValue,
+      type: 'standard'
+    })));
+  }
+  return { counts, total, results: await Promise.all(results) };
+}
+
+// One page of a group's occurrences, in corpus order
+async function answerOccurrences(query) {
+  const m = (await matchesFor(query)).get(query.tab);
+  const g = m ? m.groups.order[query.group] : undefined;
+  if (g === undefined) return { total: 0, results: [] };
+
+  const first = m.groups.starts[g];
+  const total = m.groups.starts[g + 1] - first;
+  const [start, end] = pageRange(query, total);
+  const results = [];
+  for (let k = start; k < end; k++) results.push(loadEntry(m.shard, m.hits[first + k]));
+  return { total, results: await Promise.all(results) };
+}
+
+// Only the newest search is worth answering; older queued ones are skipped
+async function drain() {
+  busy = true;
+  while (latest) {
+    const query = latest;
+    latest = null;
+    try {
+      self.postMessage({ id: query.id, ...(await answer(query)) });
+    } catch (err) {
+      self.postMessage({ id: query.id, error: String(err) });
+    }
+  }
+  busy = false;
+}
+
+self.onmessage = ({ data }) => {
+  if (data.type === 'init') {
+    setPublicUrl(data.publicUrl);
+    return;
+  }
+  if (data.type === 'occurrences') {
+    // Expanding a group never supersedes a search, or another expansion
+    answerOccurrences(data)
+      .then(page => self.postMessage({ id: data.id, ...page }))
+      .catch(err => self.postMessage({ id: data.id, error: String(err) }));
+    return;
+  }
+  if (latest) self.postMessage({ id: latest.id, skipped: true });
+  latest = data;
+  if (!busy) drain();
+};
@@ -0,0 +1,59 @@
+// Global verse ids, the same encoding as backend_tools/verse_ids.py.
+// A verse is its 0-based position in the Torah; verse_table.json (built by
+// build_timeline.py) holds the verse count of every chapter, which is all it
+// takes to go between an id and "Book C:V".
+
+import verseTable from '../data/verse_table.json';
+
+// First index in a sorted array whose element is > value
+const upperBound = (sorted, value) => {
+  let lo = 0;
+  let hi = sorted.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (sorted[mid] <= value) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+};
+
+// books: [[book, [verse count of chapter 1, chapter 2, ...]], ...]
+export function createVerseTable(books) {
+  const chapters = [];      // { book, chapter } in corpus order
+  const chapterStarts = []; // global id of each chapter's first verse
+  const bookStarts = {};    // book -> index of its chapter 1 in `chapters`
+  let total = 0;
+  books.forEach(([book, counts]) => {
+    bookStarts[book] = chapters.length;
+    counts.forEach((count, k) => {
+      chapters.push({ book, chapter: k + 1 });
+      chapterStarts.push(total);
+      total += count;
+    });
+  });
+
+  // { book, chapter, verse } of a global verse id
+  const locate = (verseId) => {
+    if (!(verseId >= 0 && verseId < total)) throw new RangeError(`verse id ${verseId} out of range`);
+    const k = upperBound(chapterStarts, verseId) - 1;
+    return { ...chapters[k], verse: verseId - chapterStarts[k] + 1 };
+  };
+
+  return {
+    total,
+    locate,
+    verseId: (book, chapter, verse) => chapterStarts[bookStarts[book] + chapter - 1] + verse - 1,
+    ref(verseId) {
+      const { book, chapter, verse } = locate(verseId);
+      return `${book} ${chapter}:${verse}`;
+    },
+    book: (verseId) => locate(verseId).book
+  };
+}
+
+const verses = createVerseTable(verseTable.books);
+
+export const verseRef = verses.ref;
+export const verseBook = verses.book;
+export const locateVerse = verses.locate;
+export const verseId = verses.verseId;